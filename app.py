@@ -1,14 +1,28 @@
+import json
 import sys
+import time
+from pathlib import Path
 from typing import List
 
-from neuromind.client import APIError, NeuroMindClient, StreamEventType, ThreadInfo
-from neuromind.config import Config, Persona
+from neuromind.client import (
+    APIError,
+    BatchInfo,
+    NeuroMindClient,
+    StreamEventType,
+    StreamTransport,
+    ThreadInfo,
+)
+from neuromind.config import Config
 from neuromind.ui_manager import UIManager
 
 
 class NeuroApp:
-    def __init__(self, base_url: str = "http://localhost:8000"):
-        self.client = NeuroMindClient(base_url)
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        transport: StreamTransport = StreamTransport.HTTP,
+    ):
+        self.client = NeuroMindClient(base_url, transport=transport)
         self.ui = UIManager()
         self.active_thread: ThreadInfo | None = None
 
@@ -19,6 +33,7 @@ class NeuroApp:
             self.ui.print_critical_error(
                 f"{e.message}\nMake sure the server is running: python start_server.py"
             )
+            self.client.close()
             sys.exit(1)
 
         self.active_thread = self.client.get_or_create_thread(Config.DEFAULT_THREAD)
@@ -33,14 +48,19 @@ class NeuroApp:
             return
 
         name = args[0]
-        all_personas = list(Persona)
+        # Personas are files on the server and can change while we run
+        personas = self.client.list_personas()
         choice = self.ui.prompt_choice(
-            "Select Persona", [p.value for p in all_personas]
+            "Select Persona",
+            [
+                f"{p['name']} - {p['description']}" if p["description"] else p["name"]
+                for p in personas
+            ],
         )
-        persona = all_personas[choice]
+        persona = personas[choice]["name"]
 
         self.active_thread = self.client.get_or_create_thread(name, persona)
-        self.ui.print_info(f"Switched to '{name}' ({persona.value})")
+        self.ui.print_info(f"Switched to '{name}' ({persona})")
 
     def _cmd_switch(self, args: List[str]):
         if not args:
@@ -51,32 +71,66 @@ class NeuroApp:
         self.active_thread = self.client.get_or_create_thread(name)
         self.ui.print_info(f"Active thread: {name}")
 
+    def _cmd_fork(self, args: List[str]):
+        if not args or (len(args) > 1 and not args[1].isdigit()):
+            self.ui.print_error("Usage: /fork <thread_name> [message_id]")
+            return
+
+        at = int(args[1]) if len(args) > 1 else None
+        self.active_thread = self.client.fork_thread(
+            self.active_thread.name, args[0], at
+        )
+        point = self.active_thread.fork_message_id
+        where = f"at message {point}" if point else "with an empty history"
+        self.ui.print_info(f"Forked {where}, active thread: {args[0]}")
+
+    def _cmd_search(self, args: List[str]):
+        if not args:
+            self.ui.print_error("Usage: /search <terms>")
+            return
+
+        query = " ".join(args)
+        hits = self.client.search(query)
+        self.ui.show_search_results(
+            query, [(hit.thread, hit.role, hit.snippet) for hit in hits]
+        )
+
     def _cmd_clear(self):
         if self.ui.confirm(f"Wipe memory for '{self.active_thread.name}'?"):
             self.client.clear_messages(self.active_thread.name)
             self.ui.print_info("Memory wiped.")
 
     def _process_stream(self, events) -> None:
-        thought_buffer = ""
-        response_buffer = ""
+        try:
+            self._render_stream(events)
+        except KeyboardInterrupt:
+            # Stop the generation on the server, then drop the connection
+            self.client.cancel_chat(self.active_thread.name)
+            self.ui.print_info("\nGeneration cancelled.")
+        finally:
+            events.close()
 
-        with self.ui.stream_response(self.active_thread.name) as live:
+    def _render_stream(self, events) -> None:
+        with self.ui.stream_response(self.active_thread.name) as view:
             for event in events:
-                if event.type == StreamEventType.REASONING:
-                    thought_buffer += event.content
+                if event.type == StreamEventType.QUEUED:
+                    view.set_queue_position(event.position)
+                elif event.type == StreamEventType.REASONING:
+                    view.add_reasoning(event.content)
                 elif event.type == StreamEventType.CONTENT:
-                    response_buffer += event.content
+                    view.add_content(event.content)
                 elif event.type == StreamEventType.ERROR:
                     raise APIError(event.message or "Unknown error")
                 elif event.type == StreamEventType.DONE:
                     break
 
-                renderable = self.ui.render_stream_group(
-                    thought_buffer, response_buffer
-                )
-                live.update(renderable)
-
     def run(self):
+        try:
+            self._loop()
+        finally:
+            self.client.close()
+
+    def _loop(self):
         self.ui.show_header(self.model_name, self.active_thread.name)
 
         while True:
@@ -97,6 +151,10 @@ class NeuroApp:
                         self._cmd_new(args)
                     elif cmd == "/switch":
                         self._cmd_switch(args)
+                    elif cmd == "/fork":
+                        self._cmd_fork(args)
+                    elif cmd == "/search":
+                        self._cmd_search(args)
                     elif cmd == "/clear":
                         self._cmd_clear()
                     else:
@@ -114,6 +172,78 @@ class NeuroApp:
                 self.ui.print_error(str(e))
 
 
+class BatchCommand:
+    """`app.py batch ...`: submit JSONL prompt files and follow their jobs."""
+
+    POLL_SECONDS = 1.0
+
+    def __init__(self, base_url: str):
+        self.client = NeuroMindClient(base_url)
+        self.ui = UIManager()
+
+    def run(self, args) -> int:
+        try:
+            if args.action == "submit":
+                return self._submit(args.file, args.concurrency, args.wait)
+            elif args.action == "status":
+                return self._status(args.job_id)
+            elif args.action == "wait":
+                return self._wait(self.client.get_batch(args.job_id))
+            elif args.action == "results":
+                return self._results(args.job_id, args.output)
+            elif args.action == "cancel":
+                job = self.client.cancel_batch(args.job_id)
+                self.ui.print_info(f"Batch {job.id} {job.status}.")
+                return 0
+        except APIError as e:
+            self.ui.print_error(e.message)
+            return 1
+        finally:
+            self.client.close()
+
+    def _show(self, jobs: List[BatchInfo]):
+        self.ui.show_batch_jobs(
+            [(j.id, j.status, j.completed, j.failed, j.total) for j in jobs]
+        )
+
+    def _submit(self, file: str, concurrency: int | None, wait: bool) -> int:
+        job = self.client.submit_batch(Path(file).read_text(), concurrency)
+        self.ui.print_info(
+            f"Submitted batch {job.id}: {job.total} prompts, {job.concurrency} workers."
+        )
+        return self._wait(job) if wait else 0
+
+    def _status(self, job_id: str | None) -> int:
+        if job_id:
+            self._show([self.client.get_batch(job_id)])
+        else:
+            self._show(self.client.list_batches())
+        return 0
+
+    def _wait(self, job: BatchInfo) -> int:
+        with self.ui.batch_progress() as progress:
+            task = progress.add_task(job.id, total=job.total)
+            while True:
+                progress.update(task, completed=job.completed + job.failed)
+                if job.done:
+                    break
+                time.sleep(self.POLL_SECONDS)
+                job = self.client.get_batch(job.id)
+        self._show([job])
+        return 1 if job.failed else 0
+
+    def _results(self, job_id: str, output: str | None) -> int:
+        results = self.client.iter_batch_results(job_id)
+        out = open(output, "w") if output else sys.stdout
+        try:
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+        finally:
+            if output:
+                out.close()
+        return 0
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -123,7 +253,35 @@ if __name__ == "__main__":
         default="http://localhost:8000",
         help="API server URL (default: http://localhost:8000)",
     )
+    parser.add_argument(
+        "--transport",
+        choices=[t.value for t in StreamTransport],
+        default=StreamTransport.HTTP.value,
+        help="How chat answers are streamed: a request per chat, or all chats "
+        "over one WebSocket connection (default: http)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("batch", help="Run JSONL prompt files as batch jobs")
+    actions = batch.add_subparsers(dest="action", required=True)
+    submit = actions.add_parser("submit", help="Submit a JSONL file")
+    submit.add_argument(
+        "file", help='One {"thread", "prompt", "persona"?, "model"?} object per line'
+    )
+    submit.add_argument("--concurrency", type=int, help="Workers for this job")
+    submit.add_argument("--wait", action="store_true", help="Follow progress")
+    status = actions.add_parser("status", help="Show one job, or all of them")
+    status.add_argument("job_id", nargs="?")
+    wait = actions.add_parser("wait", help="Follow a job until it finishes")
+    wait.add_argument("job_id")
+    results = actions.add_parser("results", help="Print a job's results as JSONL")
+    results.add_argument("job_id")
+    results.add_argument("-o", "--output", help="Write to a file instead of stdout")
+    cancel = actions.add_parser("cancel", help="Stop a job")
+    cancel.add_argument("job_id")
     args = parser.parse_args()
 
-    app = NeuroApp(base_url=args.server)
+    if args.command == "batch":
+        sys.exit(BatchCommand(args.server).run(args))
+
+    app = NeuroApp(base_url=args.server, transport=StreamTransport(args.transport))
     app.run()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Batch job throughput versus worker concurrency.
+
+Submits the same JSONL batch through POST /batch at each concurrency and
+polls GET /batch/{id} until it finishes. The fake model streams at a fixed
+rate per request, like a hosted API, and the scheduler limit is raised so
+only the job's own worker count bounds parallelism.
+
+    python -m benchmarks.bench_batch --items 64 --concurrency 1 2 4 8
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import temporary_database
+from benchmarks.fake_llm import FakeModelRegistry, FakeStreamingLLM
+from neuromind.config import Config
+from neuromind.server import app, get_models
+from neuromind.streaming import dumps
+
+
+def make_batch(items: int, threads: int) -> bytes:
+    return b"\n".join(
+        dumps({"thread": f"batch-{i % threads}", "prompt": f"question {i}"})
+        for i in range(items)
+    )
+
+
+def run(concurrency: int, args) -> dict:
+    llm = FakeStreamingLLM(tokens=args.tokens, tokens_per_sec=args.tokens_per_sec)
+    app.dependency_overrides[get_models] = lambda: FakeModelRegistry(llm)
+
+    with temporary_database(), TestClient(app) as client:
+        start = time.perf_counter()
+        response = client.post(
+            "/batch",
+            content=make_batch(args.items, args.threads),
+            params={"concurrency": concurrency},
+        )
+        response.raise_for_status()
+        job = response.json()
+        while job["status"] != "completed":
+            time.sleep(0.05)
+            job = client.get(f"/batch/{job['id']}").json()
+        elapsed = time.perf_counter() - start
+        results = client.get(f"/batch/{job['id']}/results").text.splitlines()
+
+    assert len(results) == args.items and job["failed"] == 0
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "items_per_sec": args.items / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0)
+    args = parser.parse_args()
+
+    Config.Summary.ENABLED = False
+    Config.Cache.ENABLED = False
+    Config.Memory.ENABLED = False
+    Config.WARM_UP_MODEL = False
+    Config.Scheduler.MAX_CONCURRENCY = {Config.MODEL.provider: max(args.concurrency)}
+
+    print(f"{'workers':>8}{'seconds':>10}{'items/s':>10}{'speedup':>10}")
+    baseline = None
+    for concurrency in args.concurrency:
+        r = run(concurrency, args)
+        baseline = baseline or r["items_per_sec"]
+        print(
+            f"{r['concurrency']:>8}{r['seconds']:>10.2f}{r['items_per_sec']:>10.1f}"
+            f"{r['items_per_sec'] / baseline:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of the long-term memory index on a synthetic corpus.
+
+Each document mixes words from one topic with a few words unique to it;
+each query paraphrases one document with a subset of its words plus
+noise. recall@k is the share of queries whose source document is among
+the top k hits. Latencies cover embedding the query and searching.
+
+    python -m benchmarks.bench_memory --docs 10000 20000 50000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import percentile
+from neuromind.config import Config
+from neuromind.memory import HashingEmbeddings, VectorIndex
+
+TURNS = 1000
+
+
+def synthetic_corpus(docs: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(20000)]
+    topics = [rng.sample(vocabulary, 60) for _ in range(200)]
+    corpus = []
+    for i in range(docs):
+        words = rng.sample(rng.choice(topics), 12) + [f"fact{i}x{j}" for j in range(3)]
+        rng.shuffle(words)
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def make_query(document: str, rng: random.Random) -> str:
+    words = document.split()
+    return " ".join(
+        rng.sample(words, 5) + [f"w{rng.randrange(20000)}" for _ in range(2)]
+    )
+
+
+def bench(docs: int, queries: int, k: int, embedder: HashingEmbeddings) -> dict:
+    corpus = synthetic_corpus(docs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        vectors = embedder.embed_documents(corpus)
+        embed_seconds = time.perf_counter() - start
+
+        index = VectorIndex(Path(tmp), embedder.dimensions)
+        start = time.perf_counter()
+        index.add(range(1, docs + 1), [1] * docs, vectors)
+        index_seconds = time.perf_counter() - start
+
+        # One chat turn adds two messages: the incremental cost per turn,
+        # averaged so the occasional buffer doubling is amortized
+        turn = embedder.embed_documents(["new question here", "new answer there"])
+        start = time.perf_counter()
+        for i in range(TURNS):
+            id = docs + 2 * i + 1
+            index.add([id, id + 1], [2, 2], turn)
+        append_ms = (time.perf_counter() - start) * 1000 / TURNS
+
+        start = time.perf_counter()
+        VectorIndex(Path(tmp), embedder.dimensions, mmap=True)
+        mmap_load_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(1)
+        hits, latencies = 0, []
+        for _ in range(queries):
+            target = rng.randrange(docs)
+            query = make_query(corpus[target], rng)
+            start = time.perf_counter()
+            results = index.search(embedder.embed_query(query), k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(id == target + 1 for id, _ in results)
+
+    return {
+        "docs": docs,
+        f"recall@{k}": hits / queries,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "full_embed_s": embed_seconds + index_seconds,
+        "append_turn_ms": append_ms,
+        "mmap_load_ms": mmap_load_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=Config.Memory.TOP_K)
+    parser.add_argument("--dimensions", type=int, default=Config.Memory.DIMENSIONS)
+    args = parser.parse_args()
+
+    embedder = HashingEmbeddings(args.dimensions)
+    print(
+        f"{'docs':>8}{'recall@' + str(args.k):>11}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'full embed s':>14}{'append/turn ms':>16}{'mmap load ms':>14}"
+    )
+    for docs in args.docs:
+        r = bench(docs, args.queries, args.k, embedder)
+        print(
+            f"{r['docs']:>8}{r[f'recall@{args.k}']:>11.3f}{r['p50_ms']:>9.2f}"
+            f"{r['p99_ms']:>9.2f}{r['full_embed_s']:>14.2f}"
+            f"{r['append_turn_ms']:>16.2f}{r['mmap_load_ms']:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+End-to-end chat pipeline benchmark against a configurable fake model.
+
+Starts the real app (benchmarks.fake_server) in a uvicorn process on a
+local port, with the model swapped for a FakeStreamingLLM whose rate,
+chunk size, reasoning share, latency and failures are set from the
+command line. S concurrent sessions chat through AsyncNeuroMindClient and
+render each answer with the CLI's StreamView (to /dev/null), the same way
+app.py does. Nothing leaves the machine.
+
+Reported: chats/s and tokens/s, time to first token and inter-chunk gaps
+as seen by the client, database time from the server's /metrics, and
+client render time. Every run is written to JSON; pass an earlier file
+to --compare to see what changed.
+
+    python -m benchmarks.bench_pipeline --sessions 8 --turns 10 --failure-rate 0.05
+    python -m benchmarks.bench_pipeline --compare bench_results/pipeline-<stamp>.json
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.bench_render import make_console
+from benchmarks.common import percentile, serve_process
+from neuromind.client import AsyncNeuroMindClient, StreamEventType
+from neuromind.streaming import dumps, loads
+from neuromind.tokens import estimate_tokens
+from neuromind.ui_manager import StreamView, UIManager
+
+RESULTS_DIR = Path("bench_results")
+_SAMPLE = re.compile(r'^(\w+)_(sum|count)\{(\w+)="([^"]*)"\} (\S+)$')
+
+
+@dataclass
+class Samples:
+    ttft: List[float] = field(default_factory=list)
+    gaps: List[float] = field(default_factory=list)
+    turns: List[float] = field(default_factory=list)
+    render: List[float] = field(default_factory=list)
+    tokens: int = 0
+    errors: int = 0
+
+
+async def scrape(client: httpx.AsyncClient, metric: str) -> Dict[str, Dict[str, float]]:
+    """label value -> {"sum": ..., "count": ...} for one histogram of /metrics."""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    values: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for line in response.text.splitlines():
+        match = _SAMPLE.match(line)
+        if match and match[1] == metric:
+            values[match[4]][match[2]] = float(match[5])
+    return values
+
+
+def delta(after: dict, before: dict) -> Dict[str, Dict[str, float]]:
+    return {
+        label: {
+            kind: value - before.get(label, {}).get(kind, 0.0)
+            for kind, value in sample.items()
+        }
+        for label, sample in after.items()
+    }
+
+
+async def chat_session(
+    client: AsyncNeuroMindClient, thread: str, args, samples: Samples
+):
+    await client.get_or_create_thread(thread)
+    for turn in range(args.turns):
+        start = last = time.perf_counter()
+        first = True
+        view = None
+        if not args.no_render:
+            view = StreamView(make_console(), UIManager.REFRESH_PER_SECOND)
+            view.__enter__()
+        render = time.perf_counter() - start
+
+        async for event in client.stream_chat(thread, f"turn {turn}"):
+            now = time.perf_counter()
+            if event.type in (StreamEventType.REASONING, StreamEventType.CONTENT):
+                if first:
+                    samples.ttft.append(now - start)
+                    first = False
+                else:
+                    samples.gaps.append(now - last)
+                last = now
+                samples.tokens += estimate_tokens(event.content)
+                if view and event.type == StreamEventType.REASONING:
+                    view.add_reasoning(event.content)
+                elif view:
+                    view.add_content(event.content)
+                render += time.perf_counter() - now
+            elif event.type == StreamEventType.ERROR:
+                samples.errors += 1
+                break
+            elif event.type == StreamEventType.DONE:
+                break
+
+        before_exit = time.perf_counter()
+        if view:
+            view.__exit__(None, None, None)
+        samples.render.append(render + time.perf_counter() - before_exit)
+        samples.turns.append(time.perf_counter() - start)
+
+
+async def drive(base_url: str, args) -> dict:
+    samples = Samples()
+    async with httpx.AsyncClient(base_url=base_url) as metrics:
+        db_before = await scrape(metrics, "neuromind_db_query_seconds")
+        stages_before = await scrape(metrics, "neuromind_chat_stage_seconds")
+        async with AsyncNeuroMindClient(
+            base_url,
+            max_connections=args.sessions,
+            coalesce_ms=args.coalesce_ms,
+        ) as client:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    chat_session(client, f"bench-{i}", args, samples)
+                    for i in range(args.sessions)
+                )
+            )
+            elapsed = time.perf_counter() - start
+        db = delta(await scrape(metrics, "neuromind_db_query_seconds"), db_before)
+        stages = delta(
+            await scrape(metrics, "neuromind_chat_stage_seconds"), stages_before
+        )
+
+    chats = len(samples.turns)
+    db_seconds = sum(sample["sum"] for sample in db.values())
+
+    def ms(values: List[float], pct: float) -> float:
+        return round(percentile(values, pct) * 1000, 3)
+
+    return {
+        "chats": chats,
+        "errors": samples.errors,
+        "seconds": round(elapsed, 3),
+        "chats_per_sec": round(chats / elapsed, 2),
+        "tokens_per_sec": round(samples.tokens / elapsed, 1),
+        "turn_p50_ms": ms(samples.turns, 50),
+        "turn_p99_ms": ms(samples.turns, 99),
+        "ttft_p50_ms": ms(samples.ttft, 50),
+        "ttft_p99_ms": ms(samples.ttft, 99),
+        "chunk_gap_p50_ms": ms(samples.gaps, 50),
+        "chunk_gap_p99_ms": ms(samples.gaps, 99),
+        "db_ms_per_chat": round(db_seconds / chats * 1000, 3),
+        "db_queries_per_chat": round(
+            sum(sample["count"] for sample in db.values()) / chats, 1
+        ),
+        "render_ms_per_chat": round(sum(samples.render) / chats * 1000, 3),
+        "render_p99_ms": ms(samples.render, 99),
+        "db_ms_by_operation": {
+            op: round(sample["sum"] * 1000, 3)
+            for op, sample in sorted(db.items())
+            if sample["count"]
+        },
+        "stage_ms": {
+            stage: round(sample["sum"] * 1000, 3)
+            for stage, sample in sorted(stages.items())
+            if sample["count"]
+        },
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fake_env(args) -> Dict[str, str]:
+    return {
+        "NEUROMIND_FAKE_TOKENS": str(args.tokens),
+        "NEUROMIND_FAKE_TOKENS_PER_SEC": str(args.tokens_per_sec),
+        "NEUROMIND_FAKE_CHUNK_TOKENS": str(args.chunk_tokens),
+        "NEUROMIND_FAKE_REASONING_RATIO": str(args.reasoning_ratio),
+        "NEUROMIND_FAKE_LATENCY_MS": str(args.latency_ms),
+        "NEUROMIND_FAKE_FAILURE_RATE": str(args.failure_rate),
+        "NEUROMIND_FAKE_SEED": str(args.seed),
+    }
+
+
+def print_results(results: dict, previous: dict | None):
+    header = f"{'metric':<22}{'value':>12}"
+    print(header + (f"{'previous':>12}{'change':>10}" if previous else ""))
+    for name, value in results.items():
+        if isinstance(value, dict):
+            continue
+        line = f"{name:<22}{value:>12}"
+        old = previous.get(name) if previous else None
+        if isinstance(old, (int, float)):
+            change = f"{(value - old) / old * 100:+.1f}%" if old else "-"
+            line += f"{old:>12}{change:>10}"
+        print(line)
+    for group in ("db_ms_by_operation", "stage_ms"):
+        print(f"{group}: " + ", ".join(f"{k}={v}" for k, v in results[group].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per answer")
+    parser.add_argument(
+        "--tokens-per-sec", type=float, default=400.0, help="0 streams without delay"
+    )
+    parser.add_argument("--chunk-tokens", type=int, default=1)
+    parser.add_argument(
+        "--reasoning-ratio", type=float, default=0.0, help="share of reasoning tokens"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="delay before the first chunk"
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="share of turns that fail"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--coalesce-ms", type=int, default=0, help="server-side chunk coalescing window"
+    )
+    parser.add_argument("--no-render", action="store_true", help="skip StreamView")
+    parser.add_argument("--output", type=Path, help="JSON file to write")
+    parser.add_argument("--compare", type=Path, help="earlier JSON result to diff")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with serve_process(Path(tmp) / "bench.db", env=fake_env(args)) as base_url:
+            results = asyncio.run(drive(base_url, args))
+
+    now = datetime.now(timezone.utc)
+    run = {
+        "benchmark": "pipeline",
+        "timestamp": now.isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("output", "compare")
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"pipeline-{now:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(dumps(run) + b"\n")
+
+    previous = None
+    if args.compare:
+        previous_run = loads(args.compare.read_bytes())
+        if previous_run["config"] != run["config"]:
+            print("note: the compared run used a different configuration")
+        previous = previous_run["results"]
+
+    print(
+        f"sessions={args.sessions} turns={args.turns} tokens={args.tokens} "
+        f"rate={args.tokens_per_sec}/s commit={run['commit']}"
+    )
+    print_results(results, previous)
+    print(f"written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Prefill cost per turn versus thread length, with and without prefix reuse.
+
+One thread is driven for N turns through the real /chat endpoint against
+a fake model server that caches the last prompt per slot like Ollama and
+only prefills what follows the shared prefix.
+
+no cache       the model server re-prefills the whole prompt every turn
+sliding        server cache on, history window slides every turn (old behaviour)
+stable         server cache on, Config.PromptCache keeps the window stable
+
+    python -m benchmarks.bench_prefix --turns 40
+"""
+
+import argparse
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import temporary_database
+from benchmarks.fake_llm import FakeModelRegistry, PrefixCachingFakeLLM
+from neuromind.config import Config
+from neuromind.server import app, get_models
+
+MODES = {
+    "no cache": (False, False),
+    "sliding": (True, False),
+    "stable": (True, True),
+}
+
+
+def run(
+    turns: int, model_cache: bool, stable_prefix: bool, args
+) -> list[tuple[int, int]]:
+    llm = PrefixCachingFakeLLM(
+        tokens=args.answer_tokens,
+        prefill_tokens_per_sec=args.prefill_tokens_per_sec,
+        cache=model_cache,
+    )
+    app.dependency_overrides[get_models] = lambda: FakeModelRegistry(llm)
+    Config.PromptCache.ENABLED = stable_prefix
+
+    with temporary_database(), TestClient(app) as client:
+        for turn in range(turns):
+            question = f"question {turn}: " + "please explain this in detail " * 8
+            response = client.post("/threads/bench/chat", json={"content": question})
+            response.raise_for_status()
+    return llm.prefills
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--answer-tokens", type=int, default=150)
+    parser.add_argument("--prefill-tokens-per-sec", type=float, default=5000.0)
+    parser.add_argument("--every", type=int, default=5, help="print every Nth turn")
+    args = parser.parse_args()
+
+    Config.Summary.ENABLED = False
+    Config.Cache.ENABLED = False
+    Config.Memory.ENABLED = False
+    Config.WARM_UP_MODEL = False
+
+    results = {
+        name: run(args.turns, model_cache, stable, args)
+        for name, (model_cache, stable) in MODES.items()
+    }
+
+    to_ms = 1000 / args.prefill_tokens_per_sec
+    print("prefill ms per turn (prompt tokens evaluated)")
+    print(f"{'turn':>6}{'prompt':>8}" + "".join(f"{name:>20}" for name in MODES))
+    for turn in range(0, args.turns, args.every):
+        prompt = results["no cache"][turn][0]
+        cells = "".join(
+            f"{prefills[turn][1] * to_ms:>12.1f} ({prefills[turn][1]:>5})"
+            for prefills in results.values()
+        )
+        print(f"{turn + 1:>6}{prompt:>8}{cells}")
+
+    print(
+        f"{'total':>14}"
+        + "".join(
+            f"{sum(e for _, e in prefills) * to_ms / 1000:>19.2f}s"
+            for prefills in results.values()
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: replay a streamed markdown answer through the renderers.
+
+naive        re-parses and redraws the whole buffer on every token (old behaviour)
+incremental  StreamView redrawing the open tail block on every token
+throttled    StreamView at UIManager.REFRESH_PER_SECOND (real clock)
+
+    python -m benchmarks.bench_render --tokens 20000
+"""
+
+import argparse
+import itertools
+import os
+import time
+from typing import Iterator, List
+
+from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+
+from neuromind.ui_manager import StreamView, UIManager
+
+PARAGRAPH = (
+    "The scheduler keeps a **fair queue** per thread and hands out slots as "
+    "streams finish, so a single chatty thread cannot starve the others. "
+)
+CODE = (
+    "```python\n"
+    "async def worker(queue: asyncio.Queue) -> None:\n"
+    "    while True:\n"
+    "        item = await queue.get()\n"
+    "        await process(item)\n"
+    "        queue.task_done()\n"
+    "```\n\n"
+)
+LIST = "- first point\n- second point\n- third point\n\n"
+
+
+def synthetic_tokens(count: int) -> Iterator[str]:
+    """Split a markdown document into word-sized tokens, like a model stream."""
+    blocks = itertools.cycle([PARAGRAPH * 3 + "\n\n", CODE, LIST])
+    produced = 0
+    while produced < count:
+        for token in next(blocks).split(" "):
+            yield token + " " if not token.endswith("\n") else token
+            produced += 1
+            if produced >= count:
+                return
+
+
+def make_console() -> Console:
+    return Console(file=open(os.devnull, "w"), width=100, force_terminal=True)
+
+
+def run_naive(tokens: List[str]) -> float:
+    buffer = ""
+    start = time.perf_counter()
+    with Live(Markdown(""), console=make_console(), auto_refresh=False) as live:
+        for token in tokens:
+            buffer += token
+            live.update(Markdown(buffer), refresh=True)
+    return time.perf_counter() - start
+
+
+def run_stream_view(tokens: List[str], refresh_per_second: float) -> float:
+    start = time.perf_counter()
+    with StreamView(make_console(), refresh_per_second) as view:
+        for token in tokens:
+            view.add_content(token)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument(
+        "--naive-tokens",
+        type=int,
+        default=1000,
+        help="the naive renderer is quadratic; replay only this many tokens",
+    )
+    args = parser.parse_args()
+
+    tokens = list(synthetic_tokens(args.tokens))
+    results = {
+        f"naive ({args.naive_tokens} tokens)": run_naive(tokens[: args.naive_tokens]),
+        f"incremental ({len(tokens)} tokens)": run_stream_view(tokens, float("inf")),
+        f"throttled ({len(tokens)} tokens)": run_stream_view(
+            tokens, UIManager.REFRESH_PER_SECOND
+        ),
+    }
+    for name, elapsed in results.items():
+        count = int(name.split("(")[1].split()[0])
+        print(f"{name:<32}{elapsed:9.2f} s {count / elapsed:10.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Aggregate throughput and time to first token versus scheduler concurrency.
+
+N clients each send one /chat turn at once to a fake model server whose
+token rate is shared between concurrent generations and degrades with
+contention. "unlimited" disables the scheduler's bound, like calling the
+model directly.
+
+    python -m benchmarks.bench_scheduler --clients 10 --limits 1 2 4 8 0
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import percentile, serve, temporary_database
+from benchmarks.fake_llm import ContendedFakeLLM, FakeModelRegistry, SharedBackend
+from neuromind.config import Config
+from neuromind.server import app, get_models
+from neuromind.streaming import loads
+
+
+async def chat(client: httpx.AsyncClient, thread: str, ttfts: list[float]) -> int:
+    start = time.perf_counter()
+    chunks = 0
+    async with client.stream(
+        "POST", f"/threads/{thread}/chat", json={"content": "hello"}
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            if loads(line[5:])["type"] == "content":
+                if not chunks:
+                    ttfts.append(time.perf_counter() - start)
+                chunks += 1
+    return chunks
+
+
+async def run_clients(base_url: str, clients: int) -> tuple[int, float, list[float]]:
+    ttfts: list[float] = []
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=httpx.Limits(max_connections=clients), timeout=600
+    ) as client:
+        start = time.perf_counter()
+        chunks = await asyncio.gather(
+            *(chat(client, f"client-{i}", ttfts) for i in range(clients))
+        )
+        return sum(chunks), time.perf_counter() - start, ttfts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--contention", type=float, default=0.15)
+    parser.add_argument(
+        "--limits", type=int, nargs="+", default=[1, 2, 4, 8, 0], help="0 = unlimited"
+    )
+    args = parser.parse_args()
+
+    backend = SharedBackend(args.tokens_per_sec, args.contention)
+    llm = ContendedFakeLLM(backend, tokens=args.tokens)
+    app.dependency_overrides[get_models] = lambda: FakeModelRegistry(llm)
+    Config.Summary.ENABLED = False
+    Config.Cache.ENABLED = False
+    Config.Memory.ENABLED = False
+    Config.WARM_UP_MODEL = False
+
+    print(f"clients={args.clients} tokens={args.tokens} contention={args.contention}")
+    print(f"{'limit':>10}{'tokens/s':>10}{'wall s':>8}{'TTFT p50':>10}{'TTFT p99':>10}")
+    for limit in args.limits:
+        Config.Scheduler.MAX_CONCURRENCY = {
+            Config.MODEL.provider: limit or args.clients
+        }
+        with temporary_database(), serve(app) as base_url:
+            chunks, elapsed, ttfts = asyncio.run(run_clients(base_url, args.clients))
+        print(
+            f"{limit or 'unlimited':>10}{chunks / elapsed:>10.1f}{elapsed:>8.2f}"
+            f"{percentile(ttfts, 50):>10.2f}{percentile(ttfts, 99):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Cold start of the CLI and server entry points.
+
+Imports each entry module in a fresh interpreter under `-X importtime`
+and reports the median import time plus the packages that cost the most.
+Then measures what a user waits for: the time from launching
+`python app.py` to its first prompt (against a fake server), and from
+launching uvicorn to the server answering /health. Exits non-zero when
+the median time to prompt misses --target-ms.
+
+    python -m benchmarks.bench_startup --runs 5 --target-ms 500
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+import httpx
+
+from benchmarks.common import free_port, serve_process
+
+ENTRY_POINTS = ["app", "neuromind.server"]
+
+
+def import_profile(module: str) -> Tuple[float, Dict[str, float]]:
+    """Total import seconds of `module` and self seconds per top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, packages = 0.0, defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us) / 1e6
+        if name == module:
+            total = int(cumulative_us) / 1e6
+    return total, packages
+
+
+def time_to_prompt(base_url: str) -> float:
+    """Seconds from launching the CLI until it asks for input."""
+    start = time.perf_counter()
+    cli = subprocess.Popen(
+        [sys.executable, "app.py", "--server", base_url],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    output = b""
+    while b"User" not in output:
+        chunk = os.read(cli.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError("CLI exited before prompting")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    cli.communicate(b"/exit\n", timeout=30)
+    return elapsed
+
+
+def time_to_ready(database: Path) -> float:
+    """Seconds from launching uvicorn until the real server answers /health."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "neuromind.server:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "NEUROMIND_DATABASE_FILE": str(database)},
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        # Poll with bare connects: a client per attempt would take CPU from
+        # the starting server
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.01)
+        httpx.get(f"http://127.0.0.1:{port}/health", timeout=30).raise_for_status()
+        return time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="packages to list")
+    parser.add_argument(
+        "--target-ms", type=float, default=500.0, help="time-to-prompt budget"
+    )
+    args = parser.parse_args()
+
+    for module in ENTRY_POINTS:
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        totals = [total for total, _ in profiles]
+        # Package breakdown of the median run
+        _, packages = sorted(profiles, key=lambda p: p[0])[len(profiles) // 2]
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[: args.top]
+        print(f"import {module}: {statistics.median(totals) * 1000:.0f} ms")
+        for package, seconds in heaviest:
+            print(f"    {package:<24}{seconds * 1000:>8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ready = [time_to_ready(Path(tmp) / f"ready-{i}.db") for i in range(args.runs)]
+        with serve_process(Path(tmp) / "bench.db") as base_url:
+            prompt = [time_to_prompt(base_url) for _ in range(args.runs)]
+
+    ready_ms = statistics.median(ready) * 1000
+    prompt_ms = statistics.median(prompt) * 1000
+    print(f"server ready:    {ready_ms:>6.0f} ms")
+    print(f"time to prompt:  {prompt_ms:>6.0f} ms (target {args.target_ms:.0f} ms)")
+    sys.exit(0 if prompt_ms <= args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Requests/sec for GET /threads and GET /threads/{name}.
+
+Compares a ThreadManager built per request (the old get_db behaviour)
+against the shared, pooled instance created in the server lifespan.
+
+    python -m benchmarks.bench_threads --threads 50 --messages 20 --requests 2000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from neuromind.config import Config
+from neuromind.server import app, get_db
+from neuromind.thread_manager import ThreadManager
+
+
+def seed(db_path: Path, threads: int, messages: int):
+    db = ThreadManager(db_path)
+    for i in range(threads):
+        thread = db.get_or_create_thread(f"thread-{i}")
+        for j in range(messages):
+            db.add_message(thread.id, "human" if j % 2 == 0 else "ai", f"msg {j}")
+    db.close()
+
+
+def measure(client: TestClient, path: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+def run(mode: str, args: argparse.Namespace) -> dict[str, float]:
+    if mode == "per-request":
+        app.dependency_overrides[get_db] = lambda: ThreadManager(
+            Config.Path.DATABASE_FILE
+        )
+    else:
+        app.dependency_overrides.pop(get_db, None)
+
+    with TestClient(app) as client:
+        measure(client, "/threads", 50)  # warm-up
+        return {
+            "GET /threads": measure(client, "/threads", args.requests),
+            "GET /threads/{name}": measure(client, "/threads/thread-0", args.requests),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    Config.WARM_UP_MODEL = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.Path.DATABASE_FILE = Path(tmp) / "bench.db"
+        seed(Config.Path.DATABASE_FILE, args.threads, args.messages)
+
+        results = {mode: run(mode, args) for mode in ("per-request", "shared")}
+
+    print(f"{'endpoint':<24}{'per-request':>14}{'shared':>14}{'speedup':>10}")
+    for endpoint in results["shared"]:
+        before = results["per-request"][endpoint]
+        after = results["shared"][endpoint]
+        print(f"{endpoint:<24}{before:>12.0f}/s{after:>12.0f}/s{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Chat throughput of a multi-process server at 1, 2, 4 and 8 workers.
+
+Each run starts `uvicorn benchmarks.fake_server:app --workers N` (the
+production launch of start_server.py, with a fake model) on a fresh
+database, then drives S concurrent chat sessions for a fixed number of
+turns. Every turn is a real /chat stream plus its database writes, which
+go through the cross-process write lock. Worker processes can only help
+as far as there are CPU cores to run them.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --sessions 32
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import percentile, serve_process
+
+
+async def chat_session(
+    client: httpx.AsyncClient, thread: str, turns: int, latencies: list[float]
+):
+    for turn in range(turns):
+        start = time.perf_counter()
+        async with client.stream(
+            "POST",
+            f"/threads/{thread}/chat",
+            json={"content": f"turn {turn}"},
+            headers={"Accept": "application/x-ndjson"},
+        ) as response:
+            response.raise_for_status()
+            async for _ in response.aiter_lines():
+                pass
+        latencies.append(time.perf_counter() - start)
+
+
+async def drive(base_url: str, sessions: int, turns: int) -> list[float]:
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=sessions)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120
+    ) as client:
+        await asyncio.gather(
+            *(chat_session(client, f"s{i}", turns, latencies) for i in range(sessions))
+        )
+    return latencies
+
+
+def run(workers: int, args) -> dict:
+    env = {
+        "NEUROMIND_FAKE_TOKENS": str(args.tokens),
+        "NEUROMIND_FAKE_TOKENS_PER_SEC": str(args.tokens_per_sec),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        with serve_process(Path(tmp) / "bench.db", workers, env) as base_url:
+            start = time.perf_counter()
+            latencies = asyncio.run(drive(base_url, args.sessions, args.turns))
+            elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "chats_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument(
+        "--tokens-per-sec", type=float, default=0.0, help="0 streams without delay"
+    )
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} sessions={args.sessions} turns={args.turns}")
+    print(f"{'workers':>8}{'chats/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'speedup':>10}")
+    baseline = None
+    for workers in args.workers:
+        r = run(workers, args)
+        baseline = baseline or r["chats_per_sec"]
+        print(
+            f"{r['workers']:>8}{r['chats_per_sec']:>10.1f}{r['p50_ms']:>10.1f}"
+            f"{r['p99_ms']:>10.1f}{r['chats_per_sec'] / baseline:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import httpx
+import uvicorn
+
+from neuromind.config import Config
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def temporary_database() -> Iterator[Path]:
+    """Point Config.Path.DATABASE_FILE at a throwaway database."""
+    original = Config.Path.DATABASE_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.Path.DATABASE_FILE = Path(tmp) / "bench.db"
+        try:
+            yield Config.Path.DATABASE_FILE
+        finally:
+            Config.Path.DATABASE_FILE = original
+
+
+@contextlib.contextmanager
+def serve(app, port: int | None = None) -> Iterator[str]:
+    """Run an ASGI app with uvicorn on a background thread, yield its base URL."""
+    port = port or free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+@contextlib.contextmanager
+def serve_process(
+    database: Path, workers: int = 1, env: Dict[str, str] | None = None
+) -> Iterator[str]:
+    """
+    Run benchmarks.fake_server in a uvicorn subprocess on a local port,
+    yield its base URL. `env` configures the fake model.
+    """
+    port = free_port()
+    env = {
+        **os.environ,
+        **(env or {}),
+        "NEUROMIND_WORKERS": str(workers),
+        "NEUROMIND_DATABASE_FILE": str(database),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "benchmarks.fake_server:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).is_success:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise RuntimeError("server did not start")
+            time.sleep(0.1)
+        # Give the remaining workers time to finish their lifespan
+        time.sleep(0.5 * (workers - 1))
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import random
+from typing import AsyncIterator, List
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from neuromind.tokens import estimate_tokens
+
+
+class FakeStreamingLLM:
+    """
+    Deterministic stand-in for a LangChain chat model.
+    Streams reasoning_tokens reasoning tokens followed by tokens content
+    tokens at a fixed rate, chunk_tokens tokens per chunk, after an initial
+    latency. With a failure_rate, that share of calls raises part way
+    through; which calls fail and where follows from the seed alone.
+    """
+
+    def __init__(
+        self,
+        tokens: int = 200,
+        tokens_per_sec: float = 200.0,
+        reasoning_tokens: int = 0,
+        token: str = "tok ",
+        chunk_tokens: int = 1,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.tokens = tokens
+        self.tokens_per_sec = tokens_per_sec
+        self.reasoning_tokens = reasoning_tokens
+        self.token = token
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.calls = 0
+
+    def _failure_point(self) -> int | None:
+        """Index of the chunk this call fails before, None if it succeeds."""
+        rng = random.Random(self.seed * 1_000_003 + self.calls)
+        self.calls += 1
+        if rng.random() >= self.failure_rate:
+            return None
+        chunks = -(-(self.reasoning_tokens + self.tokens) // self.chunk_tokens)
+        return rng.randrange(chunks + 1)
+
+    async def astream(
+        self, messages: List[BaseMessage]
+    ) -> AsyncIterator[AIMessageChunk]:
+        fail_at = self._failure_point()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        delay = self.chunk_tokens / self.tokens_per_sec if self.tokens_per_sec else 0
+        total = self.reasoning_tokens + self.tokens
+        for chunk, start in enumerate(range(0, total, self.chunk_tokens)):
+            if chunk == fail_at:
+                raise RuntimeError("Injected model failure")
+            if delay:
+                await asyncio.sleep(delay)
+            # A chunk never mixes reasoning and answer text
+            end = min(start + self.chunk_tokens, total)
+            reasoning = max(0, min(end, self.reasoning_tokens) - start)
+            if reasoning:
+                yield AIMessageChunk(
+                    content="",
+                    additional_kwargs={"reasoning_content": self.token * reasoning},
+                )
+            if end - start > reasoning:
+                yield AIMessageChunk(content=self.token * (end - start - reasoning))
+        if fail_at is not None and fail_at * self.chunk_tokens >= total:
+            raise RuntimeError("Injected model failure")
+
+    async def ainvoke(self, messages: List[BaseMessage]) -> AIMessage:
+        # Same pace as streaming, like a real model server
+        chunks = [chunk.content async for chunk in self.astream(messages)]
+        return AIMessage(content="".join(chunks))
+
+
+class FakeModelRegistry:
+    """ModelRegistry replacement that hands out the same fake model for every config."""
+
+    def __init__(self, llm: FakeStreamingLLM):
+        self.llm = llm
+
+    def get(self, model, reasoning: bool = True) -> FakeStreamingLLM:
+        return self.llm
+
+    async def warm_up(self, model, scheduler):
+        pass
+
+
+class SharedBackend:
+    """
+    A single model server shared by all requests, like one local Ollama.
+    Its token rate is split between concurrent generations, and every extra
+    generation costs `contention` of the total (batch and KV cache thrash).
+    """
+
+    def __init__(self, tokens_per_sec: float = 200.0, contention: float = 0.15):
+        self.tokens_per_sec = tokens_per_sec
+        self.contention = contention
+        self.active = 0
+
+    def token_delay(self) -> float:
+        active = max(self.active, 1)
+        efficiency = 1 / (1 + self.contention * (active - 1))
+        return active / (self.tokens_per_sec * efficiency)
+
+
+class ContendedFakeLLM(FakeStreamingLLM):
+    """FakeStreamingLLM whose pace depends on the load of a SharedBackend."""
+
+    def __init__(self, backend: SharedBackend, tokens: int = 200, token: str = "tok "):
+        super().__init__(tokens=tokens, tokens_per_sec=0, token=token)
+        self.backend = backend
+
+    async def astream(
+        self, messages: List[BaseMessage]
+    ) -> AsyncIterator[AIMessageChunk]:
+        self.backend.active += 1
+        try:
+            for _ in range(self.tokens):
+                await asyncio.sleep(self.backend.token_delay())
+                yield AIMessageChunk(content=self.token)
+        finally:
+            self.backend.active -= 1
+
+
+class PrefixCachingFakeLLM(FakeStreamingLLM):
+    """
+    FakeStreamingLLM that models a server-side prompt cache like Ollama's:
+    each of `slots` slots keeps the last prompt plus answer it processed,
+    and only the part of a new prompt after the longest shared prefix is
+    prefilled. Prefill time and evaluated tokens are reported in the final
+    chunk's response_metadata, like ChatOllama does.
+    """
+
+    def __init__(
+        self,
+        tokens: int = 100,
+        prefill_tokens_per_sec: float = 5000.0,
+        slots: int = 1,
+        cache: bool = True,
+    ):
+        super().__init__(tokens=tokens, tokens_per_sec=0)
+        self.prefill_tokens_per_sec = prefill_tokens_per_sec
+        self.cache = cache
+        self._slots: List[str] = [""] * slots
+        # (prompt tokens, evaluated tokens) per call
+        self.prefills: List[tuple[int, int]] = []
+
+    @staticmethod
+    def _render(messages: List[BaseMessage]) -> str:
+        return "".join(f"<{m.type}>{m.content}" for m in messages) + "<ai>"
+
+    async def astream(
+        self, messages: List[BaseMessage]
+    ) -> AsyncIterator[AIMessageChunk]:
+        prompt = self._render(messages)
+        shared = [len(os.path.commonprefix([slot, prompt])) for slot in self._slots]
+        slot = max(range(len(shared)), key=shared.__getitem__)
+        reused = shared[slot] if self.cache else 0
+
+        prompt_tokens = estimate_tokens(prompt)
+        evaluated = prompt_tokens - reused // 4
+        await asyncio.sleep(evaluated / self.prefill_tokens_per_sec)
+        self.prefills.append((prompt_tokens, evaluated))
+
+        answer = self.token * self.tokens
+        for _ in range(self.tokens):
+            yield AIMessageChunk(content=self.token)
+        self._slots[slot] = prompt + answer
+        yield AIMessageChunk(
+            content="",
+            response_metadata={
+                "prompt_eval_count": evaluated,
+                "prompt_eval_duration": int(
+                    evaluated / self.prefill_tokens_per_sec * 1e9
+                ),
+            },
+        )
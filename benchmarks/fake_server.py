@@ -0,0 +1,41 @@
+"""
+The NeuroMind app with a fake model, for benchmarks that run real server
+processes (uvicorn --workers). Every worker imports this module, so the
+fake is configured through environment variables:
+
+NEUROMIND_FAKE_TOKENS           tokens per answer (default 50)
+NEUROMIND_FAKE_TOKENS_PER_SEC   streaming rate, 0 for as fast as possible
+NEUROMIND_FAKE_CHUNK_TOKENS     tokens per streamed chunk (default 1)
+NEUROMIND_FAKE_REASONING_RATIO  share of the tokens that are reasoning (default 0)
+NEUROMIND_FAKE_LATENCY_MS       delay before the first chunk (default 0)
+NEUROMIND_FAKE_FAILURE_RATE     share of calls that fail mid-stream (default 0)
+NEUROMIND_FAKE_SEED             seed for which calls fail (default 0)
+
+    NEUROMIND_DATABASE_FILE=/tmp/b.db uvicorn benchmarks.fake_server:app --workers 4
+"""
+
+import os
+
+from benchmarks.fake_llm import FakeModelRegistry, FakeStreamingLLM
+from neuromind.config import Config
+from neuromind.server import app, get_models
+
+Config.Summary.ENABLED = False
+Config.Cache.ENABLED = False
+Config.Memory.ENABLED = False
+Config.WARM_UP_MODEL = False
+# The fake takes any load; only the server is measured
+Config.Scheduler.MAX_CONCURRENCY = {Config.MODEL.provider: 100_000}
+
+tokens = int(os.getenv("NEUROMIND_FAKE_TOKENS", 50))
+reasoning_tokens = round(tokens * float(os.getenv("NEUROMIND_FAKE_REASONING_RATIO", 0)))
+llm = FakeStreamingLLM(
+    tokens=tokens - reasoning_tokens,
+    tokens_per_sec=float(os.getenv("NEUROMIND_FAKE_TOKENS_PER_SEC", 0)),
+    reasoning_tokens=reasoning_tokens,
+    chunk_tokens=int(os.getenv("NEUROMIND_FAKE_CHUNK_TOKENS", 1)),
+    latency=float(os.getenv("NEUROMIND_FAKE_LATENCY_MS", 0)) / 1000,
+    failure_rate=float(os.getenv("NEUROMIND_FAKE_FAILURE_RATE", 0)),
+    seed=int(os.getenv("NEUROMIND_FAKE_SEED", 0)),
+)
+app.dependency_overrides[get_models] = lambda: FakeModelRegistry(llm)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Load test: N concurrent /chat streams against a fake LLM.
+
+Reports p50/p99 inter-chunk latency as seen by the clients. Database
+writes that block the event loop show up as p99 spikes.
+
+    python -m benchmarks.load_chat --streams 50 --turns 5 --tokens 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import percentile, serve, temporary_database
+from benchmarks.fake_llm import FakeModelRegistry, FakeStreamingLLM
+from neuromind.config import Config
+from neuromind.server import app, get_models
+
+
+async def chat_session(
+    client: httpx.AsyncClient, thread: str, turns: int, gaps: list[float]
+):
+    for turn in range(turns):
+        last = None
+        async with client.stream(
+            "POST", f"/threads/{thread}/chat", json={"content": f"turn {turn}"}
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                now = time.perf_counter()
+                if last is not None:
+                    gaps.append(now - last)
+                last = now
+
+
+async def run_load(base_url: str, streams: int, turns: int) -> list[float]:
+    gaps: list[float] = []
+    limits = httpx.Limits(max_connections=streams)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120
+    ) as client:
+        await asyncio.gather(
+            *(chat_session(client, f"load-{i}", turns, gaps) for i in range(streams))
+        )
+    return gaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    args = parser.parse_args()
+
+    llm = FakeStreamingLLM(tokens=args.tokens, tokens_per_sec=args.tokens_per_sec)
+    app.dependency_overrides[get_models] = lambda: FakeModelRegistry(llm)
+    Config.Summary.ENABLED = False
+    Config.Cache.ENABLED = False
+    Config.WARM_UP_MODEL = False
+    # Measure the event loop, not time spent waiting for an inference slot
+    Config.Scheduler.MAX_CONCURRENCY = {Config.MODEL.provider: args.streams}
+
+    with temporary_database(), serve(app) as base_url:
+        start = time.perf_counter()
+        gaps = asyncio.run(run_load(base_url, args.streams, args.turns))
+        elapsed = time.perf_counter() - start
+
+    expected = 1000 / args.tokens_per_sec if args.tokens_per_sec else 0
+    print(f"streams={args.streams} turns={args.turns} tokens={args.tokens}")
+    print(f"wall time          {elapsed:8.2f} s")
+    print(f"chunks             {len(gaps):8d}")
+    print(f"expected gap       {expected:8.2f} ms")
+    print(f"inter-chunk p50    {percentile(gaps, 50) * 1000:8.2f} ms")
+    print(f"inter-chunk p99    {percentile(gaps, 99) * 1000:8.2f} ms")
+    print(f"inter-chunk max    {max(gaps, default=0) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
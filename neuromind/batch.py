@@ -0,0 +1,416 @@
+"""
+Batch jobs: JSONL files of prompts run through the chat pipeline by a
+bounded pool of workers, for bulk and offline processing.
+
+Results are appended to a JSONL file as items finish. That file is also
+what resuming relies on: when a job is restarted (after a crash or a
+server restart) items whose index is already in it are skipped. An
+item's exchange is committed together with a batch_turn row, so an item
+whose turn was stored but whose result line was not is never run (and
+added to its thread) twice: its line is written from that row.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Awaitable, Callable, Collection, Dict, Iterable, List, Tuple
+
+from langchain_core.messages import BaseMessage
+from sqlmodel import Field, Session, SQLModel, col, select
+
+from neuromind.config import MODELS, Config, ModelConfig
+from neuromind.db_writer import DatabaseWriter
+from neuromind.locks import FileLock
+from neuromind.models import ModelRegistry
+from neuromind.scheduler import InferenceScheduler
+from neuromind.streaming import dumps, loads
+from neuromind.storage import CompressedText
+from neuromind.thread_manager import Thread, ThreadManager
+
+logger = logging.getLogger(__name__)
+
+
+class BatchStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class BatchJob(SQLModel, table=True):
+    """A submitted batch and its progress."""
+
+    __tablename__ = "batch_job"
+
+    id: str = Field(primary_key=True)
+    status: BatchStatus = BatchStatus.QUEUED
+    total: int
+    completed: int = 0
+    failed: int = 0
+    concurrency: int
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+class BatchTurn(SQLModel, table=True):
+    """The answer of a batch item, committed with its messages."""
+
+    __tablename__ = "batch_turn"
+
+    job_id: str = Field(primary_key=True)
+    index: int = Field(primary_key=True)
+    response: str = Field(sa_type=CompressedText)
+
+
+@dataclass
+class BatchItem:
+    thread: str
+    prompt: str
+    # None: the thread's own, or the defaults for a new thread. An item
+    # naming another persona or model than its existing thread's fails.
+    persona: str | None = None
+    model: str | None = None
+
+
+def parse_items(
+    lines: Iterable[str], personas: Collection[str] | None = None
+) -> List[BatchItem]:
+    """
+    Parse JSONL lines into items, ValueError names the offending line.
+    Personas are checked against `personas` when given.
+    """
+    items = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = loads(line)
+            persona = data.get("persona")
+            item = BatchItem(
+                thread=str(data["thread"]),
+                prompt=str(data["prompt"]),
+                persona=None if persona is None else str(persona),
+                model=data.get("model"),
+            )
+        except KeyError as e:
+            raise ValueError(f"line {number}: missing field {e}") from e
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"line {number}: {e}") from e
+        if not item.thread or not item.prompt:
+            raise ValueError(f"line {number}: thread and prompt must not be empty")
+        known = personas is None or item.persona is None or item.persona in personas
+        if not known:
+            raise ValueError(f"line {number}: unknown persona {item.persona}")
+        if item.model is not None and item.model not in MODELS:
+            raise ValueError(f"line {number}: unknown model {item.model}")
+        items.append(item)
+    return items
+
+
+# (thread, prompt) -> (context, model)
+PrepareTurn = Callable[[Thread, str], Tuple[List[BaseMessage], ModelConfig]]
+AfterTurn = Callable[[int], Awaitable[None]]
+
+
+class BatchRunner:
+    """
+    Runs batch jobs in the background, each with its own pool of workers.
+    Items of the same thread run one after another so its history stays
+    in order; different threads run concurrently. With several server
+    processes, a job runs in the one holding its lock file.
+    """
+
+    def __init__(
+        self,
+        db: ThreadManager,
+        writer: DatabaseWriter,
+        models: ModelRegistry,
+        scheduler: InferenceScheduler,
+        prepare_turn: PrepareTurn,
+        after_turn: AfterTurn | None = None,
+    ):
+        self.db = db
+        self.writer = writer
+        self.models = models
+        self.scheduler = scheduler
+        self.prepare_turn = prepare_turn
+        self.after_turn = after_turn
+        database = Path(db.engine.url.database)
+        self.directory = database.with_name(f"{database.stem}-batches")
+        self._tasks: Dict[str, asyncio.Task] = {}
+        BatchJob.__table__.create(db.engine, checkfirst=True)
+        BatchTurn.__table__.create(db.engine, checkfirst=True)
+
+    def _input_path(self, job_id: str) -> Path:
+        return self.directory / job_id / "input.jsonl"
+
+    def results_path(self, job_id: str) -> Path:
+        return self.directory / job_id / "results.jsonl"
+
+    def get(self, job_id: str) -> BatchJob | None:
+        with Session(self.db.engine) as session:
+            return session.get(BatchJob, job_id)
+
+    def list(self) -> List[BatchJob]:
+        with Session(self.db.engine) as session:
+            return session.exec(
+                select(BatchJob).order_by(col(BatchJob.created_at).desc())
+            ).all()
+
+    def _save(self, job: BatchJob) -> BatchJob:
+        with Session(self.db.engine) as session:
+            job = session.merge(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    def _update(
+        self, job_id: str, values: dict, only_if: BatchStatus | None = None
+    ) -> BatchJob:
+        """Set values on the job, unless it is no longer in status only_if."""
+        with Session(self.db.engine) as session:
+            job = session.get(BatchJob, job_id)
+            if only_if is not None and job.status != only_if:
+                return job
+            for name, value in values.items():
+                setattr(job, name, value)
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    def _write_input(self, job_id: str, items: List[BatchItem]):
+        path = self._input_path(job_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            for item in items:
+                f.write(dumps(asdict(item)) + b"\n")
+
+    def _read_input(self, job_id: str) -> List[BatchItem]:
+        with open(self._input_path(job_id)) as f:
+            return parse_items(f)
+
+    def _finished_items(self, job_id: str) -> Dict[int, bool]:
+        """index -> succeeded for items already in the results file."""
+        path = self.results_path(job_id)
+        if not path.exists():
+            return {}
+
+        finished, valid_bytes = {}, 0
+        with open(path, "rb") as f:
+            for line in f:
+                # A crash can leave a partially written last line
+                if not line.endswith(b"\n"):
+                    break
+                result = loads(line)
+                finished[result["index"]] = result["error"] is None
+                valid_bytes += len(line)
+        if valid_bytes != path.stat().st_size:
+            with open(path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return finished
+
+    def _stored_turns(self, job_id: str) -> Dict[int, str]:
+        """index -> response of the items whose exchange is in the database."""
+        with Session(self.db.engine) as session:
+            rows = session.exec(
+                select(BatchTurn.index, BatchTurn.response).where(
+                    BatchTurn.job_id == job_id
+                )
+            ).all()
+            return dict(rows)
+
+    async def create(
+        self,
+        items: List[BatchItem],
+        concurrency: int,
+        models: ModelRegistry | None = None,
+    ) -> BatchJob:
+        job = BatchJob(
+            id=uuid.uuid4().hex[:12],
+            total=len(items),
+            concurrency=concurrency,
+            created_at=datetime.now(timezone.utc),
+        )
+        await asyncio.to_thread(self._write_input, job.id, items)
+        job = await self.writer.submit(self._save, job)
+        self._start(job.id, models or self.models)
+        return job
+
+    def resume(self):
+        """Restart jobs that were queued or running when the server stopped."""
+        for job in self.list():
+            if job.status in (BatchStatus.QUEUED, BatchStatus.RUNNING):
+                logger.info(f"Resuming batch {job.id}")
+                self._start(job.id, self.models)
+
+    async def cancel(self, job_id: str) -> BatchJob | None:
+        job = await asyncio.to_thread(self.get, job_id)
+        if job is None or job.status in (BatchStatus.COMPLETED, BatchStatus.CANCELLED):
+            return job
+
+        task = self._tasks.pop(job_id, None)
+        if task:
+            task.cancel()
+        return await self.writer.submit(
+            self._update,
+            job_id,
+            {
+                "status": BatchStatus.CANCELLED,
+                "finished_at": datetime.now(timezone.utc),
+            },
+        )
+
+    async def close(self):
+        """Stop all workers; unfinished jobs are resumed on the next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job_id: str, models: ModelRegistry):
+        lock = FileLock(self.directory / job_id / "lock")
+        if not lock.acquire(blocking=False):
+            return  # Another worker process runs it
+        task = asyncio.create_task(self._run(job_id, models))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda task: self._finished(job_id, task, lock))
+
+    def _finished(self, job_id: str, task: asyncio.Task, lock: FileLock):
+        self._tasks.pop(job_id, None)
+        lock.release()
+        if not task.cancelled() and task.exception():
+            logger.error(f"Batch {job_id} stopped", exc_info=task.exception())
+
+    async def _run(self, job_id: str, models: ModelRegistry):
+        job = await asyncio.to_thread(self.get, job_id)
+        items = await asyncio.to_thread(self._read_input, job_id)
+        finished = await asyncio.to_thread(self._finished_items, job_id)
+        stored = await asyncio.to_thread(self._stored_turns, job_id)
+        # Stored before a crash, but the result line was never written
+        recovered = [
+            {
+                "index": index,
+                **asdict(items[index]),
+                "response": response,
+                "error": None,
+                "elapsed": None,
+            }
+            for index, response in sorted(stored.items())
+            if index not in finished
+        ]
+        if recovered:
+            with open(self.results_path(job_id), "ab") as results:
+                results.writelines(dumps(result) + b"\n" for result in recovered)
+            finished.update((result["index"], True) for result in recovered)
+        completed = sum(finished.values())
+        failed = len(finished) - completed
+        await self.writer.submit(
+            self._update,
+            job_id,
+            {"status": BatchStatus.RUNNING, "completed": completed, "failed": failed},
+        )
+
+        pending: asyncio.Queue[int] = asyncio.Queue()
+        for index in range(len(items)):
+            if index not in finished:
+                pending.put_nowait(index)
+        thread_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        cancelled = asyncio.Event()
+
+        with open(self.results_path(job_id), "ab") as results:
+
+            async def worker():
+                nonlocal completed, failed
+                while not pending.empty() and not cancelled.is_set():
+                    index = pending.get_nowait()
+                    item = items[index]
+                    async with thread_locks[item.thread]:
+                        result = await self._process(job_id, index, item, models)
+                    results.write(dumps(result) + b"\n")
+                    results.flush()
+                    if result["error"] is None:
+                        completed += 1
+                    else:
+                        failed += 1
+                    progress = await self.writer.submit(
+                        self._update, job_id, {"completed": completed, "failed": failed}
+                    )
+                    # DELETE /batch/{id} may have been served by another process
+                    if progress.status == BatchStatus.CANCELLED:
+                        cancelled.set()
+
+            await asyncio.gather(*(worker() for _ in range(job.concurrency)))
+
+        if cancelled.is_set():
+            return
+
+        # A cancel served by another process since the last progress update
+        # must not be overwritten
+        job = await self.writer.submit(
+            self._update,
+            job_id,
+            {
+                "status": BatchStatus.COMPLETED,
+                "finished_at": datetime.now(timezone.utc),
+            },
+            BatchStatus.RUNNING,
+        )
+        if job.status != BatchStatus.COMPLETED:
+            return
+        logger.info(f"Batch {job_id} finished: {completed} ok, {failed} failed")
+
+    async def _process(
+        self, job_id: str, index: int, item: BatchItem, models: ModelRegistry
+    ) -> dict:
+        start = time.perf_counter()
+        result = {"index": index, **asdict(item), "response": None, "error": None}
+        try:
+            thread = await asyncio.to_thread(self.db.get_thread, item.thread)
+            if not thread:
+                thread = await self.writer.submit(
+                    self.db.get_or_create_thread,
+                    item.thread,
+                    item.persona or Config.Personas.DEFAULT,
+                    item.model,
+                )
+            elif item.persona is not None and item.persona != thread.persona:
+                raise ValueError(
+                    f"thread {item.thread} has persona {thread.persona}, "
+                    f"not {item.persona}"
+                )
+            elif item.model is not None and item.model != thread.model:
+                raise ValueError(
+                    f"thread {item.thread} uses model {thread.model or 'default'}, "
+                    f"not {item.model}"
+                )
+            context, model = await asyncio.to_thread(
+                self.prepare_turn, thread, item.prompt
+            )
+            llm = await asyncio.to_thread(models.get, model)
+            # One fair-queue key per job: interactive chats keep their turn
+            async with self.scheduler.slot(model.provider, f"batch:{job_id}"):
+                response = await llm.ainvoke(context)
+            result["response"] = response.text
+            await self.writer.submit(
+                self.db.add_exchange,
+                thread.id,
+                item.prompt,
+                response.text,
+                False,
+                response.additional_kwargs.get("reasoning_content", ""),
+                [BatchTurn(job_id=job_id, index=index, response=response.text)],
+            )
+            if self.after_turn:
+                await self.after_turn(thread.id)
+        except Exception as e:
+            logger.warning(f"Batch {job_id} item {index} failed: {e}")
+            result["error"] = str(e)
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+        return result
@@ -1,14 +1,35 @@
-import json
+import asyncio
+import importlib.util
+import itertools
+import threading
 from dataclasses import dataclass
 from enum import Enum
-from typing import Generator, List, Tuple
+from queue import Empty, SimpleQueue
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Tuple,
+)
 
 import httpx
 
-from neuromind.config import Persona
+from neuromind.config import Config
+from neuromind.streaming import StreamFormat, dumps, loads
+
+
+class StreamTransport(str, Enum):
+    # One streamed HTTP request per chat turn
+    HTTP = "http"
+    # Every turn of the client multiplexed over one /ws connection
+    WEBSOCKET = "websocket"
 
 
 class StreamEventType(str, Enum):
+    QUEUED = "queued"
     REASONING = "reasoning"
     CONTENT = "content"
     DONE = "done"
@@ -20,6 +41,44 @@ class ThreadInfo:
     id: int
     name: str
     persona: str
+    model: str | None = None
+    # Set for forks: the thread whose messages up to fork_message_id it shares
+    parent_id: int | None = None
+    fork_message_id: int | None = None
+
+
+@dataclass
+class MessageInfo:
+    id: int
+    role: str
+    content: str
+    truncated: bool = False
+
+
+@dataclass
+class SearchHit:
+    thread: str
+    persona: str
+    message_id: int
+    role: str
+    snippet: str
+    rank: float
+
+
+@dataclass
+class BatchInfo:
+    id: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    concurrency: int
+    created_at: str
+    finished_at: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled")
 
 
 @dataclass
@@ -30,6 +89,10 @@ class StreamEvent:
     content: str = ""
     error: str | None = None
     message: str | None = None
+    # Place in the server's inference queue, for QUEUED events
+    position: int | None = None
+    # DONE of a cancelled generation
+    truncated: bool = False
 
 
 class APIError(Exception):
@@ -41,17 +104,475 @@ class APIError(Exception):
         super().__init__(message)
 
 
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _client_options(
+    base_url: str,
+    timeout: int,
+    max_connections: int,
+    max_keepalive_connections: int,
+    http2: bool | None,
+) -> dict:
+    options = {
+        "base_url": base_url,
+        "timeout": timeout,
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive
+        "http2": _http2_available() if http2 is None else http2,
+    }
+    # Building the TLS context (CA bundle) takes tens of milliseconds; skip
+    # it only when the server is plain HTTP, redirects are not followed anyway
+    if httpx.URL(base_url).scheme == "http":
+        options["verify"] = False
+    return options
+
+
+def _thread_info(data: dict) -> ThreadInfo:
+    return ThreadInfo(
+        id=data["id"],
+        name=data["name"],
+        persona=data["persona"],
+        model=data.get("model"),
+        parent_id=data.get("parent_id"),
+        fork_message_id=data.get("fork_message_id"),
+    )
+
+
+def _raise_for_status(response: httpx.Response, *detailed: int):
+    """raise_for_status, but `detailed` statuses raise APIError with the reason."""
+    if response.status_code in detailed:
+        raise APIError(response.json()["detail"], response.status_code)
+    response.raise_for_status()
+
+
+def _fork_params(at: int | None) -> dict:
+    return {} if at is None else {"at": at}
+
+
+def _thread_create_payload(name: str, persona: str, model: str | None) -> dict:
+    return {"name": name, "persona": persona, "model": model}
+
+
+def _search_params(
+    query: str, thread: str | None, persona: str | None, limit: int
+) -> dict:
+    params = {"q": query, "limit": limit}
+    if thread:
+        params["thread"] = thread
+    if persona:
+        params["persona"] = persona
+    return params
+
+
+def _cancel_params(save_partial: bool | None) -> dict:
+    if save_partial is None:
+        return {}
+    return {"save_partial": str(save_partial).lower()}
+
+
+def _batch_params(concurrency: int | None) -> dict:
+    return {} if concurrency is None else {"concurrency": concurrency}
+
+
+def _batch_info(response: httpx.Response) -> BatchInfo:
+    if response.status_code == 422:
+        raise APIError(response.json()["detail"], 422)
+    response.raise_for_status()
+    return BatchInfo(**response.json())
+
+
+def _reasoning(response: httpx.Response) -> str | None:
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()["content"]
+
+
+def _message_info(data: dict) -> MessageInfo:
+    return MessageInfo(
+        id=data["id"],
+        role=data["role"],
+        content=data["content"],
+        truncated=data.get("truncated", False),
+    )
+
+
+def _parse_event(event_data: dict) -> StreamEvent | None:
+    event_type = event_data.get("type", "unknown")
+    if event_type == "queued":
+        return StreamEvent(type=StreamEventType.QUEUED, position=event_data["position"])
+    elif event_type == "reasoning":
+        return StreamEvent(
+            type=StreamEventType.REASONING, content=event_data["content"]
+        )
+    elif event_type == "content":
+        return StreamEvent(type=StreamEventType.CONTENT, content=event_data["content"])
+    elif event_type == "error":
+        return StreamEvent(
+            type=StreamEventType.ERROR,
+            error=event_data.get("error"),
+            message=event_data.get("message"),
+        )
+    elif event_type == "done":
+        return StreamEvent(
+            type=StreamEventType.DONE, truncated=event_data.get("truncated", False)
+        )
+    return None
+
+
+def _decode_line(line: str, stream_format: StreamFormat) -> StreamEvent | None:
+    """Convert one SSE or NDJSON line into a StreamEvent, None if unrecognized."""
+    if stream_format == StreamFormat.SSE:
+        if not line.startswith("data:"):
+            return None
+        line = line[5:]
+
+    if not line.strip():
+        return None
+
+    try:
+        return _parse_event(loads(line))
+    except ValueError:
+        return None
+
+
+def _chat_request(
+    thread_name: str, content: str, stream_format: StreamFormat, coalesce_ms: int
+) -> dict:
+    return {
+        "url": f"/threads/{thread_name}/chat",
+        "json": {"content": content},
+        # The server falls back to SSE if it doesn't speak the preferred format
+        "headers": {"Accept": f"{stream_format.value}, {StreamFormat.SSE.value}"},
+        "params": {"coalesce_ms": coalesce_ms},
+    }
+
+
+def _connection_failed_event() -> StreamEvent:
+    return StreamEvent(
+        type=StreamEventType.ERROR,
+        error="connection_failed",
+        message="Could not connect to API server.",
+    )
+
+
+def _timeout_event() -> StreamEvent:
+    return StreamEvent(
+        type=StreamEventType.ERROR,
+        error="timeout",
+        message="Request timed out.",
+    )
+
+
+def _websocket_url(base_url: str) -> str:
+    # http:// -> ws://, https:// -> wss://
+    return "ws" + base_url.removeprefix("http") + "/ws"
+
+
+def _websocket_errors() -> tuple:
+    try:
+        from websockets import exceptions
+    except ImportError as e:
+        raise APIError(
+            "The websocket transport needs the websockets package "
+            "(uv sync --extra websocket)"
+        ) from e
+    # Connection failures surface as OSError, protocol ones as WebSocketException
+    return (exceptions.WebSocketException, OSError)
+
+
+def _open_frame(
+    stream_id: int, thread_name: str, content: str, coalesce_ms: int
+) -> str:
+    return dumps(
+        {
+            "type": "chat",
+            "stream": stream_id,
+            "thread": thread_name,
+            "content": content,
+            "coalesce_ms": coalesce_ms,
+            "window": Config.WebSocket.WINDOW,
+        }
+    ).decode()
+
+
+def _cancel_frame(stream_id: int, save_partial: bool | None) -> str:
+    return dumps(
+        {"type": "cancel", "stream": stream_id, "save_partial": save_partial}
+    ).decode()
+
+
+def _credit_frame(stream_id: int, frames: int) -> str:
+    return dumps({"type": "credit", "stream": stream_id, "frames": frames}).decode()
+
+
+def _connect_options(timeout: int) -> dict:
+    return {
+        "open_timeout": timeout,
+        # Frames are small JSON chunks, deflating them costs more than it saves
+        "compression": None,
+        "max_size": None,
+    }
+
+
+class _StreamMux:
+    """
+    NeuroMindClient's chat streams over one /ws connection, opened on first
+    use. A reader thread routes frames to the queue of their stream, so
+    streams can be consumed in any order and from any thread. Credit is
+    returned as events are consumed: a stream nobody reads is paused by the
+    server.
+    """
+
+    def __init__(self, base_url: str, timeout: int):
+        self.errors = _websocket_errors()
+        self.url = _websocket_url(base_url)
+        self.timeout = timeout
+        self._ws = None
+        self._connect_lock = threading.Lock()
+        self._queues: Dict[int, SimpleQueue] = {}
+        self._threads: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    def close(self):
+        if self._ws is not None:
+            # Ends the reader thread as well
+            self._ws.close()
+            self._ws = None
+
+    def _connection(self):
+        from websockets.sync.client import connect
+
+        with self._connect_lock:
+            if self._ws is None:
+                self._ws = connect(self.url, **_connect_options(self.timeout))
+                threading.Thread(
+                    target=self._read,
+                    args=(self._ws,),
+                    name="neuromind-ws-reader",
+                    daemon=True,
+                ).start()
+            return self._ws
+
+    def _read(self, ws):
+        try:
+            for message in ws:
+                frame = loads(message)
+                # Frames of streams already closed are dropped
+                queue = self._queues.get(frame.get("stream"))
+                if queue is not None:
+                    queue.put(frame)
+        except self.errors:
+            pass
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            # Wake the streams still waiting: the connection is gone
+            for queue in list(self._queues.values()):
+                queue.put(None)
+
+    def stream(
+        self, thread_name: str, content: str, coalesce_ms: int
+    ) -> Generator[StreamEvent, None, None]:
+        stream_id = next(self._ids)
+        queue = self._queues[stream_id] = SimpleQueue()
+        self._threads[stream_id] = thread_name
+        ws, finished = None, False
+        try:
+            ws = self._connection()
+            ws.send(_open_frame(stream_id, thread_name, content, coalesce_ms))
+            consumed = 0
+            while not finished:
+                try:
+                    frame = queue.get(timeout=self.timeout)
+                except Empty as e:
+                    raise TimeoutError from e
+                if frame is None:
+                    raise ConnectionError("WebSocket connection closed")
+                finished = frame.get("type") in ("done", "error")
+                event = _parse_event(frame)
+                if event:
+                    yield event
+                consumed += 1
+                if not finished and consumed >= Config.WebSocket.WINDOW // 2:
+                    ws.send(_credit_frame(stream_id, consumed))
+                    consumed = 0
+        except TimeoutError:
+            yield _timeout_event()
+        except self.errors:
+            if self._ws is ws:
+                self._ws = None
+            yield _connection_failed_event()
+        finally:
+            del self._queues[stream_id], self._threads[stream_id]
+            # Abandoned before the end, like closing an HTTP stream
+            if ws is not None and not finished:
+                try:
+                    ws.send(_cancel_frame(stream_id, None))
+                except self.errors:
+                    pass
+
+    def cancel(self, thread_name: str, save_partial: bool | None) -> bool:
+        """Cancel this connection's streams of a thread, False if there are none."""
+        ws = self._ws
+        ids = [id for id, name in list(self._threads.items()) if name == thread_name]
+        if ws is None or not ids:
+            return False
+        for stream_id in ids:
+            ws.send(_cancel_frame(stream_id, save_partial))
+        return True
+
+
+class _AsyncStreamMux:
+    """
+    AsyncNeuroMindClient's chat streams over one /ws connection: a reader
+    task routes frames to the queue of their stream.
+    """
+
+    def __init__(self, base_url: str, timeout: int):
+        self.errors = _websocket_errors()
+        self.url = _websocket_url(base_url)
+        self.timeout = timeout
+        self._ws = None
+        self._reader: asyncio.Task | None = None
+        self._connect_lock = asyncio.Lock()
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._threads: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    async def _connection(self):
+        from websockets.asyncio.client import connect
+
+        async with self._connect_lock:
+            if self._ws is None:
+                self._ws = await connect(self.url, **_connect_options(self.timeout))
+                self._reader = asyncio.create_task(self._read(self._ws))
+            return self._ws
+
+    async def _read(self, ws):
+        try:
+            async for message in ws:
+                frame = loads(message)
+                queue = self._queues.get(frame.get("stream"))
+                if queue is not None:
+                    queue.put_nowait(frame)
+        except self.errors:
+            pass
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            # Wake the streams still waiting: the connection is gone
+            for queue in self._queues.values():
+                queue.put_nowait(None)
+
+    async def stream(
+        self, thread_name: str, content: str, coalesce_ms: int
+    ) -> AsyncGenerator[StreamEvent, None]:
+        stream_id = next(self._ids)
+        queue = self._queues[stream_id] = asyncio.Queue()
+        self._threads[stream_id] = thread_name
+        ws, finished = None, False
+        try:
+            ws = await self._connection()
+            await ws.send(_open_frame(stream_id, thread_name, content, coalesce_ms))
+            consumed = 0
+            while not finished:
+                frame = await asyncio.wait_for(queue.get(), self.timeout)
+                if frame is None:
+                    raise ConnectionError("WebSocket connection closed")
+                finished = frame.get("type") in ("done", "error")
+                event = _parse_event(frame)
+                if event:
+                    yield event
+                consumed += 1
+                if not finished and consumed >= Config.WebSocket.WINDOW // 2:
+                    await ws.send(_credit_frame(stream_id, consumed))
+                    consumed = 0
+        except TimeoutError:
+            yield _timeout_event()
+        except self.errors:
+            yield _connection_failed_event()
+        finally:
+            del self._queues[stream_id], self._threads[stream_id]
+            if ws is not None and not finished:
+                try:
+                    await ws.send(_cancel_frame(stream_id, None))
+                except self.errors:
+                    pass
+
+    async def cancel(self, thread_name: str, save_partial: bool | None) -> bool:
+        """Cancel this connection's streams of a thread, False if there are none."""
+        ws = self._ws
+        ids = [id for id, name in list(self._threads.items()) if name == thread_name]
+        if ws is None or not ids:
+            return False
+        for stream_id in ids:
+            await ws.send(_cancel_frame(stream_id, save_partial))
+        return True
+
+
 class NeuroMindClient:
-    """Client for interacting with the NeuroMind REST API."""
+    """
+    Client for interacting with the NeuroMind REST API.
+    Owns a pooled keep-alive connection; call close() or use it as a
+    context manager to release it.
+    """
 
-    def __init__(self, base_url: str = "http://localhost:8000", timeout: int = 60):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        timeout: int = 60,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        http2: bool | None = None,
+        stream_format: StreamFormat = StreamFormat.NDJSON,
+        coalesce_ms: int = 20,
+        transport: StreamTransport = StreamTransport.HTTP,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.stream_format = stream_format
+        self.coalesce_ms = coalesce_ms
+        self._streams = None
+        if transport == StreamTransport.WEBSOCKET:
+            self._streams = _StreamMux(self.base_url, timeout)
+        self._http = httpx.Client(
+            **_client_options(
+                self.base_url,
+                timeout,
+                max_connections,
+                max_keepalive_connections,
+                http2,
+            )
+        )
+
+    def close(self) -> None:
+        if self._streams:
+            self._streams.close()
+        self._http.close()
+
+    def __enter__(self) -> "NeuroMindClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def health_check(self) -> dict:
         """Check if the API server is healthy."""
         try:
-            response = httpx.get(f"{self.base_url}/health", timeout=5)
+            response = self._http.get("/health", timeout=5)
             response.raise_for_status()
             return response.json()
         except httpx.ConnectError:
@@ -61,7 +582,7 @@ class NeuroMindClient:
 
     def list_personas(self) -> List[dict]:
         """List all available personas."""
-        response = httpx.get(f"{self.base_url}/personas", timeout=self.timeout)
+        response = self._http.get("/personas")
         response.raise_for_status()
         return response.json()
 
@@ -70,92 +591,402 @@ class NeuroMindClient:
         List all threads.
         Returns list of (name, persona, message_count) tuples.
         """
-        response = httpx.get(f"{self.base_url}/threads", timeout=self.timeout)
+        response = self._http.get("/threads")
         response.raise_for_status()
         threads = response.json()
         return [(t["name"], t["persona"], t["message_count"]) for t in threads]
 
     def get_or_create_thread(
-        self, name: str, persona: Persona = Persona.NEUROMIND
+        self,
+        name: str,
+        persona: str = Config.Personas.DEFAULT,
+        model: str | None = None,
     ) -> ThreadInfo:
         """Get or create a thread by name."""
         # First try to get existing thread
-        response = httpx.get(f"{self.base_url}/threads/{name}", timeout=self.timeout)
+        response = self._http.get(f"/threads/{name}")
 
         if response.status_code == 200:
-            data = response.json()
-            return ThreadInfo(id=data["id"], name=data["name"], persona=data["persona"])
+            return _thread_info(response.json())
 
         # Create new thread if it doesn't exist
-        response = httpx.post(
-            f"{self.base_url}/threads",
-            json={"name": name, "persona": persona.value},
-            timeout=self.timeout,
+        response = self._http.post(
+            "/threads", json=_thread_create_payload(name, persona, model)
         )
         response.raise_for_status()
-        data = response.json()
-        return ThreadInfo(id=data["id"], name=data["name"], persona=data["persona"])
+        return _thread_info(response.json())
 
     def clear_messages(self, thread_name: str) -> None:
         """Clear all messages in a thread."""
-        response = httpx.delete(
-            f"{self.base_url}/threads/{thread_name}/messages", timeout=self.timeout
+        response = self._http.delete(f"/threads/{thread_name}/messages")
+        _raise_for_status(response, 409)
+
+    def fork_thread(
+        self, thread_name: str, name: str, at: int | None = None
+    ) -> ThreadInfo:
+        """New thread `name` sharing thread_name's history up to message `at`."""
+        response = self._http.post(
+            f"/threads/{thread_name}/fork", json={"name": name}, params=_fork_params(at)
         )
+        _raise_for_status(response, 404, 409, 422)
+        return _thread_info(response.json())
+
+    def get_reasoning(self, thread_name: str, message_id: int) -> str | None:
+        """Reasoning trace of an AI message, None if it has none."""
+        return _reasoning(
+            self._http.get(f"/threads/{thread_name}/messages/{message_id}/reasoning")
+        )
+
+    def cancel_chat(self, thread_name: str, save_partial: bool | None = None) -> bool:
+        """Stop the thread's in-flight generation, False if there was none."""
+        if self._streams and self._streams.cancel(thread_name, save_partial):
+            return True
+        response = self._http.delete(
+            f"/threads/{thread_name}/chat/active", params=_cancel_params(save_partial)
+        )
+        if response.status_code == 404:
+            return False
         response.raise_for_status()
+        return True
+
+    def iter_messages(
+        self, thread_name: str, page_size: int = 100
+    ) -> Iterator[MessageInfo]:
+        """Lazily walk a thread's messages newest first, one page per request."""
+        before_id = None
+        while True:
+            params = {"limit": page_size}
+            if before_id is not None:
+                params["before_id"] = before_id
+            response = self._http.get(f"/threads/{thread_name}/messages", params=params)
+            response.raise_for_status()
+            for data in reversed(response.json()):
+                yield _message_info(data)
+
+            next_before_id = response.headers.get("X-Next-Before-Id")
+            if next_before_id is None:
+                return
+            before_id = int(next_before_id)
+
+    def search(
+        self,
+        query: str,
+        thread: str | None = None,
+        persona: str | None = None,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        """Full-text search across threads, best matches first."""
+        response = self._http.get(
+            "/search", params=_search_params(query, thread, persona, limit)
+        )
+        response.raise_for_status()
+        return [SearchHit(**hit) for hit in response.json()]
+
+    def export_messages(self, thread_name: str) -> Iterator[MessageInfo]:
+        """Stream every message of a thread oldest first."""
+        with self._http.stream("GET", f"/threads/{thread_name}/export") as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield _message_info(loads(line))
+
+    def submit_batch(self, jsonl: str, concurrency: int | None = None) -> BatchInfo:
+        """Start a batch job from JSONL lines of {"thread", "prompt", "persona"?}."""
+        response = self._http.post(
+            "/batch",
+            content=jsonl.encode(),
+            params=_batch_params(concurrency),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        return _batch_info(response)
+
+    def get_batch(self, job_id: str) -> BatchInfo:
+        """Status and progress of a batch job."""
+        return _batch_info(self._http.get(f"/batch/{job_id}"))
+
+    def list_batches(self) -> List[BatchInfo]:
+        """All batch jobs, newest first."""
+        response = self._http.get("/batch")
+        response.raise_for_status()
+        return [BatchInfo(**job) for job in response.json()]
+
+    def cancel_batch(self, job_id: str) -> BatchInfo:
+        """Stop a batch job, keeping the results finished so far."""
+        return _batch_info(self._http.delete(f"/batch/{job_id}"))
+
+    def iter_batch_results(self, job_id: str) -> Iterator[dict]:
+        """Stream the results a batch job has finished so far."""
+        with self._http.stream("GET", f"/batch/{job_id}/results") as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield loads(line)
 
     def stream_chat(
         self, thread_name: str, content: str
     ) -> Generator[StreamEvent, None, None]:
         """
-        Send a message and stream the response via SSE.
-        Yields StreamEvent objects for each chunk.
+        Send a message and stream the response.
+        Yields StreamEvent objects for each chunk, whichever framing
+        (NDJSON, SSE or the /ws connection) carries them.
         """
+        if self._streams:
+            yield from self._streams.stream(thread_name, content, self.coalesce_ms)
+            return
+
+        request = _chat_request(
+            thread_name, content, self.stream_format, self.coalesce_ms
+        )
         try:
-            with httpx.stream(
-                "POST",
-                f"{self.base_url}/threads/{thread_name}/chat",
-                json={"content": content},
-                timeout=self.timeout,
-            ) as response:
+            with self._http.stream("POST", **request) as response:
                 response.raise_for_status()
+                stream_format = StreamFormat.negotiate(
+                    response.headers.get("content-type")
+                )
 
                 for line in response.iter_lines():
-                    if not line or not line.startswith("data:"):
-                        continue
-
-                    try:
-                        event_data = json.loads(line[5:].strip())
-                        event_type = event_data.get("type", "unknown")
-
-                        if event_type == "reasoning":
-                            yield StreamEvent(
-                                type=StreamEventType.REASONING,
-                                content=event_data["content"],
-                            )
-                        elif event_type == "content":
-                            yield StreamEvent(
-                                type=StreamEventType.CONTENT,
-                                content=event_data["content"],
-                            )
-                        elif event_type == "error":
-                            yield StreamEvent(
-                                type=StreamEventType.ERROR,
-                                error=event_data.get("error"),
-                                message=event_data.get("message"),
-                            )
-                        elif event_type == "done":
-                            yield StreamEvent(type=StreamEventType.DONE)
-                    except json.JSONDecodeError:
-                        continue
+                    event = _decode_line(line, stream_format)
+                    if event:
+                        yield event
         except httpx.ConnectError:
-            yield StreamEvent(
-                type=StreamEventType.ERROR,
-                error="connection_failed",
-                message="Could not connect to API server.",
+            yield _connection_failed_event()
+        except httpx.TimeoutException:
+            yield _timeout_event()
+
+
+class AsyncNeuroMindClient:
+    """Asyncio counterpart of NeuroMindClient with the same API."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        timeout: int = 60,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool | None = None,
+        stream_format: StreamFormat = StreamFormat.NDJSON,
+        coalesce_ms: int = 20,
+        transport: StreamTransport = StreamTransport.HTTP,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.stream_format = stream_format
+        self.coalesce_ms = coalesce_ms
+        self._streams = None
+        if transport == StreamTransport.WEBSOCKET:
+            self._streams = _AsyncStreamMux(self.base_url, timeout)
+        self._http = httpx.AsyncClient(
+            **_client_options(
+                self.base_url,
+                timeout,
+                max_connections,
+                max_keepalive_connections,
+                http2,
             )
+        )
+
+    async def close(self) -> None:
+        if self._streams:
+            await self._streams.close()
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncNeuroMindClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def health_check(self) -> dict:
+        """Check if the API server is healthy."""
+        try:
+            response = await self._http.get("/health", timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except httpx.ConnectError:
+            raise APIError("Could not connect to API server. Is it running?")
         except httpx.TimeoutException:
-            yield StreamEvent(
-                type=StreamEventType.ERROR,
-                error="timeout",
-                message="Request timed out.",
+            raise APIError("Health check timed out.")
+
+    async def list_personas(self) -> List[dict]:
+        """List all available personas."""
+        response = await self._http.get("/personas")
+        response.raise_for_status()
+        return response.json()
+
+    async def list_threads(self) -> List[Tuple[str, str, int]]:
+        """
+        List all threads.
+        Returns list of (name, persona, message_count) tuples.
+        """
+        response = await self._http.get("/threads")
+        response.raise_for_status()
+        threads = response.json()
+        return [(t["name"], t["persona"], t["message_count"]) for t in threads]
+
+    async def get_or_create_thread(
+        self,
+        name: str,
+        persona: str = Config.Personas.DEFAULT,
+        model: str | None = None,
+    ) -> ThreadInfo:
+        """Get or create a thread by name."""
+        response = await self._http.get(f"/threads/{name}")
+
+        if response.status_code == 200:
+            return _thread_info(response.json())
+
+        response = await self._http.post(
+            "/threads", json=_thread_create_payload(name, persona, model)
+        )
+        response.raise_for_status()
+        return _thread_info(response.json())
+
+    async def clear_messages(self, thread_name: str) -> None:
+        """Clear all messages in a thread."""
+        response = await self._http.delete(f"/threads/{thread_name}/messages")
+        _raise_for_status(response, 409)
+
+    async def fork_thread(
+        self, thread_name: str, name: str, at: int | None = None
+    ) -> ThreadInfo:
+        """New thread `name` sharing thread_name's history up to message `at`."""
+        response = await self._http.post(
+            f"/threads/{thread_name}/fork", json={"name": name}, params=_fork_params(at)
+        )
+        _raise_for_status(response, 404, 409, 422)
+        return _thread_info(response.json())
+
+    async def get_reasoning(self, thread_name: str, message_id: int) -> str | None:
+        """Reasoning trace of an AI message, None if it has none."""
+        return _reasoning(
+            await self._http.get(
+                f"/threads/{thread_name}/messages/{message_id}/reasoning"
+            )
+        )
+
+    async def cancel_chat(
+        self, thread_name: str, save_partial: bool | None = None
+    ) -> bool:
+        """Stop the thread's in-flight generation, False if there was none."""
+        if self._streams and await self._streams.cancel(thread_name, save_partial):
+            return True
+        response = await self._http.delete(
+            f"/threads/{thread_name}/chat/active", params=_cancel_params(save_partial)
+        )
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def iter_messages(
+        self, thread_name: str, page_size: int = 100
+    ) -> AsyncIterator[MessageInfo]:
+        """Lazily walk a thread's messages newest first, one page per request."""
+        before_id = None
+        while True:
+            params = {"limit": page_size}
+            if before_id is not None:
+                params["before_id"] = before_id
+            response = await self._http.get(
+                f"/threads/{thread_name}/messages", params=params
             )
+            response.raise_for_status()
+            for data in reversed(response.json()):
+                yield _message_info(data)
+
+            next_before_id = response.headers.get("X-Next-Before-Id")
+            if next_before_id is None:
+                return
+            before_id = int(next_before_id)
+
+    async def search(
+        self,
+        query: str,
+        thread: str | None = None,
+        persona: str | None = None,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        """Full-text search across threads, best matches first."""
+        response = await self._http.get(
+            "/search", params=_search_params(query, thread, persona, limit)
+        )
+        response.raise_for_status()
+        return [SearchHit(**hit) for hit in response.json()]
+
+    async def export_messages(self, thread_name: str) -> AsyncIterator[MessageInfo]:
+        """Stream every message of a thread oldest first."""
+        async with self._http.stream(
+            "GET", f"/threads/{thread_name}/export"
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield _message_info(loads(line))
+
+    async def submit_batch(
+        self, jsonl: str, concurrency: int | None = None
+    ) -> BatchInfo:
+        """Start a batch job from JSONL lines of {"thread", "prompt", "persona"?}."""
+        response = await self._http.post(
+            "/batch",
+            content=jsonl.encode(),
+            params=_batch_params(concurrency),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        return _batch_info(response)
+
+    async def get_batch(self, job_id: str) -> BatchInfo:
+        """Status and progress of a batch job."""
+        return _batch_info(await self._http.get(f"/batch/{job_id}"))
+
+    async def list_batches(self) -> List[BatchInfo]:
+        """All batch jobs, newest first."""
+        response = await self._http.get("/batch")
+        response.raise_for_status()
+        return [BatchInfo(**job) for job in response.json()]
+
+    async def cancel_batch(self, job_id: str) -> BatchInfo:
+        """Stop a batch job, keeping the results finished so far."""
+        return _batch_info(await self._http.delete(f"/batch/{job_id}"))
+
+    async def iter_batch_results(self, job_id: str) -> AsyncIterator[dict]:
+        """Stream the results a batch job has finished so far."""
+        async with self._http.stream("GET", f"/batch/{job_id}/results") as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield loads(line)
+
+    async def stream_chat(
+        self, thread_name: str, content: str
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Send a message and stream the response.
+        Yields StreamEvent objects for each chunk, whichever framing
+        (NDJSON, SSE or the /ws connection) carries them.
+        """
+        if self._streams:
+            async for event in self._streams.stream(
+                thread_name, content, self.coalesce_ms
+            ):
+                yield event
+            return
+
+        request = _chat_request(
+            thread_name, content, self.stream_format, self.coalesce_ms
+        )
+        try:
+            async with self._http.stream("POST", **request) as response:
+                response.raise_for_status()
+                stream_format = StreamFormat.negotiate(
+                    response.headers.get("content-type")
+                )
+
+                async for line in response.aiter_lines():
+                    event = _decode_line(line, stream_format)
+                    if event:
+                        yield event
+        except httpx.ConnectError:
+            yield _connection_failed_event()
+        except httpx.TimeoutException:
+            yield _timeout_event()
@@ -9,7 +9,7 @@ class ModelProvider(str, Enum):
     GOOGLE_GENAI = "google_genai"
 
 
-@dataclass
+@dataclass(frozen=True)
 class ModelConfig:
     name: str
     temperature: float
@@ -28,21 +28,123 @@ GEMINI_2_5_FLASH = ModelConfig(
 )
 
 
-class Persona(str, Enum):
-    NEUROMIND = "neuromind"
-    CODER = "coder"
-    ROASTER = "roaster"
-    TEACHER = "teacher"
-    LOGICIAN = "logician"
+MODELS = {model.name: model for model in (QWEN_3, GEMINI_2_5_FLASH)}
 
 
 class Config:
     MODEL = QWEN_3
     CONTEXT_WINDOW = 4096
+    # Tokens kept free in the context window for the model's answer
+    RESPONSE_TOKEN_RESERVE = 1024
     DEFAULT_THREAD = "master"
+    # Send a tiny prompt at startup so the first request doesn't pay model load time
+    WARM_UP_MODEL = True
+    # How long Ollama keeps the model loaded between requests
+    OLLAMA_KEEP_ALIVE = "30m"
+    # Keep the partial answer (flagged as truncated) when a generation is cancelled
+    SAVE_PARTIAL_ANSWERS = True
 
     class Path:
         APP_HOME = Path(os.getenv("APP_HOME", Path(__file__).parent.parent))
         DATA_DIR = APP_HOME / "data"
-        DATABASE_FILE = DATA_DIR / "neuromind.db"
+        DATABASE_FILE = Path(
+            os.getenv("NEUROMIND_DATABASE_FILE", DATA_DIR / "neuromind.db")
+        )
         PERSONAS_DIR = DATA_DIR / "personas"
+
+    class Personas:
+        # Any file in Path.PERSONAS_DIR is a persona named after the file
+        DEFAULT = "neuromind"
+        # How often the directory is checked for added, changed or removed files
+        WATCH_INTERVAL_SECONDS = 1.0
+
+    class Server:
+        HOST = os.getenv("NEUROMIND_HOST", "0.0.0.0")
+        PORT = int(os.getenv("NEUROMIND_PORT", 8000))
+        # Worker processes; set by start_server.py so every worker sees it
+        WORKERS = int(os.getenv("NEUROMIND_WORKERS", 1))
+
+    class Database:
+        POOL_SIZE = int(os.getenv("NEUROMIND_DB_POOL_SIZE", 8))
+        MAX_OVERFLOW = int(os.getenv("NEUROMIND_DB_MAX_OVERFLOW", 16))
+        POOL_TIMEOUT = 30
+        JOURNAL_MODE = "WAL"
+        SYNCHRONOUS = os.getenv("NEUROMIND_DB_SYNCHRONOUS", "NORMAL")
+        CACHE_SIZE_KB = int(os.getenv("NEUROMIND_DB_CACHE_SIZE_KB", 16384))
+        MMAP_SIZE = 256 * 1024 * 1024
+        BUSY_TIMEOUT_MS = 5000
+        STATEMENT_CACHE_SIZE = 256
+
+    class Storage:
+        # Message and reasoning bodies from this many UTF-8 bytes up are
+        # stored compressed; zstd needs the optional zstandard package and
+        # falls back to zlib without it
+        COMPRESS_MIN_BYTES = 512
+        CODEC = "zstd"
+        ZSTD_LEVEL = 3
+        ZLIB_LEVEL = 6
+
+    class Cache:
+        ENABLED = True
+        MAX_ENTRIES = 1000
+        TTL_SECONDS = 7 * 24 * 3600
+        # LangChain embeddings id (e.g. "ollama:nomic-embed-text") enabling
+        # near-duplicate lookups; None keeps the cache exact-match only
+        EMBEDDING_MODEL: str | None = None
+        SIMILARITY_THRESHOLD = 0.95
+
+    class Summary:
+        ENABLED = True
+        MODEL = QWEN_3
+        # Unsummarized history size (in tokens) that triggers compaction
+        TRIGGER_TOKENS = 2048
+        # Newest turns that are always left verbatim
+        KEEP_RECENT_TOKENS = 1024
+        MAX_SUMMARY_TOKENS = 512
+
+    class Scheduler:
+        # Concurrent generations per provider. A local Ollama serves
+        # OLLAMA_NUM_PARALLEL requests at once, hosted APIs take many more.
+        # Split evenly between Config.Server.WORKERS (at least one each).
+        MAX_CONCURRENCY = {
+            ModelProvider.OLLAMA: int(os.getenv("NEUROMIND_OLLAMA_CONCURRENCY", 1)),
+            ModelProvider.GOOGLE_GENAI: 16,
+        }
+        DEFAULT_CONCURRENCY = 4
+
+    class PromptCache:
+        # Keep message order and the history window stable across turns so
+        # the model server can reuse the KV cache of the previous prompt
+        ENABLED = True
+        # When the history outgrows its budget, old turns are dropped until
+        # it fills this share of the budget, so the window start moves rarely
+        REFILL_RATIO = 0.5
+
+    class Memory:
+        # Needs the optional numpy dependency, disabled without it
+        ENABLED = True
+        # LangChain embeddings id; None uses the built-in local hashing embedder
+        EMBEDDING_MODEL: str | None = None
+        DIMENSIONS = 512
+        # Memory-map the stored vectors instead of reading them into RAM
+        MMAP = False
+        TOP_K = 4
+        MIN_SCORE = 0.3
+        # Context tokens reserved for recalled snippets
+        MAX_TOKENS = 512
+        MAX_SNIPPET_CHARS = 600
+        MAX_EMBED_CHARS = 4000
+        BATCH_SIZE = 256
+
+    class Batch:
+        # Workers per batch job unless the request asks for another number;
+        # generations still queue behind Config.Scheduler.MAX_CONCURRENCY
+        CONCURRENCY = 4
+        MAX_CONCURRENCY = 64
+        MAX_ITEMS = 100_000
+
+    class WebSocket:
+        # Chat streams one /ws connection may run at once
+        MAX_STREAMS = 32
+        # Frames a stream may send before the client grants more credit
+        WINDOW = 64
@@ -0,0 +1,42 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from neuromind.locks import FileLock
+
+T = TypeVar("T")
+
+
+class DatabaseWriter:
+    """
+    Runs database writes on a single dedicated thread fed by a queue.
+    Writes are serialized (SQLite allows one writer at a time anyway) and
+    awaiting them never blocks the event loop. With a lock, each write also
+    holds it, which serializes writes across server worker processes: a
+    read-then-write transaction then never finds its snapshot outdated by
+    another process's commit, which SQLite reports as SQLITE_BUSY without
+    waiting for the busy timeout.
+    """
+
+    def __init__(self, lock: FileLock | None = None):
+        self.lock = lock
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="neuromind-db-writer"
+        )
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.lock is None:
+            return fn(*args)
+        with self.lock:
+            return fn(*args)
+
+    async def submit(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, fn, *args)
+
+    def submit_nowait(self, fn: Callable[..., T], *args: Any) -> Future:
+        """Queue a write without awaiting it, e.g. from a cancelled task."""
+        return self._executor.submit(self._run, fn, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
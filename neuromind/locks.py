@@ -0,0 +1,70 @@
+"""
+Advisory file locks for work that must not run in two server worker
+processes at once: database writes, schema migrations, appends to the
+memory index and batch jobs. The OS drops a lock when its process dies,
+so a crashed worker never leaves one behind.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no flock on Windows, one process only
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive lock on a file, held by one thread of one process at a time."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._thread_lock.acquire(blocking):
+            return False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a+b")
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                fcntl.flock(self._file, flags)
+            return True
+        except BlockingIOError:
+            self._close()
+            return False
+        except BaseException:
+            self._close()
+            raise
+
+    def release(self):
+        self._close()
+
+    def _close(self):
+        if self._file is not None:
+            # Closing the descriptor drops the flock
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @asynccontextmanager
+    async def hold(self, poll_seconds: float = 0.01) -> AsyncIterator[None]:
+        """Acquire without blocking the event loop; safe to cancel while waiting."""
+        while not self.acquire(blocking=False):
+            await asyncio.sleep(poll_seconds)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,411 @@
+"""
+Long-term memory: past messages from every thread embedded into a
+NumPy vector index, queried for snippets relevant to the current turn.
+
+The index lives next to the database as append-only raw files, so new
+messages are embedded and written incrementally and existing vectors
+are never re-embedded. NumPy is an optional dependency; without it the
+memory layer is disabled.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from neuromind.config import Config
+from neuromind.locks import FileLock
+from neuromind.models import create_embeddings
+from neuromind.thread_manager import ThreadManager
+from neuromind.tokens import estimate_tokens
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+AVAILABLE = np is not None
+
+_WORD = re.compile(r"\w+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be but by can do does for from had has have how i if in "
+    "is it its me my no not of on or so that the them then there these they this "
+    "to was we were what when which who why will with would you your".split()
+)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Local CPU embedder: hashed unigrams and (half-weight) bigrams of the
+    non-stop words, L2-normalized.
+    Lexical rather than semantic, but deterministic, offline and fast
+    enough to embed thousands of messages per second.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimensions, 1.0 if value >> 63 else -1.0
+
+    def _embed(self, text: str) -> List[float]:
+        words = [w for w in _WORD.findall(text.lower()) if w not in _STOP_WORDS]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature, weight in [(w, 1.0) for w in words] + [
+            (f"{a} {b}", 0.5) for a, b in zip(words, words[1:])
+        ]:
+            index, sign = self._bucket(feature)
+            vector[index] += sign * weight
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def create_embedder() -> Tuple[str, Embeddings]:
+    """(identifier, embedder) for Config.Memory.EMBEDDING_MODEL."""
+    model = Config.Memory.EMBEDDING_MODEL
+    if model:
+        return model, create_embeddings(model)
+    return f"hashing:{Config.Memory.DIMENSIONS}", HashingEmbeddings(
+        Config.Memory.DIMENSIONS
+    )
+
+
+class VectorIndex:
+    """
+    Unit vectors with their message and thread ids, searched by brute-force
+    inner product. Vectors loaded from disk form a base block (optionally
+    memory-mapped); appends go to a capacity-doubling tail buffer in memory
+    and to the end of the raw files on disk. Searches work on a snapshot,
+    so they run from worker threads while new messages are appended.
+    """
+
+    def __init__(self, directory: Path, dimensions: int, mmap: bool = False):
+        self.directory = directory
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        self._base = np.empty((0, dimensions), dtype=np.float32)
+        self._tail = np.empty((0, dimensions), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._thread_ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._load(mmap)
+
+    @property
+    def _files(self) -> Tuple[Path, Path, Path]:
+        return (
+            self.directory / "vectors.f32",
+            self.directory / "ids.i64",
+            self.directory / "thread_ids.i64",
+        )
+
+    def _load(self, mmap: bool):
+        vectors_file, ids_file, thread_ids_file = self._files
+        if not all(f.exists() for f in self._files):
+            return
+
+        # A crash between appends can leave files of different lengths;
+        # only rows present in all three are kept.
+        rows = min(
+            vectors_file.stat().st_size // (4 * self.dimensions),
+            ids_file.stat().st_size // 8,
+            thread_ids_file.stat().st_size // 8,
+        )
+        for path, row_bytes in zip(self._files, (4 * self.dimensions, 8, 8)):
+            if path.stat().st_size != rows * row_bytes:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * row_bytes)
+        if not rows:
+            return
+
+        shape = (rows, self.dimensions)
+        if mmap:
+            self._base = np.memmap(
+                vectors_file, dtype=np.float32, mode="r", shape=shape
+            )
+        else:
+            self._base = np.fromfile(vectors_file, dtype=np.float32).reshape(shape)
+        self._ids = np.fromfile(ids_file, dtype=np.int64)
+        self._thread_ids = np.fromfile(thread_ids_file, dtype=np.int64)
+        self._size = rows
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_id(self) -> int:
+        return int(self._ids[self._size - 1]) if self._size else 0
+
+    def add(self, ids: Sequence[int], thread_ids: Sequence[int], vectors):
+        """Append vectors (normalized here) for the given message ids."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        ids = np.asarray(ids, dtype=np.int64)
+        thread_ids = np.asarray(thread_ids, dtype=np.int64)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path, array in zip(self._files, (vectors, ids, thread_ids)):
+            with open(path, "ab") as f:
+                f.write(array.tobytes())
+        self._append(ids, thread_ids, vectors)
+
+    def refresh(self):
+        """Load rows another process appended to the files since we last looked."""
+        vectors_file, ids_file, thread_ids_file = self._files
+        if not all(f.exists() for f in self._files):
+            return
+        rows = min(
+            vectors_file.stat().st_size // (4 * self.dimensions),
+            ids_file.stat().st_size // 8,
+            thread_ids_file.stat().st_size // 8,
+        )
+        start, count = self._size, rows - self._size
+        if count <= 0:
+            return
+
+        vectors = np.fromfile(
+            vectors_file,
+            dtype=np.float32,
+            count=count * self.dimensions,
+            offset=4 * self.dimensions * start,
+        ).reshape(count, self.dimensions)
+        ids = np.fromfile(ids_file, dtype=np.int64, count=count, offset=8 * start)
+        thread_ids = np.fromfile(
+            thread_ids_file, dtype=np.int64, count=count, offset=8 * start
+        )
+        self._append(ids, thread_ids, vectors)
+
+    def _append(self, ids, thread_ids, vectors):
+        with self._lock:
+            start, end = self._size, self._size + len(ids)
+            tail_start = start - len(self._base)
+            tail_end = end - len(self._base)
+            # Fresh buffers on growth keep snapshots held by searches valid
+            if end > len(self._ids):
+                self._ids = _grown(self._ids, start, end)
+                self._thread_ids = _grown(self._thread_ids, start, end)
+            if tail_end > len(self._tail):
+                self._tail = _grown(self._tail, tail_start, tail_end)
+            self._tail[tail_start:tail_end] = vectors
+            self._ids[start:end] = ids
+            self._thread_ids[start:end] = thread_ids
+            self._size = end
+
+    def search(
+        self,
+        query,
+        k: int,
+        exclude: Sequence[Tuple[int, int]] = (),
+        exclude_after_id: int = 0,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (message id, cosine score) pairs, best first. Messages newer
+        than exclude_after_id are skipped if they belong to one of the
+        (thread_id, newest message id) ranges of exclude.
+        """
+        with self._lock:
+            size = self._size
+            base = self._base
+            tail = self._tail[: size - len(base)]
+            ids = self._ids[:size]
+            thread_ids = self._thread_ids[:size]
+        if not size or k <= 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return []
+        query = query / norm
+        scores = np.concatenate((base @ query, tail @ query))
+        for thread_id, upto in exclude:
+            excluded = (
+                (thread_ids == thread_id) & (ids > exclude_after_id) & (ids <= upto)
+            )
+            scores[excluded] = -np.inf
+
+        k = min(k, size)
+        top = np.argpartition(scores, size - k)[size - k :]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def reset(self):
+        with self._lock:
+            for path in self._files:
+                path.unlink(missing_ok=True)
+            self._base = np.empty((0, self.dimensions), dtype=np.float32)
+            self._tail = np.empty((0, self.dimensions), dtype=np.float32)
+            self._ids = np.empty(0, dtype=np.int64)
+            self._thread_ids = np.empty(0, dtype=np.int64)
+            self._size = 0
+
+
+def _grown(array, used: int, needed: int):
+    """Copy of the first `used` rows into a buffer with room for `needed`."""
+    capacity = max(needed, 2 * len(array), 1024)
+    grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:used] = array[:used]
+    return grown
+
+
+@dataclass
+class Memory:
+    thread: str
+    role: str
+    content: str
+    score: float
+
+
+class LongTermMemory:
+    """
+    Keeps the vector index in step with the message table and recalls
+    relevant past snippets. Indexing runs in the background after each
+    turn; recall is a single matrix-vector product.
+    """
+
+    def __init__(self, db: ThreadManager, embedder_id: str, embedder: Embeddings):
+        self.db = db
+        self.embedder = embedder
+        self._sync_lock = asyncio.Lock()
+
+        settings = Config.Memory
+        # Message ids are only meaningful for one database file
+        database = Path(db.engine.url.database)
+        directory = database.with_name(f"{database.stem}-memory")
+        # Worker processes share the index files; only the lock holder
+        # changes them, and each picks up the others' appends when syncing
+        self._file_lock = FileLock(directory / "lock")
+        with self._file_lock:
+            meta_file = directory / "meta.json"
+            meta = json.loads(meta_file.read_text()) if meta_file.exists() else None
+            dimensions = meta["dimensions"] if meta else None
+            if meta is None or meta["embedder"] != embedder_id:
+                dimensions = len(embedder.embed_query("dimension probe"))
+
+            if meta and meta["embedder"] != embedder_id:
+                logger.info(f"Embedder changed to {embedder_id}, re-indexing memory")
+                VectorIndex(directory, meta["dimensions"]).reset()
+            self.index = VectorIndex(directory, dimensions, mmap=settings.MMAP)
+            meta_file.write_text(
+                json.dumps({"embedder": embedder_id, "dimensions": dimensions})
+            )
+
+    def stats(self) -> dict:
+        return {"vectors": len(self.index), "last_message_id": self.index.last_id}
+
+    async def sync(self):
+        """Embed messages stored since the last sync, batch by batch."""
+        if self._sync_lock.locked():
+            return
+        async with self._sync_lock:
+            try:
+                while await self._sync_batch():
+                    pass
+            except Exception as e:
+                logger.exception(f"Indexing long-term memory failed: {e}")
+
+    async def _sync_batch(self) -> bool:
+        """Index the next batch of messages, False once caught up."""
+        async with self._file_lock.hold():
+            await asyncio.to_thread(self.index.refresh)
+            rows = await asyncio.to_thread(
+                self.db.get_messages_after,
+                self.index.last_id,
+                Config.Memory.BATCH_SIZE,
+            )
+            if not rows:
+                return False
+            # Blank messages (reasoning-only answers) are stored as zero
+            # vectors: they never score, but move last_id past them
+            texts = [
+                content[: Config.Memory.MAX_EMBED_CHARS]
+                for _, _, content in rows
+                if content.strip()
+            ]
+            embedded = iter(
+                await self.embedder.aembed_documents(texts) if texts else []
+            )
+            zero = [0.0] * self.index.dimensions
+            vectors = [
+                next(embedded) if content.strip() else zero for _, _, content in rows
+            ]
+            await asyncio.to_thread(
+                self.index.add,
+                [id for id, _, _ in rows],
+                [thread_id for _, thread_id, _ in rows],
+                vectors,
+            )
+            return True
+
+    async def embed_query(self, text: str) -> List[float] | None:
+        try:
+            return await self.embedder.aembed_query(text)
+        except Exception as e:
+            logger.warning(f"Embedding for memory recall failed: {e}")
+            return None
+
+    def recall(
+        self,
+        query: List[float],
+        thread_id: int,
+        after_id: int,
+        token_budget: int,
+    ) -> List[Memory]:
+        """
+        Most relevant past messages that fit token_budget. Messages of the
+        current thread's history newer than after_id are already in the
+        context and are skipped.
+        """
+        settings = Config.Memory
+        # A fork's window may reach into the messages it shares
+        lineage = self.db.get_lineage(thread_id)
+        # Over-fetch: cleared messages stay in the index until it is rebuilt
+        hits = self.index.search(query, settings.TOP_K * 2, lineage, after_id)
+        hits = [(id, score) for id, score in hits if score >= settings.MIN_SCORE]
+        if not hits:
+            return []
+
+        rows = {
+            row[0]: row[1:]
+            for row in self.db.get_messages_by_ids([id for id, _ in hits])
+        }
+        memories = []
+        for id, score in hits:
+            if id not in rows:
+                continue
+            thread, role, content = rows[id]
+            if not content.strip():
+                continue
+            content = content[: settings.MAX_SNIPPET_CHARS]
+            token_budget -= estimate_tokens(content)
+            if token_budget < 0:
+                break
+            memories.append(Memory(thread, role, content, score))
+            if len(memories) == settings.TOP_K:
+                break
+        return memories
+
+
+def render(memories: List[Memory]) -> str:
+    speakers = {"human": "User", "ai": "Assistant"}
+    lines = [
+        f"- [{m.thread}] {speakers.get(m.role, m.role)}: {m.content}" for m in memories
+    ]
+    return "Relevant excerpts from past conversations:\n" + "\n".join(lines)
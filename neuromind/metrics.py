@@ -0,0 +1,233 @@
+"""
+Minimal in-process metrics exposed in the Prometheus text format.
+Updates are a dict lookup and a locked add, cheap enough to leave on.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                )
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total[0]}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for m in self._metrics for line in m.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CHAT_REQUESTS = REGISTRY.register(
+    Counter(
+        "neuromind_chat_requests_total",
+        "Chat turns by model and outcome.",
+        ("model", "outcome"),
+    )
+)
+CHAT_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "neuromind_chat_stage_seconds",
+        "Time spent in each stage of the chat pipeline.",
+        ("stage",),
+    )
+)
+TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.register(
+    Histogram(
+        "neuromind_time_to_first_token_seconds",
+        "Time from request to the first streamed chunk.",
+        ("model",),
+    )
+)
+TOKENS_GENERATED = REGISTRY.register(
+    Counter(
+        "neuromind_tokens_generated_total",
+        "Streamed model chunks (approximately tokens).",
+        ("model",),
+    )
+)
+TOKENS_PER_SECOND = REGISTRY.register(
+    Histogram(
+        "neuromind_tokens_per_second",
+        "Per-turn generation throughput.",
+        ("model",),
+        buckets=(1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 400, 1000),
+    )
+)
+PREFILL_SECONDS = REGISTRY.register(
+    Histogram(
+        "neuromind_prefill_seconds",
+        "Prompt evaluation time reported by the model server.",
+        ("model",),
+    )
+)
+PROMPT_TOKENS_EVALUATED = REGISTRY.register(
+    Counter(
+        "neuromind_prompt_tokens_evaluated_total",
+        "Prompt tokens the model server had to evaluate (not served from its cache).",
+        ("model",),
+    )
+)
+PROMPT_PREFIX_LOOKUPS = REGISTRY.register(
+    Counter(
+        "neuromind_prompt_prefix_lookups_total",
+        "Turns whose prompt prefix should still be cached by the model server.",
+        ("outcome",),
+    )
+)
+PROMPT_PREFIX_REUSED_TOKENS = REGISTRY.register(
+    Counter(
+        "neuromind_prompt_prefix_reused_tokens_total",
+        "Estimated prompt tokens covered by the model server's cached prefix.",
+    )
+)
+ACTIVE_STREAMS = REGISTRY.register(
+    Gauge("neuromind_active_streams", "Chat streams currently in flight.")
+)
+DB_QUERY_SECONDS = REGISTRY.register(
+    Histogram(
+        "neuromind_db_query_seconds",
+        "SQLite statement execution time by statement type.",
+        ("operation",),
+        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+    )
+)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Observe the duration of a chat pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        CHAT_STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
@@ -0,0 +1,102 @@
+"""
+Schema migrations for databases created by older versions.
+New databases get the full schema from SQLModel.metadata.create_all, so
+every migration must be idempotent. Progress is tracked in PRAGMA user_version.
+"""
+
+from typing import Callable, List
+
+from sqlalchemy import Connection, Engine
+
+from neuromind import search, storage
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _add_message_token_count(conn: Connection):
+    if "token_count" not in _columns(conn, "message"):
+        conn.exec_driver_sql(
+            "ALTER TABLE message ADD COLUMN token_count INTEGER NOT NULL DEFAULT 0"
+        )
+    conn.exec_driver_sql(
+        "UPDATE message SET token_count = max(1, (length(content) + 3) / 4) "
+        "WHERE token_count = 0"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_message_thread_id ON message (thread_id)"
+    )
+
+
+def _add_thread_model(conn: Connection):
+    if "model" not in _columns(conn, "thread"):
+        conn.exec_driver_sql("ALTER TABLE thread ADD COLUMN model VARCHAR")
+
+
+def _denormalize_thread_stats(conn: Connection):
+    columns = _columns(conn, "thread")
+    if "message_count" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE thread ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0"
+        )
+    if "last_activity_at" not in columns:
+        conn.exec_driver_sql("ALTER TABLE thread ADD COLUMN last_activity_at DATETIME")
+    conn.exec_driver_sql(
+        "UPDATE thread SET message_count = "
+        "(SELECT count(*) FROM message WHERE message.thread_id = thread.id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_message_thread_id_id ON message (thread_id, id)"
+    )
+    # Superseded by the composite index
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_message_thread_id")
+
+
+def _add_search_index(conn: Connection):
+    if search.create_index(conn):
+        search.backfill(conn)
+
+
+def _add_message_truncated(conn: Connection):
+    if "truncated" not in _columns(conn, "message"):
+        conn.exec_driver_sql(
+            "ALTER TABLE message ADD COLUMN truncated BOOLEAN NOT NULL DEFAULT 0"
+        )
+
+
+def _compress_message_content(conn: Connection):
+    # message_reasoning is new and created by create_all
+    storage.compress_column(conn, "message", "id")
+
+
+def _add_thread_fork(conn: Connection):
+    columns = _columns(conn, "thread")
+    if "parent_id" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE thread ADD COLUMN parent_id INTEGER REFERENCES thread (id)"
+        )
+    if "fork_message_id" not in columns:
+        conn.exec_driver_sql("ALTER TABLE thread ADD COLUMN fork_message_id INTEGER")
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_thread_parent_id ON thread (parent_id)"
+    )
+
+
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    _add_message_token_count,
+    _add_thread_model,
+    _denormalize_thread_stats,
+    _add_search_index,
+    _add_message_truncated,
+    _compress_message_content,
+    _add_thread_fork,
+]
+
+
+def migrate(engine: Engine):
+    with engine.begin() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+        for migration in MIGRATIONS[version:]:
+            migration(conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {len(MIGRATIONS)}")
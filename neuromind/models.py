@@ -0,0 +1,90 @@
+"""
+Chat models and embeddings clients, built on first use.
+
+LangChain's model factories, and through them the provider SDKs, are
+imported only when the first model is created: importing this module is
+cheap, and only the provider of a ModelConfig actually used is loaded.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from neuromind.config import Config, ModelConfig, ModelProvider
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.language_models import BaseChatModel
+
+    from neuromind.scheduler import InferenceScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def create_embeddings(model: str | None) -> "Embeddings | None":
+    """Embeddings client for a "provider:model" id, None when not configured."""
+    if not model:
+        return None
+    from langchain.embeddings import init_embeddings
+
+    logger.info(f"Initializing embeddings {model}")
+    return init_embeddings(model)
+
+
+class ModelRegistry:
+    """
+    Builds the chat model for each ModelConfig once and reuses it across
+    requests, keeping the provider client and its HTTP connections warm.
+    """
+
+    def __init__(self):
+        self._models: dict[tuple[ModelConfig, bool], "BaseChatModel"] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: ModelConfig, reasoning: bool = True) -> "BaseChatModel":
+        key = (model, reasoning)
+        llm = self._models.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._models.get(key)
+                if llm is None:
+                    llm = self._models[key] = self._create(model, reasoning)
+        return llm
+
+    def _create(self, model: ModelConfig, reasoning: bool) -> "BaseChatModel":
+        kwargs = {}
+        if model.provider == ModelProvider.OLLAMA:
+            kwargs["num_ctx"] = Config.CONTEXT_WINDOW
+            kwargs["keep_alive"] = Config.OLLAMA_KEEP_ALIVE
+
+        # Imports langchain and the provider's integration package
+        from langchain.chat_models import init_chat_model
+
+        logger.info(f"Initializing chat model {model.name} ({model.provider.value})")
+        return init_chat_model(
+            model.name,
+            model_provider=model.provider.value,
+            temperature=model.temperature,
+            reasoning=reasoning and model.reasoning,
+            **kwargs,
+        )
+
+    async def preload(self, model: ModelConfig, reasoning: bool = True):
+        """Build a model's client on a worker thread, off the event loop."""
+        await asyncio.to_thread(self.get, model, reasoning)
+
+    async def warm_up(self, model: ModelConfig, scheduler: "InferenceScheduler"):
+        """
+        Send a tiny prompt so the first user request doesn't pay load latency.
+        It takes an inference slot like a chat, so chats arriving meanwhile
+        queue behind it in the scheduler, and skips reasoning to stay short.
+        """
+        try:
+            await self.preload(model)
+            llm = await asyncio.to_thread(self.get, model, False)
+            async with scheduler.slot(model.provider, "warm-up"):
+                await llm.ainvoke("Reply with OK.")
+            logger.info(f"Warmed up {model.name}")
+        except Exception as e:
+            logger.warning(f"Warm-up of {model.name} failed: {e}")
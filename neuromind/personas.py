@@ -0,0 +1,187 @@
+"""
+Persona registry: every file in Config.Path.PERSONAS_DIR is a persona
+named after the file (without extension). A file may start with a
+front-matter block of `key: value` lines between `---` markers:
+
+    ---
+    description: Principal Software Architect
+    model: gemini-2.5-flash
+    temperature: 0.2
+    context_budget: 8192
+    ---
+    You are a Principal Software Architect...
+
+Prompts are parsed and tokenized once per file version and kept as ready
+SystemMessages. The directory is polled for changes, and only files
+whose size or modification time changed are re-read.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from langchain_core.messages import SystemMessage
+
+from neuromind.config import MODELS, Config, ModelConfig
+from neuromind.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_FRONT_MATTER = "---"
+_FALLBACK_PROMPT = "You are a helpful assistant."
+
+
+@dataclass(frozen=True)
+class PersonaSpec:
+    name: str
+    prompt: str
+    description: str = ""
+    # Name of a ModelConfig in MODELS, used by threads without their own model
+    model: str | None = None
+    temperature: float | None = None
+    # Prompt tokens (system prompt, history, question) for this persona's turns
+    context_budget: int | None = None
+    # Built once per file version; every turn reuses them
+    message: SystemMessage = field(init=False, repr=False, compare=False)
+    token_count: int = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "message", SystemMessage(content=self.prompt))
+        object.__setattr__(self, "token_count", estimate_tokens(self.prompt))
+
+    def apply(self, model: ModelConfig) -> ModelConfig:
+        """The model config with this persona's temperature, if it sets one."""
+        if self.temperature is None or self.temperature == model.temperature:
+            return model
+        return dataclasses.replace(model, temperature=self.temperature)
+
+    @property
+    def context_window(self) -> int:
+        if self.context_budget is None:
+            return Config.CONTEXT_WINDOW
+        return min(self.context_budget, Config.CONTEXT_WINDOW)
+
+
+def parse_persona(name: str, text: str) -> PersonaSpec:
+    """Split optional front-matter from the prompt; ValueError on bad fields."""
+    meta: Dict[str, str] = {}
+    lines = text.splitlines()
+    if lines and lines[0].strip() == _FRONT_MATTER:
+        try:
+            end = next(
+                i
+                for i, line in enumerate(lines[1:], 1)
+                if line.strip() == _FRONT_MATTER
+            )
+        except StopIteration:
+            raise ValueError("front-matter is not closed with ---")
+        for line in lines[1:end]:
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            key, sep, value = line.partition(":")
+            if not sep:
+                raise ValueError(f"expected 'key: value', got {line!r}")
+            meta[key.strip().lower()] = value.strip().strip("\"'")
+        text = "\n".join(lines[end + 1 :])
+
+    unknown = set(meta) - {"description", "model", "temperature", "context_budget"}
+    if unknown:
+        raise ValueError(f"unknown front-matter keys: {', '.join(sorted(unknown))}")
+    model = meta.get("model") or None
+    if model is not None and model not in MODELS:
+        raise ValueError(f"unknown model {model}")
+    return PersonaSpec(
+        name=name,
+        prompt=text.strip(),
+        description=meta.get("description", ""),
+        model=model,
+        temperature=float(meta["temperature"]) if "temperature" in meta else None,
+        context_budget=(
+            int(meta["context_budget"]) if "context_budget" in meta else None
+        ),
+    )
+
+
+class PersonaRegistry:
+    """
+    Personas loaded from a directory. Lookups are dictionary reads; reload()
+    swaps in a new dictionary, so readers on other threads always see a
+    consistent set.
+    """
+
+    def __init__(self, directory: Path, default: str | None = None):
+        self.directory = directory
+        self.default_name = default or Config.Personas.DEFAULT
+        self._personas: Dict[str, PersonaSpec] = {}
+        # path -> (size, mtime_ns) of the version loaded
+        self._versions: Dict[Path, Tuple[int, int]] = {}
+        self._fallback = PersonaSpec(name=self.default_name, prompt=_FALLBACK_PROMPT)
+        self.reload()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._personas
+
+    def names(self) -> List[str]:
+        return sorted(self._personas)
+
+    def list(self) -> List[PersonaSpec]:
+        return [self._personas[name] for name in self.names()]
+
+    def get(self, name: str) -> PersonaSpec | None:
+        return self._personas.get(name)
+
+    def resolve(self, name: str) -> PersonaSpec:
+        """The named persona, else the default one (e.g. its file was removed)."""
+        spec = self._personas.get(name) or self._personas.get(self.default_name)
+        return spec or self._fallback
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        if not self.directory.is_dir():
+            return {}
+        found = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                found[Path(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def reload(self) -> List[str]:
+        """Re-read added, changed and removed files; returns the affected names."""
+        found = self._scan()
+        personas = dict(self._personas)
+        changed = []
+
+        for path in self._versions.keys() - found.keys():
+            personas.pop(path.stem, None)
+            changed.append(path.stem)
+
+        for path, version in found.items():
+            if self._versions.get(path) == version:
+                continue
+            try:
+                personas[path.stem] = parse_persona(
+                    path.stem, path.read_text(encoding="utf-8")
+                )
+                changed.append(path.stem)
+            except (OSError, UnicodeDecodeError, ValueError) as e:
+                # Keep serving the previous version until the file is fixed
+                logger.warning(f"Skipping persona file {path.name}: {e}")
+
+        self._personas = personas
+        self._versions = found
+        return changed
+
+    async def watch(self, interval_seconds: float | None = None):
+        """Poll the directory and reload changes until cancelled."""
+        interval = interval_seconds or Config.Personas.WATCH_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            changed = await asyncio.to_thread(self.reload)
+            if changed:
+                logger.info(f"Reloaded personas: {', '.join(sorted(changed))}")
@@ -0,0 +1,103 @@
+"""
+Bookkeeping for Ollama's prompt-prefix (KV cache) reuse.
+
+Ollama keeps the evaluated tokens of the last prompt in each of its
+parallel slots and only prefills the part of a new prompt that differs
+from them. A turn is cheap when its context starts with exactly the
+previous turn's context plus the answer. This module keeps history
+windows stable across turns and tracks which threads are still hot in
+the model's slots.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from neuromind.config import Config, ModelProvider
+from neuromind.tokens import estimate_tokens
+
+
+def _fingerprint(message: BaseMessage) -> bytes:
+    return hashlib.blake2b(
+        f"{message.type}\0{message.content}".encode(), digest_size=16
+    ).digest()
+
+
+@dataclass
+class PrefixMatch:
+    hot: bool
+    reused_messages: int
+    reused_tokens: int
+
+
+class PromptCacheTracker:
+    """
+    Remembers, for the most recently served threads, the conversation the
+    model has cached, and for every thread where its history window starts.
+    Only as many threads as the provider has parallel slots count as hot.
+    """
+
+    def __init__(self, slots: int | None = None):
+        self.slots = slots or Config.Scheduler.MAX_CONCURRENCY.get(
+            ModelProvider.OLLAMA, 1
+        )
+        self._cached: OrderedDict[int, List[bytes]] = OrderedDict()
+        self._window_starts: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def window_start(self, thread_id: int) -> int:
+        """Message id the thread's history window starts after."""
+        return self._window_starts.get(thread_id, 0)
+
+    def set_window_start(self, thread_id: int, after_id: int):
+        self._window_starts[thread_id] = after_id
+
+    def forget(self, thread_id: int):
+        self._cached.pop(thread_id, None)
+        self._window_starts.pop(thread_id, None)
+
+    def match(self, thread_id: int, context: List[BaseMessage]) -> PrefixMatch:
+        """How much of this context the model should still have cached."""
+        cached = self._cached.get(thread_id)
+        if cached is None:
+            self.misses += 1
+            return PrefixMatch(hot=False, reused_messages=0, reused_tokens=0)
+
+        reused = 0
+        for message, fingerprint in zip(context, cached):
+            if _fingerprint(message) != fingerprint:
+                break
+            reused += 1
+        if reused:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return PrefixMatch(
+            hot=True,
+            reused_messages=reused,
+            reused_tokens=sum(estimate_tokens(m.content) for m in context[:reused]),
+        )
+
+    def record(self, thread_id: int, context: List[BaseMessage], answer: str):
+        """The model now holds this context and answer in one of its slots."""
+        self._cached[thread_id] = [_fingerprint(m) for m in context] + [
+            _fingerprint(AIMessage(content=answer))
+        ]
+        self._cached.move_to_end(thread_id)
+        while len(self._cached) > self.slots:
+            self._cached.popitem(last=False)
+
+    def hot_threads(self) -> List[int]:
+        return list(self._cached)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hot_threads": len(self._cached),
+            "slots": self.slots,
+        }
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import math
+import time
+from array import array
+from dataclasses import asdict
+from typing import List, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage
+from sqlalchemy import Engine
+from sqlmodel import Field, Session, SQLModel, col, delete, select, update
+
+from neuromind.config import Config, ModelConfig
+
+logger = logging.getLogger(__name__)
+
+# (event type, content) pairs as streamed to the client
+CachedEvents = List[Tuple[str, str]]
+
+
+class CachedResponse(SQLModel, table=True):
+    """A streamed chat answer stored for replay."""
+
+    __tablename__ = "cached_response"
+
+    key: str = Field(primary_key=True)
+    # Hash of everything but the final user message, scopes semantic lookups
+    prefix_key: str = Field(index=True)
+    events: str
+    created_at: float
+    last_used_at: float = Field(index=True)
+    embedding: bytes | None = None
+
+
+def _hash(payload) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def context_keys(
+    persona: str, model: ModelConfig, context: List[BaseMessage]
+) -> Tuple[str, str]:
+    """Exact key and prefix key for an assembled context."""
+    messages = [(m.type, m.content) for m in context]
+    scope = {"persona": persona, "model": asdict(model)}
+    return (
+        _hash({**scope, "messages": messages}),
+        _hash({**scope, "messages": messages[:-1]}),
+    )
+
+
+def _cosine(a: array, b: array) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """
+    Cache of chat answers keyed by persona, model and assembled context,
+    stored in the application database with LRU and TTL eviction.
+    With an embedder, near-duplicate questions asked on top of the same
+    context are matched by cosine similarity.
+    """
+
+    def __init__(self, engine: Engine, embedder: Embeddings | None = None):
+        self.engine = engine
+        self.embedder = embedder
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        CachedResponse.__table__.create(engine, checkfirst=True)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "semantic": self.embedder is not None,
+        }
+
+    def get(self, key: str) -> CachedEvents | None:
+        with Session(self.engine) as session:
+            entry = session.get(CachedResponse, key)
+            if entry and time.time() - entry.created_at <= Config.Cache.TTL_SECONDS:
+                self.hits += 1
+                return json.loads(entry.events)
+        return None
+
+    def get_similar(
+        self, prefix_key: str, embedding: List[float]
+    ) -> Tuple[str, CachedEvents] | None:
+        """Best entry sharing the prefix whose question embedding is close enough."""
+        query = array("f", embedding)
+        oldest = time.time() - Config.Cache.TTL_SECONDS
+        with Session(self.engine) as session:
+            entries = session.exec(
+                select(CachedResponse).where(
+                    CachedResponse.prefix_key == prefix_key,
+                    col(CachedResponse.embedding).is_not(None),
+                    CachedResponse.created_at >= oldest,
+                )
+            ).all()
+
+        best, best_score = None, Config.Cache.SIMILARITY_THRESHOLD
+        for entry in entries:
+            vector = array("f")
+            vector.frombytes(entry.embedding)
+            score = _cosine(query, vector)
+            if score >= best_score:
+                best, best_score = entry, score
+
+        if best is None:
+            return None
+        self.semantic_hits += 1
+        return best.key, json.loads(best.events)
+
+    def record_miss(self):
+        self.misses += 1
+
+    async def embed(self, question: str) -> List[float] | None:
+        if self.embedder is None:
+            return None
+        try:
+            return await self.embedder.aembed_query(question)
+        except Exception as e:
+            logger.warning(f"Embedding for semantic cache failed: {e}")
+            return None
+
+    def touch(self, key: str):
+        with Session(self.engine) as session:
+            session.exec(
+                update(CachedResponse)
+                .where(CachedResponse.key == key)
+                .values(last_used_at=time.time())
+            )
+            session.commit()
+
+    def put(
+        self,
+        key: str,
+        prefix_key: str,
+        events: CachedEvents,
+        embedding: List[float] | None = None,
+    ):
+        now = time.time()
+        with Session(self.engine) as session:
+            session.merge(
+                CachedResponse(
+                    key=key,
+                    prefix_key=prefix_key,
+                    events=json.dumps(events),
+                    created_at=now,
+                    last_used_at=now,
+                    embedding=array("f", embedding).tobytes() if embedding else None,
+                )
+            )
+            self._evict(session, now)
+            session.commit()
+
+    def _evict(self, session: Session, now: float):
+        session.exec(
+            delete(CachedResponse).where(
+                CachedResponse.created_at < now - Config.Cache.TTL_SECONDS
+            )
+        )
+        keep = (
+            select(CachedResponse.key)
+            .order_by(col(CachedResponse.last_used_at).desc())
+            .limit(Config.Cache.MAX_ENTRIES)
+        )
+        session.exec(delete(CachedResponse).where(col(CachedResponse.key).not_in(keep)))
@@ -0,0 +1,223 @@
+"""
+Inference scheduler: bounds concurrent generations per model provider and
+hands out free slots round-robin across threads, so a busy thread cannot
+starve the others and a local model is not swamped by parallel requests.
+Also tracks in-flight generations so they can be cancelled.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Hashable, Set
+
+from neuromind.config import Config, ModelProvider
+
+
+class Ticket:
+    """A request's place in a provider queue, granted once a slot is free."""
+
+    def __init__(self, queue: "ProviderQueue", key: Hashable):
+        self.queue = queue
+        self.key = key
+        self.granted = False
+        self.released = False
+        self._changed = asyncio.Event()
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Yield the 1-based queue position each time it changes until granted."""
+        last = None
+        while not self.granted:
+            # Cleared before looking: changes made while the caller handles a
+            # yielded position still wake the wait below
+            self._changed.clear()
+            position = self.queue.position(self)
+            if position != last:
+                last = position
+                yield position
+            await self._changed.wait()
+
+    def release(self):
+        """Free the slot, or leave the queue if still waiting. Idempotent."""
+        if self.released:
+            return
+        self.released = True
+        if self.granted:
+            self.queue.release()
+        else:
+            self.queue.cancel(self)
+
+    def _notify(self):
+        self._changed.set()
+
+
+class ProviderQueue:
+    """
+    Waiting tickets grouped by key. A free slot goes to the waiting key that
+    was served least recently (keys never served first, in arrival order),
+    which is round-robin across keys while they all have work queued.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self._waiting: Dict[Hashable, Deque[Ticket]] = {}
+        self._served: Dict[Hashable, int] = {}
+        self._dispatched = 0
+
+    def __len__(self) -> int:
+        return sum(len(tickets) for tickets in self._waiting.values())
+
+    def enqueue(self, key: Hashable) -> Ticket:
+        ticket = Ticket(self, key)
+        self._waiting.setdefault(key, deque()).append(ticket)
+        self._dispatch()
+        return ticket
+
+    def _next_key(self, served: Dict[Hashable, int], waiting) -> Hashable:
+        return min(waiting, key=lambda key: served.get(key, -1))
+
+    def position(self, ticket: Ticket) -> int:
+        """Tickets that will be granted before this one, plus one."""
+        waiting = {key: list(tickets) for key, tickets in self._waiting.items()}
+        served = dict(self._served)
+        position = 1
+        while waiting:
+            key = self._next_key(served, waiting)
+            if waiting[key].pop(0) is ticket:
+                return position
+            if not waiting[key]:
+                del waiting[key]
+            served[key] = self._dispatched + position
+            position += 1
+        return 0
+
+    def release(self):
+        self.active -= 1
+        if not self.active and not self._waiting:
+            self._served.clear()
+        self._dispatch()
+
+    def cancel(self, ticket: Ticket):
+        tickets = self._waiting.get(ticket.key)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._waiting[ticket.key]
+            self._notify_waiting()
+
+    def _dispatch(self):
+        granted = False
+        while self._waiting and self.active < self.max_concurrency:
+            key = self._next_key(self._served, self._waiting)
+            tickets = self._waiting[key]
+            ticket = tickets.popleft()
+            if not tickets:
+                del self._waiting[key]
+            self._dispatched += 1
+            self._served[key] = self._dispatched
+            ticket.granted = True
+            ticket._notify()
+            self.active += 1
+            granted = True
+        if granted:
+            self._notify_waiting()
+
+    def _notify_waiting(self):
+        for tickets in self._waiting.values():
+            for ticket in tickets:
+                ticket._notify()
+
+
+class InferenceScheduler:
+    """
+    One fair queue per provider, limited by Config.Scheduler.MAX_CONCURRENCY.
+    Must be used from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Dict[ModelProvider, int] | None = None,
+        workers: int | None = None,
+    ):
+        self.max_concurrency = max_concurrency or Config.Scheduler.MAX_CONCURRENCY
+        # Each worker process has its own scheduler and a share of the limit
+        self.workers = workers or Config.Server.WORKERS
+        self._queues: Dict[ModelProvider, ProviderQueue] = {}
+
+    def _queue(self, provider: ModelProvider) -> ProviderQueue:
+        queue = self._queues.get(provider)
+        if queue is None:
+            limit = self.max_concurrency.get(
+                provider, Config.Scheduler.DEFAULT_CONCURRENCY
+            )
+            queue = self._queues[provider] = ProviderQueue(
+                max(1, limit // self.workers)
+            )
+        return queue
+
+    def enqueue(self, provider: ModelProvider, key: Hashable) -> Ticket:
+        """Join the provider's queue; release() the ticket when done."""
+        return self._queue(provider).enqueue(key)
+
+    @asynccontextmanager
+    async def slot(self, provider: ModelProvider, key: Hashable) -> AsyncIterator[None]:
+        """Wait for a slot without reporting queue positions."""
+        ticket = self.enqueue(provider, key)
+        try:
+            async for _ in ticket.wait():
+                pass
+            yield
+        finally:
+            ticket.release()
+
+    def stats(self) -> dict:
+        return {
+            provider.value: {
+                "active": queue.active,
+                "queued": len(queue),
+                "max_concurrency": queue.max_concurrency,
+            }
+            for provider, queue in self._queues.items()
+        }
+
+
+class Generation:
+    """An in-flight chat stream that another request can stop."""
+
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+        self.save_partial = Config.SAVE_PARTIAL_ANSWERS
+
+    def cancel(self, save_partial: bool | None = None):
+        if save_partial is not None:
+            self.save_partial = save_partial
+        self.cancelled.set()
+
+
+class ActiveGenerations:
+    """Chat streams in flight per thread, so they can be cancelled by id."""
+
+    def __init__(self):
+        self._by_thread: Dict[int, Set[Generation]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(generations) for generations in self._by_thread.values())
+
+    def start(self, thread_id: int, generation: Generation | None = None) -> Generation:
+        """Register a generation, a new one unless the caller holds its own."""
+        generation = generation or Generation()
+        self._by_thread.setdefault(thread_id, set()).add(generation)
+        return generation
+
+    def finish(self, thread_id: int, generation: Generation):
+        generations = self._by_thread.get(thread_id, set())
+        generations.discard(generation)
+        if not generations:
+            self._by_thread.pop(thread_id, None)
+
+    def cancel(self, thread_id: int, save_partial: bool | None = None) -> int:
+        """Cancel every generation of a thread, returns how many there were."""
+        generations = self._by_thread.get(thread_id, ())
+        for generation in generations:
+            generation.cancel(save_partial)
+        return len(generations)
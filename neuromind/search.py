@@ -0,0 +1,155 @@
+"""
+Full-text search over messages backed by an SQLite FTS5 table.
+message_fts rows share their rowid with message.id and are written in the
+same transaction as the messages they index. The index holds the plain
+text: it is written from Python, since message bodies may be stored
+compressed.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import Connection, Engine, text
+from sqlmodel import Session
+
+from neuromind.storage import decompress
+
+_INSERT = (
+    "INSERT INTO message_fts (rowid, content, thread_id, role) VALUES (?, ?, ?, ?)"
+)
+
+
+@dataclass
+class SearchResult:
+    thread: str
+    persona: str
+    message_id: int
+    role: str
+    snippet: str
+    rank: float
+
+
+def create_index(conn: Connection) -> bool:
+    """Create the FTS table, returns True if it did not exist yet."""
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'message_fts'"
+    ).first()
+    if exists:
+        return False
+
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE message_fts USING fts5("
+        "content, thread_id UNINDEXED, role UNINDEXED, tokenize = 'unicode61')"
+    )
+    return True
+
+
+def backfill(conn: Connection, batch_size: int = 1000):
+    conn.exec_driver_sql("DELETE FROM message_fts")
+    last = 0
+    while rows := conn.exec_driver_sql(
+        "SELECT id, content, thread_id, role FROM message WHERE id > ? "
+        "ORDER BY id LIMIT ?",
+        (last, batch_size),
+    ).all():
+        conn.exec_driver_sql(
+            _INSERT,
+            [
+                (id, decompress(content), thread_id, role)
+                for id, content, thread_id, role in rows
+            ],
+        )
+        last = rows[-1][0]
+    conn.exec_driver_sql("INSERT INTO message_fts (message_fts) VALUES ('optimize')")
+
+
+def rebuild(engine: Engine):
+    """Re-index every message, e.g. for databases written by older versions."""
+    with engine.begin() as conn:
+        create_index(conn)
+        backfill(conn)
+
+
+def index_messages(session: Session, messages: Iterable[Tuple[int, int, str, str]]):
+    """Index (id, thread_id, role, content) of messages just inserted."""
+    session.connection().exec_driver_sql(
+        _INSERT,
+        [(id, content, thread_id, role) for id, thread_id, role, content in messages],
+    )
+
+
+def unindex_thread(session: Session, thread_id: int):
+    session.exec(
+        text(
+            "DELETE FROM message_fts WHERE rowid IN "
+            "(SELECT id FROM message WHERE thread_id = :thread_id)"
+        ),
+        params={"thread_id": thread_id},
+    )
+
+
+def to_match_expression(query: str) -> str:
+    """Quote every term so user input is never parsed as FTS5 syntax."""
+    terms = query.split()
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search(
+    session: Session,
+    query: str,
+    lineage: List[Tuple[int, int]] | None = None,
+    persona: str | None = None,
+    limit: int = 20,
+) -> List[SearchResult]:
+    """
+    Best matches first. lineage, (thread_id, newest visible message id)
+    pairs of a thread and its fork ancestors, limits results to its history;
+    messages it shares with ancestors are then reported under its name.
+    """
+    expression = to_match_expression(query)
+    if not expression:
+        return []
+
+    owner = "f.thread_id"
+    filters = ""
+    params = {"query": expression, "limit": limit}
+    if lineage is not None:
+        ranges = []
+        for i, (thread_id, upto) in enumerate(lineage):
+            ranges.append(f"(f.thread_id = :thread_{i} AND f.rowid <= :upto_{i})")
+            params[f"thread_{i}"] = thread_id
+            params[f"upto_{i}"] = upto
+        filters += f" AND ({' OR '.join(ranges)})"
+        owner = ":thread_0"
+    if persona is not None:
+        filters += " AND t.persona = :persona"
+        params["persona"] = persona
+
+    rows = session.exec(
+        text(
+            "SELECT t.name, t.persona, f.rowid, f.role, "
+            "snippet(message_fts, 0, '[', ']', '…', 16), bm25(message_fts) AS rank "
+            f"FROM message_fts AS f JOIN thread AS t ON t.id = {owner} "
+            f"WHERE message_fts MATCH :query{filters} "
+            "ORDER BY rank LIMIT :limit"
+        ),
+        params=params,
+    ).all()
+    return [SearchResult(*row) for row in rows]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from neuromind.config import Config
+    from neuromind.thread_manager import ThreadManager
+
+    parser = argparse.ArgumentParser(description="NeuroMind search index")
+    parser.add_argument(
+        "command", choices=["rebuild"], help="rebuild: re-index all messages"
+    )
+    args = parser.parse_args()
+
+    db = ThreadManager(Config.Path.DATABASE_FILE)
+    rebuild(db.engine)
+    print(f"Search index rebuilt for {Config.Path.DATABASE_FILE}")
@@ -1,17 +1,62 @@
-import json
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Annotated, AsyncGenerator, Dict, Literal, Set, Tuple
 
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
-from langchain.chat_models import init_chat_model
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.requests import HTTPConnection
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTasks
 from langchain_core.messages import HumanMessage, SystemMessage
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
-from neuromind.config import Config, Persona
+from neuromind import memory
+from neuromind.batch import BatchJob, BatchRunner, parse_items
+from neuromind.config import MODELS, Config, ModelConfig, ModelProvider
+from neuromind.db_writer import DatabaseWriter
+from neuromind.metrics import (
+    ACTIVE_STREAMS,
+    CHAT_REQUESTS,
+    CHAT_STAGE_SECONDS,
+    PREFILL_SECONDS,
+    PROMPT_PREFIX_LOOKUPS,
+    PROMPT_PREFIX_REUSED_TOKENS,
+    PROMPT_TOKENS_EVALUATED,
+    REGISTRY,
+    TIME_TO_FIRST_TOKEN_SECONDS,
+    TOKENS_GENERATED,
+    TOKENS_PER_SECOND,
+    timed,
+)
+from neuromind.models import ModelRegistry, create_embeddings
+from neuromind.personas import PersonaRegistry
+from neuromind.prompt_cache import PromptCacheTracker
+from neuromind.response_cache import CachedEvents, ResponseCache, context_keys
+from neuromind.scheduler import ActiveGenerations, Generation, InferenceScheduler
+from neuromind.streaming import (
+    CreditWindow,
+    StreamFormat,
+    coalesce,
+    dumps,
+    encode_stream,
+    loads,
+    until_cancelled,
+)
+from neuromind.summarizer import Summarizer
 from neuromind.thread_manager import Thread, ThreadManager
+from neuromind.tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +65,12 @@ load_dotenv()
 
 class ThreadCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
-    persona: Persona = Persona.NEUROMIND
+    persona: str = Config.Personas.DEFAULT
+    model: str | None = None
+
+
+class ThreadFork(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
 
 
 class ThreadListItem(BaseModel):
@@ -34,40 +84,185 @@ class MessageCreate(BaseModel):
 
 
 class MessageResponse(BaseModel):
+    id: int
     role: str
     content: str
+    truncated: bool = False
+
+
+class ReasoningResponse(BaseModel):
+    message_id: int
+    content: str
+
+
+class MessageImport(BaseModel):
+    role: Literal["human", "ai"]
+    content: str
+
+
+class StreamOpen(BaseModel):
+    type: Literal["chat"]
+    stream: int | str
+    thread: str = Field(..., min_length=1, max_length=100)
+    content: str = Field(..., min_length=1)
+    coalesce_ms: int = Field(default=0, ge=0, le=1000)
+    window: int = Field(default=Config.WebSocket.WINDOW, ge=1)
+
+
+class StreamCancel(BaseModel):
+    type: Literal["cancel"]
+    stream: int | str
+    save_partial: bool | None = None
+
+
+class StreamCredit(BaseModel):
+    type: Literal["credit"]
+    stream: int | str
+    frames: int = Field(..., ge=1)
+
+
+# A /ws client frame, told apart by its "type"
+StreamControl = TypeAdapter(
+    Annotated[StreamOpen | StreamCancel | StreamCredit, Field(discriminator="type")]
+)
+
+
+class SearchResultResponse(BaseModel):
+    thread: str
+    persona: str
+    message_id: int
+    role: str
+    snippet: str
+    rank: float
 
 
 class PersonaResponse(BaseModel):
     name: str
     description: str
+    model: str | None = None
+    temperature: float | None = None
+    context_budget: int | None = None
 
 
-def get_db() -> ThreadManager:
-    return ThreadManager(Config.Path.DATABASE_FILE)
+def get_db(connection: HTTPConnection) -> ThreadManager:
+    return connection.app.state.db
 
 
-def get_llm():
-    model = Config.MODEL
-    return init_chat_model(
-        model.name,
-        model_provider=model.provider.value,
-        reasoning=True,
-        num_ctx=Config.CONTEXT_WINDOW,
-    )
+def get_writer(connection: HTTPConnection) -> DatabaseWriter:
+    return connection.app.state.writer
 
 
-def get_personas() -> dict[str, str]:
-    return {
-        p.value: (Config.Path.PERSONAS_DIR / f"{p.value}.md").read_text()
-        for p in Persona
-    }
+def get_cache(connection: HTTPConnection) -> ResponseCache:
+    return connection.app.state.response_cache
+
+
+def get_models(connection: HTTPConnection) -> ModelRegistry:
+    return connection.app.state.models
+
+
+def get_scheduler(connection: HTTPConnection) -> InferenceScheduler:
+    return connection.app.state.scheduler
+
+
+def get_generations(connection: HTTPConnection) -> ActiveGenerations:
+    return connection.app.state.generations
+
+
+def get_prompt_cache(connection: HTTPConnection) -> PromptCacheTracker | None:
+    return connection.app.state.prompt_cache
+
+
+def get_memory(connection: HTTPConnection) -> memory.LongTermMemory | None:
+    return connection.app.state.memory
+
+
+def get_batch(connection: HTTPConnection) -> BatchRunner:
+    return connection.app.state.batch
+
+
+def get_personas(connection: HTTPConnection) -> PersonaRegistry:
+    return connection.app.state.personas
+
+
+def resolve_model(thread: Thread, personas: PersonaRegistry) -> ModelConfig:
+    """The thread's own model, else its persona's, else Config.MODEL."""
+    persona = personas.resolve(thread.persona)
+    model = MODELS.get(thread.model) or MODELS.get(persona.model) or Config.MODEL
+    return persona.apply(model)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.personas = get_personas()
+    app.state.personas = PersonaRegistry(Config.Path.PERSONAS_DIR)
+    app.state.db = ThreadManager(Config.Path.DATABASE_FILE)
+    app.state.writer = DatabaseWriter(app.state.db.write_lock)
+    app.state.models = ModelRegistry()
+    app.state.response_cache = ResponseCache(
+        app.state.db.engine, create_embeddings(Config.Cache.EMBEDDING_MODEL)
+    )
+    app.state.scheduler = InferenceScheduler()
+    app.state.generations = ActiveGenerations()
+    app.state.prompt_cache = (
+        PromptCacheTracker() if Config.PromptCache.ENABLED else None
+    )
+    app.state.summarizer = Summarizer(
+        app.state.db,
+        app.state.writer,
+        app.state.models,
+        app.state.scheduler,
+    )
+    app.state.memory = None
+    if Config.Memory.ENABLED and memory.AVAILABLE:
+        app.state.memory = memory.LongTermMemory(
+            app.state.db, *memory.create_embedder()
+        )
+    elif Config.Memory.ENABLED:
+        logger.warning("Long-term memory needs numpy, running without it")
+
+    def prepare_batch_turn(thread: Thread, prompt: str):
+        context = _build_context(
+            thread,
+            prompt,
+            app.state.personas,
+            app.state.db,
+            prompt_cache=app.state.prompt_cache,
+        )
+        return context, resolve_model(thread, app.state.personas)
+
+    async def after_batch_turn(thread_id: int):
+        await app.state.summarizer.maybe_summarize(thread_id)
+        if app.state.memory:
+            await app.state.memory.sync()
+
+    app.state.batch = BatchRunner(
+        app.state.db,
+        app.state.writer,
+        app.state.models,
+        app.state.scheduler,
+        prepare_batch_turn,
+        after_batch_turn,
+    )
+    # Pick up jobs that were interrupted by a crash or restart
+    app.state.batch.resume()
+    background = []
+    if Config.Personas.WATCH_INTERVAL_SECONDS:
+        background.append(asyncio.create_task(app.state.personas.watch()))
+    # Build the default model's client (importing its provider) while already
+    # serving, so startup doesn't wait for it and the first chat rarely does
+    if Config.WARM_UP_MODEL:
+        warm_up = app.state.models.warm_up(Config.MODEL, app.state.scheduler)
+        background.append(asyncio.create_task(warm_up))
+    else:
+        background.append(asyncio.create_task(app.state.models.preload(Config.MODEL)))
+    if app.state.memory:
+        # Catch up with messages stored while the server was down
+        background.append(asyncio.create_task(app.state.memory.sync()))
     yield
+    for task in background:
+        task.cancel()
+    await app.state.batch.close()
+    app.state.writer.close()
+    app.state.db.close()
 
 
 app = FastAPI(
@@ -79,11 +274,17 @@ app = FastAPI(
 
 
 @app.get("/personas", response_model=list[PersonaResponse])
-def list_personas():
+def list_personas(personas: PersonaRegistry = Depends(get_personas)):
     """List all available personas."""
     return [
-        PersonaResponse(name=p.value, description=f"{p.value.title()} persona")
-        for p in Persona
+        PersonaResponse(
+            name=p.name,
+            description=p.description,
+            model=p.model,
+            temperature=p.temperature,
+            context_budget=p.context_budget,
+        )
+        for p in personas.list()
     ]
 
 
@@ -98,9 +299,44 @@ def list_threads(db: ThreadManager = Depends(get_db)):
 
 
 @app.post("/threads", response_model=Thread, status_code=201)
-def create_thread(data: ThreadCreate, db: ThreadManager = Depends(get_db)):
+async def create_thread(
+    data: ThreadCreate,
+    db: ThreadManager = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
+    personas: PersonaRegistry = Depends(get_personas),
+):
     """Create a new conversation thread."""
-    return db.get_or_create_thread(data.name, data.persona)
+    if data.model is not None and data.model not in MODELS:
+        raise HTTPException(status_code=422, detail=f"Unknown model: {data.model}")
+    if data.persona not in personas:
+        raise HTTPException(status_code=422, detail=f"Unknown persona: {data.persona}")
+    return await writer.submit(
+        db.get_or_create_thread, data.name, data.persona, data.model
+    )
+
+
+@app.post("/threads/{thread_name}/fork", response_model=Thread, status_code=201)
+async def fork_thread(
+    thread_name: str,
+    data: ThreadFork,
+    at: int | None = Query(default=None, ge=1),
+    db: ThreadManager = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
+):
+    """
+    Branch a thread into a new one that continues its history from message
+    `at` (default: the newest). The history is shared, not copied, so forking
+    costs the same however long the thread is.
+    """
+    thread = await asyncio.to_thread(db.get_thread, thread_name)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    if await asyncio.to_thread(db.get_thread, data.name):
+        raise HTTPException(status_code=409, detail="Thread already exists")
+    try:
+        return await writer.submit(db.fork_thread, thread.id, data.name, at)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 
 @app.get("/threads/{thread_name}", response_model=Thread)
@@ -113,80 +349,699 @@ def get_thread_endpoint(thread_name: str, db: ThreadManager = Depends(get_db)):
 
 
 @app.get("/threads/{thread_name}/messages", response_model=list[MessageResponse])
-def get_messages(thread_name: str, db: ThreadManager = Depends(get_db)):
-    """Get message history for a thread."""
+def get_messages(
+    thread_name: str,
+    response: Response,
+    before_id: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: ThreadManager = Depends(get_db),
+):
+    """
+    Get a page of message history, oldest first.
+    Returns the newest `limit` messages older than before_id. When more
+    remain, X-Next-Before-Id holds the cursor for the previous page.
+    """
     thread = db.get_thread(thread_name)
     if not thread:
         raise HTTPException(status_code=404, detail="Thread not found")
-    history = db.get_history(thread.id)
-    return [MessageResponse(role=msg.type, content=msg.content) for msg in history]
+    rows = db.get_messages_page(thread.id, before_id, limit)
+    if len(rows) == limit:
+        response.headers["X-Next-Before-Id"] = str(rows[0][0])
+    return [
+        MessageResponse(id=id, role=role, content=content, truncated=truncated)
+        for id, role, content, truncated in rows
+    ]
 
 
-@app.delete("/threads/{thread_name}/messages", status_code=204)
-def clear_messages(thread_name: str, db: ThreadManager = Depends(get_db)):
-    """Clear all messages in a thread."""
+@app.get(
+    "/threads/{thread_name}/messages/{message_id}/reasoning",
+    response_model=ReasoningResponse,
+)
+def get_reasoning(
+    thread_name: str, message_id: int, db: ThreadManager = Depends(get_db)
+):
+    """Reasoning trace of an AI message, stored apart from the message itself."""
     thread = db.get_thread(thread_name)
     if not thread:
         raise HTTPException(status_code=404, detail="Thread not found")
-    db.clear_messages(thread.id)
+    content = db.get_reasoning(thread.id, message_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail="No reasoning for this message")
+    return ReasoningResponse(message_id=message_id, content=content)
 
 
-def _build_context(thread: Thread, user_input: str, personas: dict, db: ThreadManager):
-    sys_prompt = personas.get(thread.persona, personas[Persona.NEUROMIND.value])
-    messages = [SystemMessage(content=sys_prompt)]
-    messages.extend(db.get_history(thread.id))
-    messages.append(HumanMessage(content=user_input))
-    return messages
+@app.get("/threads/{thread_name}/export")
+def export_messages(thread_name: str, db: ThreadManager = Depends(get_db)):
+    """Stream the whole thread as NDJSON, one message per line, oldest first."""
+    thread = db.get_thread(thread_name)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
 
+    def rows():
+        for id, role, content, truncated in db.iter_messages(thread.id):
+            message = {"id": id, "role": role, "content": content}
+            if truncated:
+                message["truncated"] = True
+            yield dumps(message) + b"\n"
 
-@app.post("/threads/{thread_name}/chat")
-async def chat(
+    return StreamingResponse(rows(), media_type=StreamFormat.NDJSON.value)
+
+
+@app.post("/threads/{thread_name}/messages", status_code=201)
+async def import_messages(
+    thread_name: str,
+    messages: list[MessageImport],
+    db: ThreadManager = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
+):
+    """Append messages to a thread in bulk, creating the thread if needed."""
+    thread = await writer.submit(
+        db.import_thread, thread_name, [(m.role, m.content) for m in messages]
+    )
+    return {"imported": len(messages), "message_count": thread.message_count}
+
+
+@app.delete("/threads/{thread_name}/messages", status_code=204)
+async def clear_messages(
     thread_name: str,
-    data: MessageCreate,
     db: ThreadManager = Depends(get_db),
-    llm=Depends(get_llm),
+    writer: DatabaseWriter = Depends(get_writer),
+    prompt_cache: PromptCacheTracker | None = Depends(get_prompt_cache),
 ):
-    """Send a message and stream the AI response via Server-Sent Events."""
-    thread = db.get_or_create_thread(thread_name)
-    context = _build_context(thread, data.content, app.state.personas, db)
+    """Clear all messages in a thread. Refused while forks share them."""
+    thread = await asyncio.to_thread(db.get_thread, thread_name)
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    try:
+        await writer.submit(db.clear_messages, thread.id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if prompt_cache:
+        prompt_cache.forget(thread.id)
+
+
+@app.get("/search", response_model=list[SearchResultResponse])
+def search_messages(
+    q: str = Query(..., min_length=1),
+    thread: str | None = None,
+    persona: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: ThreadManager = Depends(get_db),
+):
+    """Full-text search across all threads, best matches first."""
+    results = db.search(q, thread, persona, limit)
+    return [SearchResultResponse(**vars(r)) for r in results]
+
+
+def _history_start(
+    db: ThreadManager,
+    prompt_cache: PromptCacheTracker | None,
+    thread_id: int,
+    token_budget: int,
+    after_id: int,
+) -> int:
+    """
+    Message id the history window starts after. Without prompt caching the
+    window slides with every turn. With it, the start stays put until the
+    history outgrows its budget and then jumps far enough ahead to stay put
+    again for a while, so consecutive prompts share their prefix.
+    """
+    if prompt_cache is None:
+        return after_id
+
+    start = max(after_id, prompt_cache.window_start(thread_id))
+    if db.count_tokens_after(thread_id, start) > token_budget:
+        refill = int(token_budget * Config.PromptCache.REFILL_RATIO)
+        start = db.get_window_start(thread_id, refill, start)
+        prompt_cache.set_window_start(thread_id, start)
+    return start
+
+
+def _build_context(
+    thread: Thread,
+    user_input: str,
+    personas: PersonaRegistry,
+    db: ThreadManager,
+    long_term_memory: memory.LongTermMemory | None = None,
+    query_embedding: list[float] | None = None,
+    prompt_cache: PromptCacheTracker | None = None,
+):
+    # Parsed, tokenized and wrapped when the persona file was loaded
+    persona = personas.resolve(thread.persona)
+    history_budget = (
+        persona.context_window
+        - Config.RESPONSE_TOKEN_RESERVE
+        - persona.token_count
+        - estimate_tokens(user_input)
+    )
+    messages = [persona.message]
+
+    after_id = 0
+    summary = db.get_summary(thread.id) if Config.Summary.ENABLED else None
+    if summary:
+        messages.append(
+            SystemMessage(
+                content=f"Summary of the earlier conversation:\n{summary.content}"
+            )
+        )
+        history_budget -= summary.token_count
+        after_id = summary.until_message_id
+
+    recalled = []
+    if long_term_memory and query_embedding:
+        # Reserved whether used or not, so the history budget is the same
+        # from turn to turn
+        memory_budget = min(Config.Memory.MAX_TOKENS, history_budget // 2)
+        history_budget -= memory_budget
+
+    start = _history_start(db, prompt_cache, thread.id, history_budget, after_id)
+    if long_term_memory and query_embedding:
+        recalled = long_term_memory.recall(
+            query_embedding, thread.id, start, memory_budget
+        )
+
+    messages.extend(db.get_recent_history(thread.id, history_budget, start))
+    if recalled:
+        # After the history: the excerpts change every turn and would
+        # otherwise break the prompt prefix the model has cached
+        messages.append(SystemMessage(content=memory.render(recalled)))
+    messages.append(HumanMessage(content=user_input))
+    return messages
+
+
+def _coalesce(events: CachedEvents) -> CachedEvents:
+    """Merge consecutive events of the same type so replays need fewer frames."""
+    merged: CachedEvents = []
+    for event_type, content in events:
+        if merged and merged[-1][0] == event_type:
+            merged[-1] = (event_type, merged[-1][1] + content)
+        else:
+            merged.append((event_type, content))
+    return merged
+
+
+async def _chat_events(
+    thread_name: str,
+    user_input: str,
+    db: ThreadManager,
+    writer: DatabaseWriter,
+    models: ModelRegistry,
+    cache: ResponseCache,
+    long_term_memory: memory.LongTermMemory | None,
+    scheduler: InferenceScheduler,
+    generations: ActiveGenerations,
+    prompt_cache: PromptCacheTracker | None,
+    generation: Generation | None = None,
+) -> Tuple[AsyncGenerator[dict, None], BackgroundTasks]:
+    """
+    Prepare a chat turn: load the thread and build its context. Returns the
+    turn's event stream and the tasks to run once it has finished. Pass
+    `generation` to be able to cancel this very stream.
+    """
+    request_start = time.perf_counter()
+    # Storage calls are synchronous: reads go to the thread pool and writes to
+    # the single writer thread so they never stall other streams.
+    with timed("load_thread"):
+        thread = await asyncio.to_thread(db.get_thread, thread_name)
+        if not thread:
+            thread = await writer.submit(db.get_or_create_thread, thread_name)
+    query_embedding = None
+    if long_term_memory:
+        with timed("embed_query"):
+            query_embedding = await long_term_memory.embed_query(user_input)
+    with timed("build_context"):
+        context = await asyncio.to_thread(
+            _build_context,
+            thread,
+            user_input,
+            app.state.personas,
+            db,
+            long_term_memory,
+            query_embedding,
+            prompt_cache,
+        )
+    model = resolve_model(thread, app.state.personas)
+    # Building a model's client the first time imports LangChain and the
+    # provider package, keep that off the event loop
+    llm = await asyncio.to_thread(models.get, model)
+    # Ollama reuses the cached prefix of the previous prompt in a slot
+    track_prefix = prompt_cache is not None and model.provider == ModelProvider.OLLAMA
 
-    async def generate() -> AsyncGenerator[str, None]:
-        full_content = ""
+    async def lookup_cache(key: str, prefix_key: str):
+        """Returns (cached events or None, question embedding or None)."""
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            await writer.submit(cache.touch, key)
+            return cached, None
 
+        embedding = await cache.embed(user_input)
+        if embedding:
+            match = await asyncio.to_thread(cache.get_similar, prefix_key, embedding)
+            if match:
+                hit_key, cached = match
+                await writer.submit(cache.touch, hit_key)
+                return cached, None
+
+        cache.record_miss()
+        return None, embedding
+
+    async def stream_llm() -> AsyncGenerator[dict, None]:
+        # Wait for a generation slot. A client that disconnects meanwhile
+        # cancels this generator, which leaves the queue (or frees the slot).
+        ticket = scheduler.enqueue(model.provider, thread.name)
         try:
-            async for chunk in llm.astream(context):
-                if not chunk.content and not chunk.additional_kwargs.get(
-                    "reasoning_content"
-                ):
-                    continue
+            with timed("queue"):
+                async for position in ticket.wait():
+                    yield {"type": "queued", "position": position}
+            async for event in generate_llm():
+                yield event
+        finally:
+            ticket.release()
+
+    async def generate_llm() -> AsyncGenerator[dict, None]:
+        generation_start = time.perf_counter()
+        chunks = 0
+        async for chunk in llm.astream(context):
+            prefill_ns = chunk.response_metadata.get("prompt_eval_duration")
+            if prefill_ns is not None:
+                PREFILL_SECONDS.observe(prefill_ns / 1e9, model=model.name)
+                PROMPT_TOKENS_EVALUATED.inc(
+                    chunk.response_metadata.get("prompt_eval_count", 0),
+                    model=model.name,
+                )
+            # A chunk may carry both, the reasoning comes first
+            chunk_events = [
+                (event_type, text)
+                for event_type, text in (
+                    ("reasoning", chunk.additional_kwargs.get("reasoning_content")),
+                    ("content", chunk.content),
+                )
+                if text
+            ]
+            if not chunk_events:
+                continue
 
-                if chunk.content:
-                    full_content += chunk.content
+            if not chunks:
+                TIME_TO_FIRST_TOKEN_SECONDS.observe(
+                    time.perf_counter() - request_start, model=model.name
+                )
+            chunks += 1
+            for event_type, text in chunk_events:
+                yield {"type": event_type, "content": text}
 
-                if chunk.additional_kwargs.get("reasoning_content"):
-                    yield f"data: {json.dumps({'type': 'reasoning', 'content': chunk.additional_kwargs['reasoning_content']})}\n\n"
-                elif chunk.content:
-                    yield f"data: {json.dumps({'type': 'content', 'content': chunk.content})}\n\n"
+        elapsed = time.perf_counter() - generation_start
+        CHAT_STAGE_SECONDS.observe(elapsed, stage="generation")
+        TOKENS_GENERATED.inc(chunks, model=model.name)
+        if chunks and elapsed > 0:
+            TOKENS_PER_SECOND.observe(chunks / elapsed, model=model.name)
 
-            db.add_message(thread.id, "human", data.content)
-            db.add_message(thread.id, "ai", full_content)
+    def answer_text(events: CachedEvents, event_type: str = "content") -> str:
+        return "".join(content for type_, content in events if type_ == event_type)
 
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+    generation = generation or Generation()
+
+    async def generate() -> AsyncGenerator[dict, None]:
+        events: CachedEvents = []
+        outcome = "error"
+        ACTIVE_STREAMS.inc()
+        generations.start(thread.id, generation)
+        persisted = False
+
+        try:
+            cached, embedding = None, None
+            if Config.Cache.ENABLED:
+                key, prefix_key = context_keys(thread.persona, model, context)
+                with timed("cache_lookup"):
+                    cached, embedding = await lookup_cache(key, prefix_key)
+
+            if cached is not None:
+                # Replay at full speed, no pacing
+                for event_type, content in cached:
+                    yield {"type": event_type, "content": content}
+                events = cached
+            else:
+                if track_prefix:
+                    match = prompt_cache.match(thread.id, context)
+                    PROMPT_PREFIX_LOOKUPS.inc(
+                        outcome="hit" if match.reused_messages else "miss"
+                    )
+                    PROMPT_PREFIX_REUSED_TOKENS.inc(match.reused_tokens)
+                # Recorded as they are passed on: events still buffered when
+                # the generation is cancelled are neither sent nor saved
+                async for event in until_cancelled(stream_llm(), generation.cancelled):
+                    if event["type"] in ("reasoning", "content"):
+                        events.append((event["type"], event["content"]))
+                    yield event
+
+            full_content = answer_text(events)
+            truncated = generation.cancelled.is_set()
+            # Set before the write: a disconnect while it is in flight must
+            # not queue the exchange a second time
+            persisted = True
+            if not truncated or (generation.save_partial and full_content):
+                with timed("persist"):
+                    await writer.submit(
+                        db.add_exchange,
+                        thread.id,
+                        user_input,
+                        full_content,
+                        truncated,
+                        answer_text(events, "reasoning"),
+                    )
+            if truncated:
+                outcome = "cancelled"
+                yield {"type": "done", "truncated": True}
+                return
+
+            if cached is None and track_prefix:
+                prompt_cache.record(thread.id, context, full_content)
+            if Config.Cache.ENABLED and cached is None and full_content:
+                await writer.submit(
+                    cache.put, key, prefix_key, _coalesce(events), embedding
+                )
+
+            outcome = "ok" if cached is None else "cache_hit"
+            yield {"type": "done"}
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client disconnected and the response is being torn down;
+            # awaiting is no longer possible, so the write is only queued.
+            outcome = "cancelled"
+            full_content = answer_text(events)
+            if not persisted and generation.save_partial and full_content:
+                writer.submit_nowait(
+                    db.add_exchange,
+                    thread.id,
+                    user_input,
+                    full_content,
+                    True,
+                    answer_text(events, "reasoning"),
+                )
+            raise
 
         except ConnectionError as e:
             logger.error(f"LLM connection failed during stream: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'error': 'connection_failed', 'message': f'AI model unavailable. Please ensure {Config.MODEL.name} is running.'})}\n\n"
+            yield {
+                "type": "error",
+                "error": "connection_failed",
+                "message": f"AI model unavailable. Please ensure {model.name} is running.",
+            }
         except TimeoutError as e:
             logger.error(f"LLM request timed out during stream: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'error': 'timeout', 'message': 'AI model request timed out. Please try again.'})}\n\n"
+            yield {
+                "type": "error",
+                "error": "timeout",
+                "message": "AI model request timed out. Please try again.",
+            }
         except Exception as e:
             logger.exception(f"Unexpected error during stream: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'error': 'internal_error', 'message': str(e)})}\n\n"
+            yield {"type": "error", "error": "internal_error", "message": str(e)}
+        finally:
+            generations.finish(thread.id, generation)
+            ACTIVE_STREAMS.dec()
+            CHAT_REQUESTS.inc(model=model.name, outcome=outcome)
+
+    # Runs once the stream has finished, so the user never waits on it
+    background = BackgroundTasks()
+    background.add_task(app.state.summarizer.maybe_summarize, thread.id)
+    if long_term_memory:
+        background.add_task(long_term_memory.sync)
+
+    return generate(), background
+
+
+@app.post("/threads/{thread_name}/chat")
+async def chat(
+    thread_name: str,
+    data: MessageCreate,
+    db: ThreadManager = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
+    models: ModelRegistry = Depends(get_models),
+    cache: ResponseCache = Depends(get_cache),
+    long_term_memory: memory.LongTermMemory | None = Depends(get_memory),
+    scheduler: InferenceScheduler = Depends(get_scheduler),
+    generations: ActiveGenerations = Depends(get_generations),
+    prompt_cache: PromptCacheTracker | None = Depends(get_prompt_cache),
+    accept: str | None = Header(default=None),
+    coalesce_ms: int = Query(default=0, ge=0, le=1000),
+):
+    """
+    Send a message and stream the AI response.
+    Streams Server-Sent Events by default, NDJSON when the client accepts
+    application/x-ndjson. coalesce_ms merges chunks arriving within that window.
+    """
+    events, background = await _chat_events(
+        thread_name,
+        data.content,
+        db,
+        writer,
+        models,
+        cache,
+        long_term_memory,
+        scheduler,
+        generations,
+        prompt_cache,
+    )
+    stream_format = StreamFormat.negotiate(accept)
+    return StreamingResponse(
+        encode_stream(events, stream_format, coalesce_ms),
+        media_type=stream_format.value,
+        background=background,
+    )
+
+
+@app.websocket("/ws")
+async def chat_streams(
+    websocket: WebSocket,
+    db: ThreadManager = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
+    models: ModelRegistry = Depends(get_models),
+    cache: ResponseCache = Depends(get_cache),
+    long_term_memory: memory.LongTermMemory | None = Depends(get_memory),
+    scheduler: InferenceScheduler = Depends(get_scheduler),
+    generations: ActiveGenerations = Depends(get_generations),
+    prompt_cache: PromptCacheTracker | None = Depends(get_prompt_cache),
+):
+    """
+    Chat streams of any number of threads multiplexed over one connection.
+    {"type": "chat", "stream": id, "thread", "content"} opens a stream
+    (optional: coalesce_ms, window). Its events are the ones the chat
+    endpoint sends, tagged with "stream", and end with done or error.
+    {"type": "cancel", "stream": id} stops the generation like DELETE
+    .../chat/active. A stream sends `window` events at most until the client
+    returns credit with {"type": "credit", "stream": id, "frames": n}.
+    Disconnecting stops every stream of the connection.
+    """
+    await websocket.accept()
+    streams: Dict[int | str, Tuple[Generation, CreditWindow]] = {}
+    tasks: Set[asyncio.Task] = set()
+    send_lock = asyncio.Lock()
+
+    async def send(frame: dict):
+        async with send_lock:
+            await websocket.send_text(dumps(frame).decode())
+
+    async def run(request: StreamOpen, generation: Generation, window: CreditWindow):
+        try:
+            events, background = await _chat_events(
+                request.thread,
+                request.content,
+                db,
+                writer,
+                models,
+                cache,
+                long_term_memory,
+                scheduler,
+                generations,
+                prompt_cache,
+                generation,
+            )
+        except Exception as e:
+            # Where the chat endpoint would answer 500
+            logger.exception(f"Could not start chat stream: {e}")
+            streams.pop(request.stream, None)
+            await send(
+                {
+                    "stream": request.stream,
+                    "type": "error",
+                    "error": "internal_error",
+                    "message": str(e),
+                }
+            )
+            return
+
+        try:
+            async for event in coalesce(events, request.coalesce_ms):
+                if event["type"] not in ("done", "error"):
+                    await window.acquire()
+                await send({"stream": request.stream, **event})
+        finally:
+            streams.pop(request.stream, None)
+        await background()
+
+    def finished(task: asyncio.Task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error("WebSocket chat stream failed", exc_info=task.exception())
+
+    async def open_stream(request: StreamOpen):
+        if request.stream in streams:
+            error = ("stream_in_use", "Stream id is already in use")
+        elif len(streams) >= Config.WebSocket.MAX_STREAMS:
+            error = ("too_many_streams", "Too many streams on this connection")
+        else:
+            streams[request.stream] = Generation(), CreditWindow(request.window)
+            task = asyncio.create_task(run(request, *streams[request.stream]))
+            tasks.add(task)
+            task.add_done_callback(finished)
+            return
+        await send(
+            {
+                "stream": request.stream,
+                "type": "error",
+                "error": error[0],
+                "message": error[1],
+            }
+        )
+
+    try:
+        while True:
+            message = None
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            try:
+                if received.get("text") is None:
+                    raise ValueError("Frames must be JSON text")
+                message = loads(received["text"])
+                request = StreamControl.validate_python(message)
+            # Malformed JSON and pydantic's ValidationError are ValueErrors
+            except ValueError as e:
+                frame = {"type": "error", "error": "bad_request", "message": str(e)}
+                if isinstance(message, dict) and "stream" in message:
+                    frame["stream"] = message["stream"]
+                await send(frame)
+                continue
 
-    return StreamingResponse(generate(), media_type="text/event-stream")
+            if isinstance(request, StreamOpen):
+                await open_stream(request)
+            # Cancels and credit may cross the end of their stream
+            elif request.stream in streams:
+                generation, window = streams[request.stream]
+                if isinstance(request, StreamCancel):
+                    generation.cancel(request.save_partial)
+                else:
+                    window.grant(request.frames)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        running = list(tasks)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+@app.delete("/threads/{thread_name}/chat/active", status_code=204)
+async def cancel_chat(
+    thread_name: str,
+    save_partial: bool | None = None,
+    db: ThreadManager = Depends(get_db),
+    generations: ActiveGenerations = Depends(get_generations),
+):
+    """
+    Stop the thread's in-flight generations and free their inference slots.
+    save_partial overrides Config.SAVE_PARTIAL_ANSWERS for the cut-off answer.
+    """
+    thread = await asyncio.to_thread(db.get_thread, thread_name)
+    if not thread or not generations.cancel(thread.id, save_partial):
+        raise HTTPException(status_code=404, detail="No active generation")
+
+
+@app.post("/batch", response_model=BatchJob, status_code=202)
+async def submit_batch(
+    request: Request,
+    concurrency: int = Query(
+        default=Config.Batch.CONCURRENCY, ge=1, le=Config.Batch.MAX_CONCURRENCY
+    ),
+    batch: BatchRunner = Depends(get_batch),
+    models: ModelRegistry = Depends(get_models),
+    personas: PersonaRegistry = Depends(get_personas),
+):
+    """
+    Start a batch job. The body is JSONL, one {"thread", "prompt", "persona"?,
+    "model"?} object per line. Poll GET /batch/{id} for progress.
+    """
+    body = (await request.body()).decode()
+    try:
+        items = await asyncio.to_thread(
+            parse_items, body.splitlines(), personas.names()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch has no items")
+    if len(items) > Config.Batch.MAX_ITEMS:
+        raise HTTPException(
+            status_code=422, detail=f"Batch exceeds {Config.Batch.MAX_ITEMS} items"
+        )
+    return await batch.create(items, concurrency, models)
+
+
+@app.get("/batch", response_model=list[BatchJob])
+def list_batches(batch: BatchRunner = Depends(get_batch)):
+    """List batch jobs, newest first."""
+    return batch.list()
+
+
+@app.get("/batch/{job_id}", response_model=BatchJob)
+def get_batch_job(job_id: str, batch: BatchRunner = Depends(get_batch)):
+    """Status and progress of a batch job."""
+    job = batch.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return job
+
+
+@app.get("/batch/{job_id}/results")
+def get_batch_results(job_id: str, batch: BatchRunner = Depends(get_batch)):
+    """Results finished so far as JSONL, in completion order."""
+    if not batch.get(job_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    path = batch.results_path(job_id)
+    if not path.exists():
+        return Response(content=b"", media_type="application/x-ndjson")
+    return FileResponse(path, media_type="application/x-ndjson")
+
+
+@app.delete("/batch/{job_id}", response_model=BatchJob)
+async def cancel_batch(job_id: str, batch: BatchRunner = Depends(get_batch)):
+    """Stop a batch job; results finished so far are kept."""
+    job = await batch.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return job
 
 
 @app.get("/health")
-def health_check():
+def health_check(
+    cache: ResponseCache = Depends(get_cache),
+    long_term_memory: memory.LongTermMemory | None = Depends(get_memory),
+    scheduler: InferenceScheduler = Depends(get_scheduler),
+    prompt_cache: PromptCacheTracker | None = Depends(get_prompt_cache),
+):
     """Health check endpoint."""
-    return {"status": "ok", "model": Config.MODEL.name}
+    return {
+        "status": "ok",
+        "model": Config.MODEL.name,
+        "models": list(MODELS),
+        "cache": cache.stats(),
+        "scheduler": scheduler.stats(),
+        "prompt_cache": prompt_cache.stats() if prompt_cache else None,
+        "memory": long_term_memory.stats() if long_term_memory else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
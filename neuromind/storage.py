@@ -0,0 +1,172 @@
+"""
+Compressed storage of message and reasoning bodies.
+
+Bodies of at least Config.Storage.COMPRESS_MIN_BYTES are stored as BLOBs:
+a one-byte codec tag followed by the compressed UTF-8 text, zstd when the
+optional zstandard package is installed and zlib otherwise. Shorter
+bodies, and those that don't shrink, stay plain TEXT. CompressedText does
+the conversion in the column type: queries selecting the column get text
+back, and queries that don't select it (windows, counts, listings) never
+pay for decompression. The FTS index keeps its own plain-text copy.
+"""
+
+import zlib
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import Connection, Engine, Text
+from sqlalchemy.types import TypeDecorator
+
+from neuromind.config import Config
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+_ZLIB = b"\x01"
+_ZSTD = b"\x02"
+
+
+def compress(text: str) -> str | bytes:
+    """Stored form of a body: the text itself, or tagged compressed bytes."""
+    settings = Config.Storage
+    data = text.encode()
+    if len(data) < settings.COMPRESS_MIN_BYTES:
+        return text
+    if settings.CODEC == "zstd" and zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=settings.ZSTD_LEVEL)
+        packed = _ZSTD + compressor.compress(data)
+    else:
+        packed = _ZLIB + zlib.compress(data, settings.ZLIB_LEVEL)
+    return packed if len(packed) < len(data) else text
+
+
+def decompress(value: str | bytes | None) -> str | None:
+    if not isinstance(value, bytes):
+        return value
+    tag, body = value[:1], value[1:]
+    if tag == _ZLIB:
+        return zlib.decompress(body).decode()
+    if tag == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Body is zstd-compressed, install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(body).decode()
+    raise ValueError(f"Unknown compression tag {tag!r}")
+
+
+class CompressedText(TypeDecorator):
+    """TEXT column whose large values are stored compressed."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else compress(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress(value)
+
+
+def compress_column(conn: Connection, table: str, key: str, batch_size: int = 500):
+    """Compress the large plain-text bodies already stored in table.content."""
+    last = 0
+    while True:
+        rows = conn.exec_driver_sql(
+            f"SELECT {key}, content FROM {table} WHERE {key} > ? "
+            "AND typeof(content) = 'text' AND length(CAST(content AS BLOB)) >= ? "
+            f"ORDER BY {key} LIMIT ?",
+            (last, Config.Storage.COMPRESS_MIN_BYTES, batch_size),
+        ).all()
+        if not rows:
+            return
+        updates = [
+            (stored, row_id)
+            for row_id, content in rows
+            if isinstance(stored := compress(content), bytes)
+        ]
+        if updates:
+            conn.exec_driver_sql(
+                f"UPDATE {table} SET content = ? WHERE {key} = ?", updates
+            )
+        last = rows[-1][0]
+
+
+@dataclass
+class TableUsage:
+    table: str
+    rows: int
+    compressed_rows: int
+    # Bytes of the bodies as stored, and as UTF-8 text
+    stored_bytes: int
+    text_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.text_bytes - self.stored_bytes
+
+
+def report(engine: Engine) -> List[TableUsage]:
+    """How much the body columns take on disk, compressed and uncompressed."""
+    usage = []
+    with engine.connect() as conn:
+        for table in ("message", "message_reasoning"):
+            rows, compressed, stored, plain = conn.exec_driver_sql(
+                "SELECT count(*), "
+                "coalesce(sum(typeof(content) = 'blob'), 0), "
+                "coalesce(sum(length(CAST(content AS BLOB))), 0), "
+                "coalesce(sum(CASE WHEN typeof(content) = 'text' "
+                "THEN length(CAST(content AS BLOB)) ELSE 0 END), 0) "
+                f"FROM {table}"
+            ).one()
+            blobs = conn.exec_driver_sql(
+                f"SELECT content FROM {table} WHERE typeof(content) = 'blob'"
+            )
+            plain += sum(len(decompress(blob).encode()) for (blob,) in blobs)
+            usage.append(TableUsage(table, rows, compressed, stored, plain))
+    return usage
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from neuromind.thread_manager import ThreadManager
+
+    parser = argparse.ArgumentParser(description="NeuroMind message storage")
+    parser.add_argument(
+        "command",
+        choices=["report", "vacuum"],
+        help="report: disk use and compression savings; "
+        "vacuum: give space freed by compression back to the OS",
+    )
+    args = parser.parse_args()
+
+    path = Config.Path.DATABASE_FILE
+    # Opening the database runs pending migrations, which compress old rows
+    db = ThreadManager(path)
+    if args.command == "vacuum":
+        size = path.stat().st_size
+        with db.write_lock, db.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.exec_driver_sql("VACUUM")
+            # In WAL mode the file only shrinks once the log is checkpointed
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        print(f"{path}: {size / 1e6:.1f} MB -> {path.stat().st_size / 1e6:.1f} MB")
+    else:
+        print(
+            f"{'table':<20}{'rows':>10}{'compressed':>12}{'text MB':>10}"
+            f"{'stored MB':>11}{'saved':>8}"
+        )
+        for t in report(db.engine):
+            share = t.saved_bytes / t.text_bytes if t.text_bytes else 0
+            print(
+                f"{t.table:<20}{t.rows:>10}{t.compressed_rows:>12}"
+                f"{t.text_bytes / 1e6:>10.2f}{t.stored_bytes / 1e6:>11.2f}{share:>8.0%}"
+            )
+        with db.engine.connect() as conn:
+            page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+            free = conn.exec_driver_sql("PRAGMA freelist_count").scalar() * page_size
+        print(
+            f"database file: {path.stat().st_size / 1e6:.1f} MB, "
+            f"{free / 1e6:.1f} MB in free pages (reclaim with `vacuum`)"
+        )
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import time
+from enum import Enum
+from typing import AsyncIterator
+
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    loads = json.loads
+
+
+class StreamFormat(str, Enum):
+    SSE = "text/event-stream"
+    NDJSON = "application/x-ndjson"
+
+    @classmethod
+    def negotiate(cls, accept: str | None) -> "StreamFormat":
+        """NDJSON when the client lists it in Accept, SSE otherwise."""
+        if accept and cls.NDJSON.value in accept:
+            return cls.NDJSON
+        return cls.SSE
+
+
+# Coalesced text chunks are flushed once they reach this many characters
+MAX_COALESCED_CHARS = 4096
+
+_TEXT_EVENTS = ("reasoning", "content")
+
+
+def encode(event: dict, stream_format: StreamFormat) -> bytes:
+    if stream_format == StreamFormat.NDJSON:
+        return dumps(event) + b"\n"
+    return b"data: " + dumps(event) + b"\n\n"
+
+
+async def coalesce(events: AsyncIterator[dict], window_ms: int) -> AsyncIterator[dict]:
+    """
+    Merge consecutive text events of the same type arriving within window_ms.
+    A pending chunk is flushed when the window expires even if the model is
+    silent, so coalescing adds at most window_ms of latency.
+    """
+    if window_ms <= 0:
+        async for event in events:
+            yield event
+        return
+
+    window = window_ms / 1000
+    iterator = aiter(events)
+    buffered: dict | None = None
+    deadline = 0.0
+    pending: asyncio.Future | None = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+
+            timeout = max(0.0, deadline - time.monotonic()) if buffered else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield buffered
+                buffered = None
+                continue
+
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+
+            if (
+                buffered
+                and buffered["type"] == event["type"]
+                and len(buffered["content"]) < MAX_COALESCED_CHARS
+            ):
+                buffered["content"] += event["content"]
+                continue
+
+            if buffered:
+                yield buffered
+                buffered = None
+
+            if event["type"] in _TEXT_EVENTS:
+                buffered = dict(event)
+                deadline = time.monotonic() + window
+            else:
+                yield event
+
+        if buffered:
+            yield buffered
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+_END = object()
+
+
+async def until_cancelled(
+    events: AsyncIterator[dict], cancelled: asyncio.Event, buffer: int = 8
+) -> AsyncIterator[dict]:
+    """
+    Pass events through until `cancelled` is set. The source runs in its own
+    task, which is cancelled mid-await, so a model stuck between tokens (or a
+    request waiting for an inference slot) stops right away and its cleanup
+    runs. Costs one task per stream rather than one per event.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+    async def produce():
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(_Failure(e))
+            return
+        await queue.put(_END)
+
+    def wake_consumer(_):
+        # A cancelled producer never puts _END. When the queue is full the
+        # consumer is not blocked and sees the cancelled flag on its next get.
+        try:
+            queue.put_nowait(_END)
+        except asyncio.QueueFull:
+            pass
+
+    producer = asyncio.create_task(produce())
+    stopper = asyncio.ensure_future(cancelled.wait())
+    stopper.add_done_callback(lambda _: producer.cancel())
+    producer.add_done_callback(lambda task: task.cancelled() and wake_consumer(task))
+    try:
+        while True:
+            event = await queue.get()
+            if event is _END or cancelled.is_set():
+                return
+            if isinstance(event, _Failure):
+                raise event.error
+            yield event
+    finally:
+        stopper.cancel()
+        producer.cancel()
+
+
+class CreditWindow:
+    """
+    Flow control of one stream multiplexed with others over a connection:
+    the frames it may still send. A sender out of credit waits for the
+    receiver to grant more, so a stream nobody reads stops pulling from the
+    model instead of piling up in buffers.
+    """
+
+    def __init__(self, frames: int):
+        self.frames = frames
+        self._granted = asyncio.Event()
+
+    def grant(self, frames: int):
+        self.frames += frames
+        self._granted.set()
+
+    async def acquire(self):
+        while self.frames <= 0:
+            self._granted.clear()
+            await self._granted.wait()
+        self.frames -= 1
+
+
+async def encode_stream(
+    events: AsyncIterator[dict], stream_format: StreamFormat, coalesce_ms: int = 0
+) -> AsyncIterator[bytes]:
+    async for event in coalesce(events, coalesce_ms):
+        yield encode(event, stream_format)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import List
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from neuromind.config import Config
+from neuromind.db_writer import DatabaseWriter
+from neuromind.models import ModelRegistry
+from neuromind.scheduler import InferenceScheduler
+from neuromind.thread_manager import Message, ThreadManager
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain the long-term memory of a conversation between a user and an AI assistant.
+Merge the existing summary (if any) and the new conversation turns into a single updated summary.
+Keep facts, decisions, code identifiers, open questions and user preferences. Drop pleasantries.
+Write in the third person, as plain prose, in at most {max_words} words. Output only the summary."""
+
+
+def _render_turns(messages: List[Message]) -> str:
+    speakers = {"human": "User", "ai": "Assistant"}
+    return "\n\n".join(f"{speakers.get(m.role, m.role)}: {m.content}" for m in messages)
+
+
+class Summarizer:
+    """Condenses the older turns of long threads into a stored rolling summary."""
+
+    def __init__(
+        self,
+        db: ThreadManager,
+        writer: DatabaseWriter,
+        models: ModelRegistry,
+        scheduler: InferenceScheduler,
+    ):
+        self.db = db
+        self.writer = writer
+        self.models = models
+        self.scheduler = scheduler
+        self._in_progress: set[int] = set()
+
+    async def maybe_summarize(self, thread_id: int):
+        """Fold older turns into the summary once unsummarized history exceeds the trigger."""
+        if not Config.Summary.ENABLED or thread_id in self._in_progress:
+            return
+
+        self._in_progress.add(thread_id)
+        try:
+            await self._summarize(thread_id)
+        except Exception as e:
+            logger.exception(f"Summarization of thread {thread_id} failed: {e}")
+        finally:
+            self._in_progress.discard(thread_id)
+
+    async def _summarize(self, thread_id: int):
+        settings = Config.Summary
+        summary = await asyncio.to_thread(self.db.get_summary, thread_id)
+        after_id = summary.until_message_id if summary else 0
+
+        pending = await asyncio.to_thread(
+            self.db.count_tokens_after, thread_id, after_id
+        )
+        if pending <= settings.TRIGGER_TOKENS:
+            return
+
+        messages = await asyncio.to_thread(
+            self.db.get_messages_to_summarize,
+            thread_id,
+            after_id,
+            settings.KEEP_RECENT_TOKENS,
+        )
+        if not messages:
+            return
+
+        request = f"New conversation turns:\n\n{_render_turns(messages)}"
+        if summary:
+            request = f"Existing summary:\n{summary.content}\n\n{request}"
+
+        # Roughly 0.75 words per token
+        max_words = int(settings.MAX_SUMMARY_TOKENS * 0.75)
+        # All summaries share one fair-queue key so they never crowd out chats
+        llm = await asyncio.to_thread(self.models.get, settings.MODEL, False)
+        async with self.scheduler.slot(settings.MODEL.provider, "summarizer"):
+            response = await llm.ainvoke(
+                [
+                    SystemMessage(content=SUMMARY_PROMPT.format(max_words=max_words)),
+                    HumanMessage(content=request),
+                ]
+            )
+        await self.writer.submit(
+            self.db.save_summary, thread_id, response.text, messages[-1].id
+        )
+        logger.info(
+            f"Summarized {len(messages)} messages of thread {thread_id} "
+            f"(up to message {messages[-1].id})"
+        )
@@ -1,9 +1,31 @@
-from typing import List, Tuple
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
-from sqlmodel import Field, Session, SQLModel, create_engine, func, select
+from sqlalchemy import Index, and_, event, literal, union_all
+from sqlalchemy.pool import QueuePool
+from sqlmodel import (
+    Field,
+    Session,
+    SQLModel,
+    col,
+    create_engine,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
 
-from neuromind.config import Persona
+from neuromind import search
+from neuromind.config import Config
+from neuromind.locks import FileLock
+from neuromind.metrics import DB_QUERY_SECONDS
+from neuromind.migrations import migrate
+from neuromind.storage import CompressedText
+from neuromind.tokens import estimate_tokens
 
 
 class Thread(SQLModel, table=True):
@@ -12,38 +34,195 @@ class Thread(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     name: str = Field(unique=True, index=True)
     persona: str
+    # Name of the ModelConfig used by this thread, None for Config.MODEL
+    model: str | None = None
+    # Denormalized so listing threads never touches the message table
+    message_count: int = 0
+    last_activity_at: datetime | None = None
+    # A fork shares its parent's messages up to fork_message_id instead of
+    # copying them; its own messages follow
+    parent_id: int | None = Field(default=None, foreign_key="thread.id", index=True)
+    fork_message_id: int | None = None
 
 
 class Message(SQLModel, table=True):
     """A message in a conversation thread."""
 
+    __table_args__ = (Index("ix_message_thread_id_id", "thread_id", "id"),)
+
     id: int | None = Field(default=None, primary_key=True)
     thread_id: int = Field(foreign_key="thread.id")
     role: str
+    content: str = Field(sa_type=CompressedText)
+    token_count: int = 0
+    # The answer was cut off by a cancelled generation
+    truncated: bool = False
+
+
+class MessageReasoning(SQLModel, table=True):
+    """
+    Reasoning trace of an AI message. Kept out of the message table so
+    history and context queries never read it; fetched only on request.
+    """
+
+    __tablename__ = "message_reasoning"
+
+    message_id: int = Field(foreign_key="message.id", primary_key=True)
+    content: str = Field(sa_type=CompressedText)
+
+
+# Largest SQLite rowid: the bound of a thread's own messages in its lineage
+_NEWEST = 2**63 - 1
+
+
+def _lineage(thread_id: int):
+    """
+    Recursive CTE of (thread_id, upto) rows: a thread and its fork
+    ancestors, each with the newest of its message ids the thread sees.
+    """
+    lineage = (
+        select(
+            Thread.id.label("thread_id"),
+            Thread.parent_id,
+            Thread.fork_message_id,
+            literal(_NEWEST).label("upto"),
+        )
+        .where(Thread.id == thread_id)
+        .cte("lineage", recursive=True)
+    )
+    return lineage.union_all(
+        select(
+            Thread.id,
+            Thread.parent_id,
+            Thread.fork_message_id,
+            lineage.c.fork_message_id,
+        ).where(Thread.id == lineage.c.parent_id)
+    )
+
+
+def _visible(query, thread_id: int):
+    """Restrict a query over Message to a thread's history, inherited messages too."""
+    lineage = _lineage(thread_id)
+    return query.join(
+        lineage,
+        and_(Message.thread_id == lineage.c.thread_id, Message.id <= lineage.c.upto),
+    )
+
+
+def _newest_visible(
+    lineage: List[Tuple[int, int]],
+    columns,
+    limit: int,
+    after_id: int = 0,
+    before_id: int | None = None,
+):
+    """
+    Subquery of the newest `limit` messages of a thread's history with
+    after_id < id < before_id. One arm per thread of the lineage, so every
+    arm is an index range scan that stops after `limit` rows however long
+    the shared prefix is.
+    """
+    arms = []
+    for thread_id, upto in lineage:
+        # Ancestors only hold older messages than their descendants
+        if arms and upto <= after_id:
+            break
+        query = select(*columns).where(
+            Message.thread_id == thread_id, Message.id > after_id, Message.id <= upto
+        )
+        if before_id is not None:
+            query = query.where(Message.id < before_id)
+        arms.append(query.order_by(Message.id.desc()).limit(limit))
+    if len(arms) == 1:
+        return arms[0].subquery()
+    return union_all(*(select(arm.subquery()) for arm in arms)).subquery()
+
+
+def _configure_connection(dbapi_connection, _connection_record):
+    """Apply per-connection SQLite pragmas from Config.Database."""
+    settings = Config.Database
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SYNCHRONOUS}")
+    # Negative cache_size is interpreted by SQLite as KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{settings.CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={settings.MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context: a failed statement leaves nothing behind
+    context.query_start = time.perf_counter()
+
+
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_start
+    DB_QUERY_SECONDS.observe(elapsed, operation=statement.split(None, 1)[0].upper())
+
+
+class ThreadSummary(SQLModel, table=True):
+    """Rolling summary of a thread's older messages."""
+
+    thread_id: int = Field(foreign_key="thread.id", primary_key=True)
     content: str
+    token_count: int
+    # Id of the newest message folded into the summary
+    until_message_id: int
 
 
 class ThreadManager:
+    """
+    Storage layer for threads and messages.
+    Meant to be created once per process and shared: it owns a connection
+    pool and creates the schema on construction.
+    """
+
     def __init__(self, db_path: str):
+        settings = Config.Database
         self.engine = create_engine(
             f"sqlite:///{db_path}",
-            connect_args={"check_same_thread": False},
+            poolclass=QueuePool,
+            pool_size=settings.POOL_SIZE,
+            max_overflow=settings.MAX_OVERFLOW,
+            pool_timeout=settings.POOL_TIMEOUT,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.BUSY_TIMEOUT_MS / 1000,
+                # Size of sqlite3's per-connection prepared statement cache
+                "cached_statements": settings.STATEMENT_CACHE_SIZE,
+            },
         )
-        SQLModel.metadata.create_all(self.engine)
+        event.listen(self.engine, "connect", _configure_connection)
+        event.listen(self.engine, "before_cursor_execute", _start_query_timer)
+        event.listen(self.engine, "after_cursor_execute", _record_query_time)
+        # Held by writers of every process sharing the file (see DatabaseWriter)
+        self.write_lock = FileLock(Path(f"{db_path}-lock"))
+        # Workers starting together must not race on creating the schema
+        with self.write_lock:
+            SQLModel.metadata.create_all(self.engine)
+            migrate(self.engine)
+
+    def close(self):
+        self.engine.dispose()
 
     def get_thread(self, name: str) -> Thread | None:
         with Session(self.engine) as session:
             return session.exec(select(Thread).where(Thread.name == name)).first()
 
     def get_or_create_thread(
-        self, name: str, persona: Persona = Persona.NEUROMIND
+        self,
+        name: str,
+        persona: str = Config.Personas.DEFAULT,
+        model: str | None = None,
     ) -> Thread:
         with Session(self.engine) as session:
             thread = session.exec(select(Thread).where(Thread.name == name)).first()
             if thread:
                 return thread
 
-            thread = Thread(name=name, persona=persona.value)
+            thread = Thread(name=name, persona=persona, model=model)
             session.add(thread)
             session.commit()
             session.refresh(thread)
@@ -53,24 +232,201 @@ class ThreadManager:
         """Returns list of (name, persona, message_count) tuples."""
         with Session(self.engine) as session:
             results = session.exec(
-                select(Thread.name, Thread.persona, func.count(Message.id))
-                .outerjoin(Message, Thread.id == Message.thread_id)
-                .group_by(Thread.id)
+                select(Thread.name, Thread.persona, Thread.message_count)
             ).all()
             return [(name, persona, count) for name, persona, count in results]
 
+    def _get_lineage(self, session: Session, thread_id: int) -> List[Tuple[int, int]]:
+        lineage = _lineage(thread_id)
+        rows = session.exec(
+            select(lineage.c.thread_id, lineage.c.upto).order_by(lineage.c.upto.desc())
+        ).all()
+        return [tuple(row) for row in rows] or [(thread_id, _NEWEST)]
+
+    def get_lineage(self, thread_id: int) -> List[Tuple[int, int]]:
+        """
+        (thread_id, newest visible message id) of a thread and its fork
+        ancestors, the thread itself first.
+        """
+        with Session(self.engine) as session:
+            return self._get_lineage(session, thread_id)
+
+    def fork_thread(self, thread_id: int, name: str, at: int | None = None) -> Thread:
+        """
+        Create thread `name` continuing thread_id's history from message
+        `at` (default: its newest message). The history up to `at` is
+        shared, not copied: forking writes the thread row and, if it only
+        covers shared messages, the summary. Its cost depends on the number
+        of messages after `at`, never on the length of the shared prefix.
+        ValueError if the name is taken or `at` is not in the history.
+        """
+        with Session(self.engine) as session:
+            parent = session.get(Thread, thread_id)
+            if session.exec(select(Thread.id).where(Thread.name == name)).first():
+                raise ValueError(f"Thread {name} already exists")
+
+            lineage = self._get_lineage(session, thread_id)
+            if at is None:
+                at = session.exec(
+                    _visible(select(func.max(Message.id)), thread_id)
+                ).one()
+            owner, dropped = None, 0
+            if at is not None:
+                owner = session.exec(
+                    select(Message.thread_id).where(Message.id == at)
+                ).first()
+                if not any(t == owner and at <= upto for t, upto in lineage):
+                    raise ValueError(f"Message {at} is not in thread {parent.name}")
+                # Messages of the parent's history the fork leaves out
+                dropped = session.exec(
+                    _visible(
+                        select(func.count()).select_from(Message), thread_id
+                    ).where(Message.id > at)
+                ).one()
+            fork = Thread(
+                name=name,
+                persona=parent.persona,
+                model=parent.model,
+                # The thread owning `at`, which may be an ancestor: the fork
+                # then shares nothing with the parent's own messages
+                parent_id=owner,
+                fork_message_id=at,
+                message_count=parent.message_count - dropped,
+                last_activity_at=datetime.now(timezone.utc),
+            )
+            session.add(fork)
+            session.flush()
+
+            summary = session.get(ThreadSummary, thread_id)
+            if summary and at is not None and summary.until_message_id <= at:
+                session.add(
+                    ThreadSummary(
+                        thread_id=fork.id,
+                        content=summary.content,
+                        token_count=summary.token_count,
+                        until_message_id=summary.until_message_id,
+                    )
+                )
+            session.commit()
+            session.refresh(fork)
+            return fork
+
+    def _insert_messages(
+        self,
+        session: Session,
+        thread_id: int,
+        messages: Iterable[Tuple[str, str]],
+        truncated: bool = False,
+        reasoning: str = "",
+    ) -> int:
+        """
+        Bulk insert (role, content) pairs and bump the thread's counters.
+        truncated flags the last message as a cut-off answer, reasoning is
+        stored as the last message's trace.
+        """
+        rows = [
+            {
+                "thread_id": thread_id,
+                "role": role,
+                "content": content,
+                "token_count": estimate_tokens(content),
+                "truncated": False,
+            }
+            for role, content in messages
+        ]
+        if not rows:
+            return 0
+        rows[-1]["truncated"] = truncated
+
+        session.exec(insert(Message), params=rows)
+        # The transaction holds SQLite's write lock, so the thread's newest
+        # ids are the rows just inserted
+        ids = session.exec(
+            select(Message.id)
+            .where(Message.thread_id == thread_id)
+            .order_by(Message.id.desc())
+            .limit(len(rows))
+        ).all()[::-1]
+        search.index_messages(
+            session,
+            [
+                (id, thread_id, row["role"], row["content"])
+                for id, row in zip(ids, rows)
+            ],
+        )
+        if reasoning:
+            session.exec(
+                insert(MessageReasoning),
+                params=[{"message_id": ids[-1], "content": reasoning}],
+            )
+        session.exec(
+            update(Thread)
+            .where(Thread.id == thread_id)
+            .values(
+                message_count=Thread.message_count + len(rows),
+                last_activity_at=datetime.now(timezone.utc),
+            )
+        )
+        return len(rows)
+
     def add_message(self, thread_id: int, role: str, content: str):
+        self.add_messages(thread_id, [(role, content)])
+
+    def add_exchange(
+        self,
+        thread_id: int,
+        human_content: str,
+        ai_content: str,
+        truncated: bool = False,
+        reasoning: str = "",
+        records: Iterable[SQLModel] = (),
+    ):
+        """
+        Store a user message, the AI answer and its reasoning in one
+        transaction, together with `records` (other rows to commit with them).
+        """
+        self.add_messages(
+            thread_id,
+            [("human", human_content), ("ai", ai_content)],
+            truncated,
+            reasoning,
+            records,
+        )
+
+    def add_messages(
+        self,
+        thread_id: int,
+        messages: Iterable[Tuple[str, str]],
+        truncated: bool = False,
+        reasoning: str = "",
+        records: Iterable[SQLModel] = (),
+    ) -> int:
+        """Append (role, content) pairs in one transaction, returns the count."""
         with Session(self.engine) as session:
-            message = Message(thread_id=thread_id, role=role, content=content)
-            session.add(message)
+            count = self._insert_messages(
+                session, thread_id, messages, truncated, reasoning
+            )
+            session.add_all(records)
             session.commit()
+            return count
+
+    def import_thread(
+        self,
+        name: str,
+        messages: Iterable[Tuple[str, str]],
+        persona: str = Config.Personas.DEFAULT,
+        model: str | None = None,
+    ) -> Thread:
+        """Create a thread (or reuse an existing one) and append messages to it."""
+        thread = self.get_or_create_thread(name, persona, model)
+        self.add_messages(thread.id, messages)
+        return self.get_thread(name)
 
     def get_history(self, thread_id: int) -> List[BaseMessage]:
         with Session(self.engine) as session:
+            # Forks resolve their whole lineage in the same (recursive) query
             messages = session.exec(
-                select(Message)
-                .where(Message.thread_id == thread_id)
-                .order_by(Message.id)
+                _visible(select(Message), thread_id).order_by(Message.id)
             ).all()
 
             return [
@@ -80,11 +436,252 @@ class ThreadManager:
                 for msg in messages
             ]
 
+    def get_messages_page(
+        self, thread_id: int, before_id: int | None = None, limit: int = 100
+    ) -> List[Tuple[int, str, str, bool]]:
+        """
+        Keyset page of (id, role, content, truncated) rows: the newest `limit`
+        messages with id < before_id, in chronological order.
+        """
+        with Session(self.engine) as session:
+            page = _newest_visible(
+                self._get_lineage(session, thread_id),
+                (Message.id, Message.role, Message.content, Message.truncated),
+                limit,
+                before_id=before_id,
+            )
+            rows = session.exec(
+                select(*page.c).order_by(page.c.id.desc()).limit(limit)
+            ).all()
+            return [tuple(row) for row in reversed(rows)]
+
+    def iter_messages(
+        self, thread_id: int, batch_size: int = 500
+    ) -> Iterator[Tuple[int, str, str, bool]]:
+        """
+        Stream (id, role, content, truncated) rows in chronological order from
+        a server-side cursor, without building ORM objects.
+        """
+        lineage = self.get_lineage(thread_id)
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, yield_per=batch_size)
+            # Oldest ancestor first: a thread's messages are all newer than
+            # the ones it inherits, so its part reads in index order
+            for thread_id, upto in reversed(lineage):
+                result = conn.execute(
+                    select(Message.id, Message.role, Message.content, Message.truncated)
+                    .where(Message.thread_id == thread_id, Message.id <= upto)
+                    .order_by(Message.id)
+                )
+                for row in result:
+                    yield tuple(row)
+
+    def get_recent_history(
+        self, thread_id: int, token_budget: int, after_id: int = 0
+    ) -> List[BaseMessage]:
+        """
+        Newest messages of a thread (with id > after_id) whose combined token
+        count fits the budget, in chronological order. Reads at most
+        token_budget rows (every message counts at least one token) so the
+        cost is independent of thread length.
+        """
+        if token_budget <= 0:
+            return []
+
+        with Session(self.engine) as session:
+            newest = _newest_visible(
+                self._get_lineage(session, thread_id),
+                (Message.id, Message.role, Message.content, Message.token_count),
+                token_budget,
+                after_id,
+            )
+            windowed = select(
+                newest.c.id,
+                newest.c.role,
+                newest.c.content,
+                func.sum(newest.c.token_count)
+                .over(order_by=newest.c.id.desc())
+                .label("running_tokens"),
+            ).subquery()
+            rows = session.exec(
+                select(windowed.c.role, windowed.c.content)
+                .where(windowed.c.running_tokens <= token_budget)
+                .order_by(windowed.c.id)
+            ).all()
+
+            return [
+                HumanMessage(content=content)
+                if role == "human"
+                else AIMessage(content=content)
+                for role, content in rows
+            ]
+
+    def get_window_start(
+        self, thread_id: int, token_budget: int, after_id: int = 0
+    ) -> int:
+        """
+        after_id that selects the newest messages of a thread (with id >
+        after_id) fitting token_budget. Returns the newest id if none fit.
+        """
+        with Session(self.engine) as session:
+            newest = _newest_visible(
+                self._get_lineage(session, thread_id),
+                (Message.id, Message.token_count),
+                max(token_budget, 1),
+                after_id,
+            )
+            windowed = select(
+                newest.c.id,
+                func.sum(newest.c.token_count)
+                .over(order_by=newest.c.id.desc())
+                .label("running_tokens"),
+            ).subquery()
+            oldest_kept, newest_id = session.exec(
+                select(
+                    func.min(windowed.c.id).filter(
+                        windowed.c.running_tokens <= token_budget
+                    ),
+                    func.max(windowed.c.id),
+                )
+            ).one()
+        if oldest_kept is not None:
+            return oldest_kept - 1
+        return newest_id if newest_id is not None else after_id
+
+    def search(
+        self,
+        query: str,
+        thread_name: str | None = None,
+        persona: str | None = None,
+        limit: int = 20,
+    ) -> List[search.SearchResult]:
+        """Ranked full-text search across messages, optionally filtered."""
+        with Session(self.engine) as session:
+            lineage = None
+            if thread_name is not None:
+                thread_id = session.exec(
+                    select(Thread.id).where(Thread.name == thread_name)
+                ).first()
+                if thread_id is None:
+                    return []
+                lineage = self._get_lineage(session, thread_id)
+            return search.search(session, query, lineage, persona, limit)
+
+    def rebuild_search_index(self):
+        search.rebuild(self.engine)
+
+    def get_messages_after(
+        self, after_id: int, limit: int
+    ) -> List[Tuple[int, int, str]]:
+        """(id, thread_id, content) of messages of any thread with id > after_id."""
+        with Session(self.engine) as session:
+            rows = session.exec(
+                select(Message.id, Message.thread_id, Message.content)
+                .where(Message.id > after_id)
+                .order_by(Message.id)
+                .limit(limit)
+            ).all()
+            return [tuple(row) for row in rows]
+
+    def get_messages_by_ids(self, ids: List[int]) -> List[Tuple[int, str, str, str]]:
+        """(id, thread name, role, content) of the given messages that still exist."""
+        with Session(self.engine) as session:
+            rows = session.exec(
+                select(Message.id, Thread.name, Message.role, Message.content)
+                .join(Thread, Thread.id == Message.thread_id)
+                .where(col(Message.id).in_(ids))
+            ).all()
+            return [tuple(row) for row in rows]
+
+    def get_reasoning(self, thread_id: int, message_id: int) -> str | None:
+        """Reasoning trace of a message of the thread, None if it has none."""
+        with Session(self.engine) as session:
+            return session.exec(
+                _visible(
+                    select(MessageReasoning.content).join(
+                        Message, Message.id == MessageReasoning.message_id
+                    ),
+                    thread_id,
+                ).where(MessageReasoning.message_id == message_id)
+            ).first()
+
+    def get_summary(self, thread_id: int) -> ThreadSummary | None:
+        with Session(self.engine) as session:
+            return session.get(ThreadSummary, thread_id)
+
+    def count_tokens_after(self, thread_id: int, after_id: int) -> int:
+        with Session(self.engine) as session:
+            return session.exec(
+                _visible(
+                    select(func.coalesce(func.sum(Message.token_count), 0)), thread_id
+                ).where(Message.id > after_id)
+            ).one()
+
+    def get_messages_to_summarize(
+        self, thread_id: int, after_id: int, keep_recent_tokens: int
+    ) -> List[Message]:
+        """Messages newer than after_id, excluding the newest keep_recent_tokens."""
+        windowed = (
+            _visible(
+                select(
+                    Message.id,
+                    func.sum(Message.token_count)
+                    .over(order_by=Message.id.desc())
+                    .label("running_tokens"),
+                ),
+                thread_id,
+            )
+            .where(Message.id > after_id)
+            .subquery()
+        )
+        with Session(self.engine) as session:
+            return session.exec(
+                select(Message)
+                .join(windowed, Message.id == windowed.c.id)
+                .where(windowed.c.running_tokens > keep_recent_tokens)
+                .order_by(Message.id)
+            ).all()
+
+    def save_summary(self, thread_id: int, content: str, until_message_id: int):
+        with Session(self.engine) as session:
+            summary = session.get(ThreadSummary, thread_id) or ThreadSummary(
+                thread_id=thread_id
+            )
+            summary.content = content
+            summary.token_count = estimate_tokens(content)
+            summary.until_message_id = until_message_id
+            session.add(summary)
+            session.commit()
+
     def clear_messages(self, thread_id: int):
+        """
+        Delete a thread's messages. A cleared fork stops sharing its
+        parent's. ValueError if other threads are forked from this one:
+        their history includes its messages.
+        """
         with Session(self.engine) as session:
-            messages = session.exec(
-                select(Message).where(Message.thread_id == thread_id)
+            forks = session.exec(
+                select(Thread.name).where(Thread.parent_id == thread_id)
             ).all()
-            for msg in messages:
-                session.delete(msg)
+            if forks:
+                raise ValueError(
+                    f"Thread has forks sharing its messages: {', '.join(forks)}"
+                )
+            session.exec(
+                delete(ThreadSummary).where(ThreadSummary.thread_id == thread_id)
+            )
+            search.unindex_thread(session, thread_id)
+            session.exec(
+                delete(MessageReasoning).where(
+                    col(MessageReasoning.message_id).in_(
+                        select(Message.id).where(Message.thread_id == thread_id)
+                    )
+                )
+            )
+            session.exec(delete(Message).where(Message.thread_id == thread_id))
+            session.exec(
+                update(Thread)
+                .where(Thread.id == thread_id)
+                .values(message_count=0, parent_id=None, fork_message_id=None)
+            )
             session.commit()
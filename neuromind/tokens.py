@@ -0,0 +1,9 @@
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count of a text (~4 characters per token).
+    Must stay in sync with the SQL backfill in neuromind.migrations.
+    """
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
@@ -1,14 +1,223 @@
-from typing import List, Tuple
+import re
+import time
+from typing import TYPE_CHECKING, List, Tuple
 
-from rich.console import Console, Group, RenderableType
+from rich.console import Console, ConsoleOptions, RenderResult
 from rich.live import Live
-from rich.markdown import Markdown
+from rich.markup import escape
 from rich.panel import Panel
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TimeElapsedColumn
 from rich.prompt import Confirm, Prompt
+from rich.segment import Segment
 from rich.table import Table
+from rich.text import Text
+
+if TYPE_CHECKING:
+    from rich.markdown import Markdown
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+def _markdown(text: str, style: str) -> "Markdown":
+    # rich.markdown pulls in markdown-it and Pygments, a good part of the
+    # CLI's startup time; load them with the first answer instead
+    from rich.markdown import Markdown
+
+    return Markdown(text, style=style)
+
+
+class _FrozenBlock:
+    """A completed markdown block, parsed once and re-rendered only on resize."""
+
+    def __init__(self, markdown: "Markdown"):
+        self._markdown = markdown
+        self._width: int | None = None
+        self._lines: List[List[Segment]] = []
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        if self._width != options.max_width:
+            lines = console.render_lines(
+                self._markdown, options.update(height=None), pad=False
+            )
+            # Drop the empty edge lines Rich emits around some elements (lists),
+            # IncrementalMarkdown separates blocks itself
+            while lines and not Segment.get_line_length(lines[0]):
+                lines.pop(0)
+            while lines and not Segment.get_line_length(lines[-1]):
+                lines.pop()
+            self._lines = lines
+            self._width = options.max_width
+        for line in self._lines:
+            yield from line
+            yield Segment.line()
+
+
+class IncrementalMarkdown:
+    """
+    Markdown renderable for append-only text.
+    Completed blocks (paragraphs followed by a blank line, closed code
+    fences) are frozen and cached; only the open tail block is re-parsed.
+    Frozen blocks can be handed off with pop_frozen() so they are printed
+    once instead of being redrawn on every refresh.
+    """
+
+    def __init__(self, style: str = "none"):
+        self._style = style
+        self._text = ""
+        self._blocks: List[_FrozenBlock] = []
+        self._frozen_upto = 0
+        self._scan_pos = 0
+        self._fence: str | None = None
+        self._pending_break = False
+
+    def __bool__(self) -> bool:
+        return bool(self._text)
+
+    def append(self, text: str):
+        self._text += text
+        self._freeze_completed_blocks()
+
+    def pop_frozen(self) -> List[_FrozenBlock]:
+        """Remove and return the blocks frozen since the last call."""
+        blocks, self._blocks = self._blocks, []
+        return blocks
+
+    def _freeze(self, end: int):
+        block = self._text[self._frozen_upto : end]
+        if block.strip():
+            self._blocks.append(_FrozenBlock(_markdown(block, self._style)))
+        self._frozen_upto = end
+
+    def _freeze_completed_blocks(self):
+        while (newline := self._text.find("\n", self._scan_pos)) != -1:
+            line_start = self._scan_pos
+            line = self._text[line_start:newline]
+            self._scan_pos = newline + 1
+            fence = _FENCE.match(line)
+
+            if self._fence:
+                marker = line.strip()
+                if marker.startswith(self._fence) and set(marker) == {self._fence[0]}:
+                    self._fence = None
+                    self._freeze(self._scan_pos)
+            elif fence:
+                self._freeze(line_start)
+                self._fence = fence.group(1)
+                self._pending_break = False
+            elif not line.strip():
+                self._pending_break = True
+            elif self._pending_break:
+                # Indented lines may continue a list item, keep them together
+                if not line[0].isspace():
+                    self._freeze(line_start)
+                self._pending_break = False
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        separate = False
+        for block in self._blocks:
+            if separate:
+                yield Segment.line()
+            yield block
+            separate = True
+
+        tail = self._text[self._frozen_upto :]
+        if tail.strip():
+            if separate:
+                yield Segment.line()
+            yield _markdown(tail, self._style)
+
+
+class StreamView:
+    """
+    Live view of a streamed answer.
+    Completed answer blocks are printed above the live area once, so each
+    refresh only redraws the open tail block. Refreshes are throttled to
+    refresh_per_second instead of happening on every token.
+    """
+
+    def __init__(self, console: Console, refresh_per_second: float):
+        self._console = console
+        self._thought = IncrementalMarkdown(style="italic dim white")
+        self._thought_printed = False
+        self._response = IncrementalMarkdown()
+        self._queue_position: int | None = None
+        self._min_interval = 1 / refresh_per_second
+        self._last_refresh = 0.0
+        self._live = Live(
+            self,
+            console=console,
+            auto_refresh=False,
+            transient=False,
+            vertical_overflow="visible",
+        )
+
+    def __enter__(self) -> "StreamView":
+        self._live.start(refresh=True)
+        return self
+
+    def __exit__(self, *exc_info):
+        # Live.stop() performs the final refresh with the complete text
+        self._live.stop()
+
+    def set_queue_position(self, position: int):
+        self._queue_position = position
+        self._live.refresh()
+
+    def add_reasoning(self, text: str):
+        self._queue_position = None
+        self._thought.append(text)
+        self._maybe_refresh()
+
+    def add_content(self, text: str):
+        self._queue_position = None
+        if self._thought and not self._thought_printed:
+            # Reasoning is over once the answer starts, print it for good
+            self._console.print(self._thought_panel())
+            self._thought_printed = True
+
+        self._response.append(text)
+        for block in self._response.pop_frozen():
+            self._console.print(block)
+            self._console.print()
+        self._maybe_refresh()
+
+    def _thought_panel(self) -> Panel:
+        return Panel(
+            self._thought,
+            title="[dim]Reasoning[/dim]",
+            border_style="dim",
+            expand=False,
+        )
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if now - self._last_refresh >= self._min_interval:
+            self._last_refresh = now
+            self._live.refresh()
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        if self._queue_position:
+            yield Text(
+                f"Waiting for the model... position {self._queue_position} in queue",
+                style="dim",
+            )
+
+        if self._thought and not self._thought_printed:
+            yield self._thought_panel()
+
+        if self._response:
+            yield self._response
 
 
 class UIManager:
+    REFRESH_PER_SECOND = 15
+
     def __init__(self):
         self._console = Console()
 
@@ -18,7 +227,8 @@ class UIManager:
             Panel(
                 f"[bold cyan]NeuroMind[/bold cyan] [dim]| CLI AI Assistant [/dim]\n"
                 f"Model: [green]{model}[/green] | Thread: [yellow]{thread}[/yellow]\n"
-                "Cmds: [magenta]/new, /switch, /list, /clear, /exit[/magenta]",
+                "Cmds: [magenta]/new, /switch, /fork, /list, /search, /clear, "
+                "/exit[/magenta]",
                 border_style="cyan",
             )
         )
@@ -36,35 +246,51 @@ class UIManager:
 
         self._console.print(table)
 
-    def get_user_input(self, thread_name: str) -> str:
-        return Prompt.ask(f"\n[bold cyan][{thread_name}][/bold cyan] User")
+    def show_search_results(self, query: str, results: List[Tuple[str, str, str]]):
+        """Render (thread, role, snippet) rows; matches are wrapped in [brackets]."""
+        if not results:
+            self._console.print(f"[dim]No matches for '{escape(query)}'.[/dim]")
+            return
 
-    def stream_response(self, thread_name: str) -> Live:
-        self._console.print(f"[bold magenta]Neuro ({thread_name}) > [/bold magenta]")
-        return Live(
-            Markdown(""),
-            refresh_per_second=15,
-            transient=False,
-            vertical_overflow="visible",
-        )
+        table = Table(title=f"Search: {escape(query)}", border_style="dim")
+        table.add_column("Thread", style="cyan")
+        table.add_column("Role", style="magenta")
+        table.add_column("Snippet")
 
-    def render_stream_group(self, thought: str, response: str) -> Group:
-        renderables: List[RenderableType] = []
-
-        if thought:
-            renderables.append(
-                Panel(
-                    Markdown(thought, style="italic dim white"),
-                    title="[dim]Reasoning[/dim]",
-                    border_style="dim",
-                    expand=False,
-                )
-            )
+        for thread, role, snippet in results:
+            table.add_row(escape(thread), role, escape(snippet))
+
+        self._console.print(table)
+
+    def show_batch_jobs(self, jobs: List[Tuple[str, str, int, int, int]]):
+        """Render (id, status, completed, failed, total) rows."""
+        table = Table(title="Batch Jobs", border_style="dim")
+        table.add_column("Id", style="cyan")
+        table.add_column("Status", style="magenta")
+        table.add_column("Done", justify="right")
+        table.add_column("Failed", justify="right")
+        table.add_column("Total", justify="right")
+
+        for job_id, status, completed, failed, total in jobs:
+            table.add_row(job_id, status, str(completed), str(failed), str(total))
 
-        if response:
-            renderables.append(Markdown(response))
+        self._console.print(table)
+
+    def batch_progress(self) -> Progress:
+        return Progress(
+            "[cyan]{task.description}",
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=self._console,
+        )
 
-        return Group(*renderables)
+    def get_user_input(self, thread_name: str) -> str:
+        return Prompt.ask(f"\n[bold cyan][{thread_name}][/bold cyan] User")
+
+    def stream_response(self, thread_name: str) -> StreamView:
+        self._console.print(f"[bold magenta]Neuro ({thread_name}) > [/bold magenta]")
+        return StreamView(self._console, refresh_per_second=self.REFRESH_PER_SECOND)
 
     def print_error(self, msg: str):
         self._console.print(f"[bold red]Error:[/bold red] {msg}")
@@ -1,11 +1,52 @@
 #!/usr/bin/env python3
+"""
+Start the NeuroMind API server.
+
+    python start_server.py               # development: one process, auto-reload
+    python start_server.py --workers 4   # production: 4 processes, no reloader
+"""
+
+import argparse
+import os
 
 import uvicorn
 
-if __name__ == "__main__":
+from neuromind.config import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=Config.Server.HOST)
+    parser.add_argument("--port", type=int, default=Config.Server.PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="run N worker processes without the reloader (production)",
+    )
+    args = parser.parse_args()
+
+    if args.workers is None:
+        # Only source changes restart the server, not databases or benchmarks
+        uvicorn.run(
+            "neuromind.server:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            reload_dirs=["neuromind"],
+        )
+        return
+
+    # Spawned workers import Config afresh; each loads personas in its
+    # lifespan and builds its model clients in the background
+    os.environ["NEUROMIND_WORKERS"] = str(args.workers)
     uvicorn.run(
         "neuromind.server:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=False,
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from typing import Iterator
+
+import pytest
+
+from benchmarks.common import serve, temporary_database
+from benchmarks.fake_llm import FakeModelRegistry, FakeStreamingLLM
+from neuromind.config import Config
+from neuromind.server import app, get_models
+
+
+@pytest.fixture
+def llm() -> FakeStreamingLLM:
+    return FakeStreamingLLM(tokens=200, tokens_per_sec=100)
+
+
+@pytest.fixture
+def base_url(monkeypatch, llm) -> Iterator[str]:
+    """The app on a local port with a fake model and a throwaway database."""
+    monkeypatch.setattr(Config.Summary, "ENABLED", False)
+    monkeypatch.setattr(Config.Cache, "ENABLED", False)
+    monkeypatch.setattr(Config.Memory, "ENABLED", False)
+    monkeypatch.setattr(Config, "WARM_UP_MODEL", False)
+    app.dependency_overrides[get_models] = lambda: FakeModelRegistry(llm)
+    try:
+        with temporary_database(), serve(app) as url:
+            yield url
+    finally:
+        app.dependency_overrides.pop(get_models)
@@ -0,0 +1,84 @@
+import asyncio
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fake_llm import FakeModelRegistry, FakeStreamingLLM
+from neuromind.batch import BatchItem, BatchRunner, BatchStatus
+from neuromind.config import MODELS, Config
+from neuromind.db_writer import DatabaseWriter
+from neuromind.scheduler import InferenceScheduler
+from neuromind.streaming import loads
+from neuromind.thread_manager import ThreadManager
+
+
+def make_runner(tmp_path: Path, llm: FakeStreamingLLM) -> BatchRunner:
+    db = ThreadManager(tmp_path / "batch.db")
+    return BatchRunner(
+        db,
+        DatabaseWriter(),
+        FakeModelRegistry(llm),
+        InferenceScheduler(),
+        lambda thread, prompt: ([HumanMessage(prompt)], Config.MODEL),
+    )
+
+
+async def run_job(runner: BatchRunner, items) -> str:
+    job = await runner.create(items, concurrency=2)
+    await runner._tasks[job.id]
+    return job.id
+
+
+def test_resumed_job_does_not_repeat_stored_turns(tmp_path):
+    llm = FakeStreamingLLM(tokens=3, tokens_per_sec=0)
+    runner = make_runner(tmp_path, llm)
+    items = [BatchItem(thread=f"t{i % 2}", prompt=f"p{i}") for i in range(4)]
+
+    async def main():
+        job_id = await run_job(runner, items)
+        # A crash after the last exchange was committed, before its result line
+        path = runner.results_path(job_id)
+        lines = path.read_bytes().splitlines(keepends=True)
+        path.write_bytes(b"".join(lines[:-1]))
+        runner._update(job_id, {"status": BatchStatus.RUNNING})
+        calls = llm.calls
+
+        runner.resume()
+        await runner._tasks[job_id]
+        return job_id, calls
+
+    job_id, calls = asyncio.run(main())
+
+    assert llm.calls == calls
+    results = [loads(line) for line in runner.results_path(job_id).open("rb")]
+    assert sorted(result["index"] for result in results) == [0, 1, 2, 3]
+    assert all(result["response"] == "tok tok tok " for result in results)
+    assert [runner.db.get_thread(f"t{i}").message_count for i in (0, 1)] == [4, 4]
+    assert runner.get(job_id).status == BatchStatus.COMPLETED
+    assert runner.get(job_id).completed == 4
+
+
+def test_items_conflicting_with_their_thread_fail(tmp_path):
+    runner = make_runner(tmp_path, FakeStreamingLLM(tokens=3, tokens_per_sec=0))
+    runner.db.get_or_create_thread("t", "coder", None)
+    model = next(iter(MODELS))
+    items = [
+        BatchItem(thread="t", prompt="same persona", persona="coder"),
+        BatchItem(thread="t", prompt="thread's persona"),
+        BatchItem(thread="t", prompt="other persona", persona="default"),
+        BatchItem(thread="t", prompt="other model", model=model),
+        BatchItem(thread="new", prompt="new thread", persona="coder", model=model),
+    ]
+
+    job_id = asyncio.run(run_job(runner, items))
+
+    results = {
+        result["index"]: result["error"]
+        for result in map(loads, runner.results_path(job_id).open("rb"))
+    }
+    assert results[0] is None and results[1] is None and results[4] is None
+    assert results[2] == "thread t has persona coder, not default"
+    assert results[3] == f"thread t uses model default, not {model}"
+    assert runner.db.get_thread("t").message_count == 4
+    new = runner.db.get_thread("new")
+    assert (new.persona, new.model) == ("coder", model)
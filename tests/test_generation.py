@@ -0,0 +1,74 @@
+import time
+from typing import Iterator, List
+
+import pytest
+
+from neuromind.client import MessageInfo, NeuroMindClient, StreamEventType
+from neuromind.server import app
+
+
+@pytest.fixture
+def client(base_url) -> Iterator[NeuroMindClient]:
+    with NeuroMindClient(base_url) as client:
+        client.get_or_create_thread("t")
+        yield client
+
+
+def messages(client: NeuroMindClient) -> List[MessageInfo]:
+    return list(client.export_messages("t"))
+
+
+def cancel_after_first_chunk(client: NeuroMindClient, save_partial: bool) -> list:
+    events = []
+    for event in client.stream_chat("t", "hello"):
+        events.append(event)
+        if len(events) == 1:
+            assert client.cancel_chat("t", save_partial=save_partial)
+    return events
+
+
+def test_cancel_stops_the_stream_and_saves_the_partial_answer(client):
+    events = cancel_after_first_chunk(client, save_partial=True)
+
+    assert events[-1].type == StreamEventType.DONE
+    assert events[-1].truncated
+    content = [e for e in events if e.type == StreamEventType.CONTENT]
+    assert len(content) < 200
+
+    human, ai = messages(client)
+    assert human.content == "hello"
+    assert ai.truncated
+    assert ai.content == "".join(e.content for e in content)
+
+
+def test_cancel_without_save_partial_stores_nothing(client):
+    events = cancel_after_first_chunk(client, save_partial=False)
+
+    assert events[-1].type == StreamEventType.DONE
+    assert events[-1].truncated
+    assert messages(client) == []
+
+
+def test_disconnect_while_persisting_stores_the_exchange_once(client, monkeypatch):
+    db = app.state.db
+    add_exchange = db.add_exchange
+
+    def slow_add_exchange(*args):
+        time.sleep(0.5)
+        add_exchange(*args)
+
+    monkeypatch.setattr(db, "add_exchange", slow_add_exchange)
+    events = client.stream_chat("t", "hello")
+    answer = ""
+    for event in events:
+        answer += event.content
+        # The whole answer is in: the server is now writing the exchange
+        if answer == "tok " * 200:
+            break
+    time.sleep(0.25)
+    events.close()
+    time.sleep(1)
+
+    stored = messages(client)
+    assert [m.role for m in stored] == ["human", "ai"]
+    assert not stored[1].truncated
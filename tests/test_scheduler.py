@@ -0,0 +1,112 @@
+import asyncio
+from typing import List
+
+from benchmarks.fake_llm import FakeStreamingLLM
+from neuromind.config import Config, ModelProvider
+from neuromind.models import ModelRegistry
+from neuromind.scheduler import InferenceScheduler
+
+PROVIDER = ModelProvider.OLLAMA
+
+
+def make_scheduler(limit: int = 1) -> InferenceScheduler:
+    return InferenceScheduler({PROVIDER: limit}, workers=1)
+
+
+async def generate(
+    scheduler: InferenceScheduler, llm: FakeStreamingLLM, key: str, order: List[str]
+):
+    async with scheduler.slot(PROVIDER, key):
+        order.append(key)
+        async for _ in llm.astream([]):
+            pass
+
+
+def test_slots_go_round_robin_across_keys():
+    async def main() -> List[str]:
+        scheduler = make_scheduler()
+        llm = FakeStreamingLLM(tokens=5, tokens_per_sec=500)
+        order: List[str] = []
+        keys = ["a", "a", "a", "b", "b", "c"]
+        await asyncio.gather(*(generate(scheduler, llm, k, order) for k in keys))
+        return order
+
+    assert asyncio.run(main()) == ["a", "b", "c", "a", "b", "a"]
+
+
+def test_waiting_tickets_report_their_queue_position():
+    async def main():
+        scheduler = make_scheduler()
+        running = scheduler.enqueue(PROVIDER, "a")
+        second_a = scheduler.enqueue(PROVIDER, "a")
+        first_b = scheduler.enqueue(PROVIDER, "b")
+        assert running.granted
+
+        a_positions, b_positions = second_a.wait(), first_b.wait()
+        # "b" was never served, so it goes before the second "a"
+        assert await anext(b_positions) == 1
+        assert await anext(a_positions) == 2
+
+        running.release()
+        await anext(b_positions, None)
+        assert first_b.granted
+        assert await anext(a_positions) == 1
+
+        first_b.release()
+        await anext(a_positions, None)
+        assert second_a.granted
+        second_a.release()
+        assert scheduler.stats()[PROVIDER.value]["active"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelling_a_generation_frees_its_slot():
+    async def main():
+        scheduler = make_scheduler()
+        llm = FakeStreamingLLM(tokens=1000, tokens_per_sec=100)
+        order: List[str] = []
+        running = asyncio.create_task(generate(scheduler, llm, "a", order))
+        waiting = asyncio.create_task(generate(scheduler, llm, "b", order))
+        await asyncio.sleep(0.05)
+        assert order == ["a"]
+
+        # A waiter that gives up leaves the queue without taking a slot
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.stats()[PROVIDER.value] == {
+            "active": 1,
+            "queued": 0,
+            "max_concurrency": 1,
+        }
+
+        # Cancelling the running generation hands its slot to the next one
+        following = asyncio.create_task(generate(scheduler, llm, "c", order))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        assert order == ["a", "c"]
+        following.cancel()
+        await asyncio.gather(following, return_exceptions=True)
+        assert scheduler.stats()[PROVIDER.value]["active"] == 0
+
+    asyncio.run(main())
+
+
+def test_warm_up_takes_a_slot(monkeypatch):
+    async def main():
+        scheduler = make_scheduler()
+        llm = FakeStreamingLLM(tokens=5, tokens_per_sec=0, latency=0.2)
+        registry = ModelRegistry()
+        monkeypatch.setattr(registry, "get", lambda model, reasoning=True: llm)
+        warm_up = asyncio.create_task(registry.warm_up(Config.MODEL, scheduler))
+        await asyncio.sleep(0.05)
+
+        chat = scheduler.enqueue(Config.MODEL.provider, "chat")
+        assert await anext(chat.wait()) == 1
+        await warm_up
+        assert chat.granted
+        chat.release()
+
+    asyncio.run(main())
@@ -0,0 +1,22 @@
+import io
+
+from rich.console import Console
+
+from neuromind.ui_manager import StreamView
+
+
+def make_console() -> Console:
+    return Console(file=io.StringIO(), width=80, force_terminal=True)
+
+
+def test_stream_view_with_queue_position_and_paragraphs():
+    console = make_console()
+    with StreamView(console, float("inf")) as view:
+        view.set_queue_position(2)
+        assert "position 2 in queue" in console.file.getvalue()
+
+        view.add_content("para one\n\npara two\n")
+
+    output = console.file.getvalue()
+    assert "para one" in output
+    assert "para two" in output
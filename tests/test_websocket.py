@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+from websockets.sync.client import connect
+
+from neuromind.client import (
+    NeuroMindClient,
+    StreamEvent,
+    StreamEventType,
+    StreamTransport,
+)
+from neuromind.config import Config
+from neuromind.streaming import dumps, loads
+
+
+def test_binary_frames_are_rejected_without_closing_the_connection(base_url):
+    httpx.post(f"{base_url}/threads", json={"name": "t"}).raise_for_status()
+    with connect("ws" + base_url.removeprefix("http") + "/ws") as ws:
+        ws.send(b"\x00binary")
+        assert loads(ws.recv(timeout=5)) == {
+            "type": "error",
+            "error": "bad_request",
+            "message": "Frames must be JSON text",
+        }
+
+        # Room for the whole answer, no credit needed
+        chat = {"type": "chat", "stream": 1, "thread": "t", "content": "hi"}
+        ws.send(dumps({**chat, "window": 1000}).decode())
+        while (frame := loads(ws.recv(timeout=5)))["type"] not in ("done", "error"):
+            assert frame["stream"] == 1
+        assert frame == {"stream": 1, "type": "done"}
+
+
+def test_streams_can_be_consumed_from_separate_threads(base_url, monkeypatch):
+    # One generation at a time: b waits for a's slot
+    monkeypatch.setitem(Config.Scheduler.MAX_CONCURRENCY, Config.MODEL.provider, 1)
+    client = NeuroMindClient(
+        base_url, timeout=5, coalesce_ms=0, transport=StreamTransport.WEBSOCKET
+    )
+    client.get_or_create_thread("a")
+    client.get_or_create_thread("b")
+    events: Dict[str, List[StreamEvent]] = {"a": [], "b": []}
+
+    def consume(thread: str, stream):
+        events[thread].extend(stream)
+
+    with client:
+        a = client.stream_chat("a", "hello")
+        events["a"].append(next(a))
+        b = threading.Thread(target=consume, args=("b", client.stream_chat("b", "hi")))
+        b.start()
+        # a's window fills up while b's consumer waits for its first event
+        time.sleep(1)
+        consume("a", a)
+        b.join()
+
+    for thread in ("a", "b"):
+        assert events[thread][-1].type == StreamEventType.DONE
+        answer = "".join(e.content for e in events[thread])
+        assert answer == "tok " * 200